@@ -0,0 +1,93 @@
+"""Benchmark of the event loop blocking time of decoding quote responses.
+
+Compares the previous decode (text decoding and json.loads on the loop, as done by
+aiohttp's response.json()) with the raw bytes decode by json_loads, on the loop and
+in the executor as done for bodies of at least JSON_EXECUTOR_THRESHOLD bytes.
+
+The decoder holds the GIL, so the executor mainly helps when the body is large
+enough for other threads to release the GIL in between; json_loads itself is what
+reduces the blocking time.
+
+Run from the repository root: python benchmarks/json_decode.py
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import json
+from pathlib import Path
+import statistics
+import time
+
+from homeassistant.util.json import json_loads
+
+SAMPLE_PATH = Path(__file__).parent.parent / "tests" / "yahoofinance.json"
+SYMBOL_COUNTS = (100, 1000, 5000)
+ROUNDS = 20
+MONITOR_INTERVAL = 0.0005
+
+
+def build_body(symbol_count: int) -> bytes:
+    """Build a quote response body for the symbol count from the test sample."""
+    sample = json.loads(SAMPLE_PATH.read_text(encoding="utf-8"))
+    quotes = sample["quoteResponse"]["result"]
+    result = []
+    for index in range(symbol_count):
+        quote = dict(quotes[index % len(quotes)])
+        quote["symbol"] = f"SYM{index}"
+        result.append(quote)
+    return json.dumps({"quoteResponse": {"result": result, "error": None}}).encode()
+
+
+async def measure_blocking(decode: Callable[[], Awaitable[object]]) -> float:
+    """Return the longest time in seconds the loop was blocked while decoding."""
+    longest_gap = 0.0
+    done = False
+
+    async def monitor() -> None:
+        nonlocal longest_gap
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(MONITOR_INTERVAL)
+            now = time.perf_counter()
+            longest_gap = max(longest_gap, now - last - MONITOR_INTERVAL)
+            last = now
+
+    monitor_task = asyncio.create_task(monitor())
+    await asyncio.sleep(MONITOR_INTERVAL * 2)
+    await decode()
+    done = True
+    await monitor_task
+    return longest_gap
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    loop = asyncio.get_running_loop()
+
+    print(
+        f"{'symbols':>8} {'bytes':>10} {'json (ms)':>10} {'orjson (ms)':>12} {'executor (ms)':>14}"
+    )
+    for symbol_count in SYMBOL_COUNTS:
+        body = build_body(symbol_count)
+
+        async def decode_json(body=body) -> object:
+            return json.loads(body.decode("utf-8"))
+
+        async def decode_fast(body=body) -> object:
+            return json_loads(body)
+
+        async def decode_executor(body=body) -> object:
+            return await loop.run_in_executor(None, json_loads, body)
+
+        results = []
+        for decode in (decode_json, decode_fast, decode_executor):
+            gaps = [await measure_blocking(decode) for _ in range(ROUNDS)]
+            results.append(statistics.median(gaps) * 1000)
+
+        print(
+            f"{symbol_count:>8} {len(body):>10} {results[0]:>10.2f} {results[1]:>12.2f} {results[2]:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
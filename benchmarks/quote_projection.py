@@ -0,0 +1,137 @@
+"""Benchmark of the per symbol cost of extracting the data pieces of a quote.
+
+Compares the previous parse_symbol_data, which walked all the data groups and looked
+up the default of every key, with the compiled QuoteProjector for all the data
+pieces and for the default data group only. The memory held by the projected
+dicts is compared with the QuoteRecord rows, along with the time to refresh the
+rows in place.
+
+Run from the repository root: python benchmarks/quote_projection.py
+"""
+
+import json
+from pathlib import Path
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# pylint: disable=wrong-import-position
+from custom_components.yahoofinance.const import (  # noqa: E402
+    NUMERIC_DATA_DEFAULTS,
+    NUMERIC_DATA_GROUPS,
+    STRING_DATA_KEYS,
+)
+from custom_components.yahoofinance.coordinator import (  # noqa: E402
+    YahooSymbolUpdateCoordinator,
+)
+from custom_components.yahoofinance.projector import (  # noqa: E402
+    ALL_DATA_PROJECTOR,
+    QuoteProjector,
+)
+
+SAMPLE_PATH = Path(__file__).parent.parent / "tests" / "yahoofinance.json"
+SYMBOL_COUNT = 10_000
+ROUNDS = 10
+
+
+def parse_symbol_data(symbol_data: dict) -> dict:
+    """Previous implementation of parse_symbol_data."""
+    data = {}
+
+    for data_group in NUMERIC_DATA_GROUPS.values():
+        for value in data_group:
+            key = value[0]
+            default_value = NUMERIC_DATA_DEFAULTS.get(key, 0)
+            data[key] = symbol_data.get(key, default_value)
+
+    for key in STRING_DATA_KEYS:
+        data[key] = symbol_data.get(key)
+
+    return data
+
+
+def build_quotes(symbol_count: int) -> list[dict]:
+    """Build quotes for the symbol count from the test sample."""
+    sample = json.loads(SAMPLE_PATH.read_text(encoding="utf-8"))
+    quotes = sample["quoteResponse"]["result"]
+    return [
+        {**quotes[index % len(quotes)], "symbol": f"SYM{index}"}
+        for index in range(symbol_count)
+    ]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    quotes = build_quotes(SYMBOL_COUNT)
+    default_projector = QuoteProjector(
+        YahooSymbolUpdateCoordinator.build_request_fields({})
+    )
+
+    assert [parse_symbol_data(quote) for quote in quotes] == [
+        ALL_DATA_PROJECTOR.project(quote) for quote in quotes
+    ]
+
+    candidates = {
+        "previous parse_symbol_data": parse_symbol_data,
+        "projector, all groups": ALL_DATA_PROJECTOR.project,
+        "projector, default group": default_projector.project,
+    }
+
+    print(f"{SYMBOL_COUNT} symbols, best of {ROUNDS} rounds")
+    for name, project in candidates.items():
+        best = min(
+            timeit.repeat(
+                lambda project=project: [project(quote) for quote in quotes],
+                number=1,
+                repeat=ROUNDS,
+            )
+        )
+        print(
+            f"  {name:28} {best * 1000:7.2f} ms"
+            f" {best / SYMBOL_COUNT * 1e6:6.2f} us/symbol"
+        )
+
+
+def measure_memory(build) -> int:
+    """Return the bytes held by the result of build."""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main_records() -> None:
+    """Compare the projected dicts with the records."""
+    quotes = build_quotes(SYMBOL_COUNT)
+    records = [ALL_DATA_PROJECTOR.project_record(quote) for quote in quotes]
+
+    dict_size = measure_memory(
+        lambda: [ALL_DATA_PROJECTOR.project(quote) for quote in quotes]
+    )
+    record_size = measure_memory(
+        lambda: [ALL_DATA_PROJECTOR.project_record(quote) for quote in quotes]
+    )
+    print(f"Memory of {SYMBOL_COUNT} projected symbols")
+    print(f"  {'dicts':28} {dict_size / 1024:7.0f} KiB")
+    print(f"  {'records':28} {record_size / 1024:7.0f} KiB")
+
+    refresh_times = {
+        "new dicts": lambda: [ALL_DATA_PROJECTOR.project(quote) for quote in quotes],
+        "records updated in place": lambda: [
+            ALL_DATA_PROJECTOR.project_record(quote, record)
+            for (quote, record) in zip(quotes, records)
+        ],
+    }
+    print(f"Refresh of {SYMBOL_COUNT} symbols, best of {ROUNDS} rounds")
+    for name, refresh in refresh_times.items():
+        best = min(timeit.repeat(refresh, number=1, repeat=ROUNDS))
+        print(f"  {name:28} {best * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
+    main_records()
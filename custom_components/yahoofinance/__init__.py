@@ -5,8 +5,10 @@ https://github.com/iprak/yahoofinance
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 from datetime import timedelta
+import time
 
 import voluptuous as vol
 
@@ -14,49 +16,85 @@ from homeassistant.const import CONF_SCAN_INTERVAL, SERVICE_RELOAD, Platform
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import discovery, entity_registry as er
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.reload import async_integration_yaml_config
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CLOSED_MARKET_SCAN_INTERVAL,
+    CONF_COLUMNAR_STORE,
+    CONF_CRUMB_TIMEOUT,
     CONF_DECIMAL_PLACES,
+    CONF_HEDGE_REQUESTS,
     CONF_INCLUDE_DIVIDEND_VALUES,
     CONF_INCLUDE_FIFTY_DAY_VALUES,
     CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES,
     CONF_INCLUDE_POST_VALUES,
     CONF_INCLUDE_PRE_VALUES,
     CONF_INCLUDE_TWO_HUNDRED_DAY_VALUES,
+    CONF_MAX_PARALLEL_REQUESTS,
+    CONF_MAX_SYMBOLS_PER_REQUEST,
     CONF_NO_UNIT,
+    CONF_REQUEST_BURST,
+    CONF_REQUESTS_PER_MINUTE,
     CONF_SHOW_CURRENCY_SYMBOL_AS_UNIT,
     CONF_SHOW_OFF_MARKET_VALUES,
     CONF_SHOW_TRENDING_ICON,
+    CONF_STREAM_QUOTES,
     CONF_SYMBOLS,
     CONF_TARGET_CURRENCY,
+    CONF_TRIANGULATE_CONVERSIONS,
+    CONF_USER_AGENTS,
+    DEFAULT_CONF_ADAPTIVE_POLLING,
+    DEFAULT_CONF_CLOSED_MARKET_SCAN_INTERVAL,
+    DEFAULT_CONF_COLUMNAR_STORE,
+    DEFAULT_CONF_CRUMB_TIMEOUT,
     DEFAULT_CONF_DECIMAL_PLACES,
+    DEFAULT_CONF_HEDGE_REQUESTS,
     DEFAULT_CONF_INCLUDE_DIVIDEND_VALUES,
     DEFAULT_CONF_INCLUDE_FIFTY_DAY_VALUES,
     DEFAULT_CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES,
     DEFAULT_CONF_INCLUDE_POST_VALUES,
     DEFAULT_CONF_INCLUDE_PRE_VALUES,
     DEFAULT_CONF_INCLUDE_TWO_HUNDRED_DAY_VALUES,
+    DEFAULT_CONF_MAX_PARALLEL_REQUESTS,
+    DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST,
     DEFAULT_CONF_NO_UNIT,
+    DEFAULT_CONF_REQUEST_BURST,
+    DEFAULT_CONF_REQUESTS_PER_MINUTE,
     DEFAULT_CONF_SHOW_CURRENCY_SYMBOL_AS_UNIT,
     DEFAULT_CONF_SHOW_OFF_MARKET_VALUES,
     DEFAULT_CONF_SHOW_TRENDING_ICON,
+    DEFAULT_CONF_STREAM_QUOTES,
+    DEFAULT_CONF_TRIANGULATE_CONVERSIONS,
+    DEFAULT_CONF_USER_AGENTS,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     HASS_DATA_CONFIG,
+    HASS_DATA_CONVERSION_ENGINE,
     HASS_DATA_COORDINATORS,
+    HASS_DATA_CRUMB_COORDINATOR,
+    HASS_DATA_CURRENCY_CACHE,
+    HASS_DATA_QUOTE_STORE,
+    HASS_DATA_SCHEDULER,
+    HASS_DATA_STARTUP_TASK,
     LOGGER,
     MANUAL_SCAN_INTERVAL,
-    MAX_LINE_SIZE,
+    MARKET_OPEN_LEAD,
     MINIMUM_SCAN_INTERVAL,
+    PIVOT_CURRENCY,
     SERVICE_REFRESH,
 )
 from .coordinator import CrumbCoordinator, YahooSymbolUpdateCoordinator
+from .currency import CurrencyCache, CurrencyConversionEngine
 from .dataclasses import SymbolDefinition
+from .market import MarketHoursPolicy
+from .quotestore import NUMPY_AVAILABLE, ColumnarQuoteStore
+from .ratelimiter import RateLimiter
+from .scheduler import YahooSymbolScheduler
+from .transport import async_get_transport
+from .useragents import UserAgentSelector
 
 BASIC_SYMBOL_SCHEMA = vol.All(cv.string, vol.Upper)
 
@@ -84,6 +122,12 @@ COMPLEX_SYMBOL_SCHEMA = vol.All(
     ),
 )
 
+SERVICE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_SYMBOLS): vol.All(cv.ensure_list, [BASIC_SYMBOL_SCHEMA]),
+    }
+)
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
@@ -132,6 +176,47 @@ CONFIG_SCHEMA = vol.Schema(
                     CONF_SHOW_OFF_MARKET_VALUES,
                     default=DEFAULT_CONF_SHOW_OFF_MARKET_VALUES,
                 ): cv.boolean,
+                vol.Optional(
+                    CONF_MAX_SYMBOLS_PER_REQUEST,
+                    default=DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_MAX_PARALLEL_REQUESTS,
+                    default=DEFAULT_CONF_MAX_PARALLEL_REQUESTS,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_REQUESTS_PER_MINUTE,
+                    default=DEFAULT_CONF_REQUESTS_PER_MINUTE,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_REQUEST_BURST, default=DEFAULT_CONF_REQUEST_BURST
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_USER_AGENTS, default=DEFAULT_CONF_USER_AGENTS
+                ): vol.All(cv.ensure_list, [cv.string], vol.Length(min=1)),
+                vol.Optional(
+                    CONF_CRUMB_TIMEOUT, default=DEFAULT_CONF_CRUMB_TIMEOUT
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    CONF_HEDGE_REQUESTS, default=DEFAULT_CONF_HEDGE_REQUESTS
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_STREAM_QUOTES, default=DEFAULT_CONF_STREAM_QUOTES
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_COLUMNAR_STORE, default=DEFAULT_CONF_COLUMNAR_STORE
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_TRIANGULATE_CONVERSIONS,
+                    default=DEFAULT_CONF_TRIANGULATE_CONVERSIONS,
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_ADAPTIVE_POLLING, default=DEFAULT_CONF_ADAPTIVE_POLLING
+                ): cv.boolean,
+                vol.Optional(
+                    CONF_CLOSED_MARKET_SCAN_INTERVAL,
+                    default=DEFAULT_CONF_CLOSED_MARKET_SCAN_INTERVAL,
+                ): CUSTOM_SCAN_INTERVAL_SCHEMA,
             }
         )
     },
@@ -171,7 +256,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
     await _async_process_yaml(hass, config)
 
-    async def handle_refresh_symbols(_call: ServiceCall) -> None:
+    async def handle_refresh_symbols(call: ServiceCall) -> None:
         """Refresh symbol data."""
         LOGGER.info("Processing refresh_symbols")
 
@@ -179,9 +264,27 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         coordinators: dict[timedelta, YahooSymbolUpdateCoordinator] = hass.data[DOMAIN][
             HASS_DATA_COORDINATORS
         ]
-        if coordinators:
-            for coordinator in coordinators.values():
-                await coordinator.async_refresh()
+        if not coordinators:
+            return
+
+        # Only refresh the coordinators owning the symbols if they were specified
+        symbols: list[str] | None = call.data.get(CONF_SYMBOLS)
+        selected_coordinators = [
+            coordinator
+            for coordinator in coordinators.values()
+            if symbols is None or coordinator.has_any_symbol(symbols)
+        ]
+
+        domain_config = hass.data[DOMAIN][HASS_DATA_CONFIG]
+        semaphore = asyncio.Semaphore(domain_config[CONF_MAX_PARALLEL_REQUESTS])
+
+        async def _refresh(coordinator: YahooSymbolUpdateCoordinator) -> None:
+            async with semaphore:
+                await coordinator.async_refresh_coalesced()
+
+        await asyncio.gather(
+            *[_refresh(coordinator) for coordinator in selected_coordinators]
+        )
 
     async def _async_reload_service_handler(service: ServiceCall) -> None:
         """Handle reload service call."""
@@ -191,10 +294,16 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         if reload_config is None:
             return
 
+        _stop_scheduler(hass)
         _remove_all_existing_symbols(hass)
         await _async_process_yaml(hass, reload_config)
 
-    hass.services.async_register(DOMAIN, SERVICE_REFRESH, handle_refresh_symbols)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        handle_refresh_symbols,
+        schema=SERVICE_REFRESH_SCHEMA,
+    )
     hass.services.async_register(DOMAIN, SERVICE_RELOAD, _async_reload_service_handler)
     return True
 
@@ -232,55 +341,192 @@ async def _async_process_yaml(hass: HomeAssistant, config: ConfigType) -> None:
         HASS_DATA_CONFIG: domain_config,
     }
 
-    async def _setup_coordinators(now=None) -> None:
-        # Testing showed that the response header for initial request can up to 40KB
-        websession = async_create_clientsession(
-            hass, max_field_size=MAX_LINE_SIZE, max_line_size=MAX_LINE_SIZE
+    # Only the fields for the enabled data groups are requested
+    request_fields = YahooSymbolUpdateCoordinator.build_request_fields(domain_config)
+
+    # The transport and its connections are kept across reloads
+    transport = async_get_transport(hass)
+
+    # All requests to Yahoo go through one rate limiter
+    rate_limiter = RateLimiter(
+        domain_config[CONF_REQUESTS_PER_MINUTE], domain_config[CONF_REQUEST_BURST]
+    )
+
+    # Using a static instance to keep the last successful cookies.
+    crumb_coordinator = CrumbCoordinator.get_static_instance(
+        hass,
+        transport,
+        rate_limiter,
+        UserAgentSelector(hass, domain_config[CONF_USER_AGENTS]),
+        domain_config[CONF_CRUMB_TIMEOUT],
+    )
+    hass.data[DOMAIN][HASS_DATA_CRUMB_COORDINATOR] = crumb_coordinator
+
+    # Conversion rates are shared by all the sensors
+    conversion_engine = CurrencyConversionEngine(
+        hass,
+        domain_config[CONF_SHOW_OFF_MARKET_VALUES],
+        PIVOT_CURRENCY if domain_config[CONF_TRIANGULATE_CONVERSIONS] else None,
+    )
+    hass.data[DOMAIN][HASS_DATA_CONVERSION_ENGINE] = conversion_engine
+    hass.data[DOMAIN][HASS_DATA_CURRENCY_CACHE] = CurrencyCache(hass)
+
+    quote_store = _create_quote_store(domain_config, conversion_engine)
+    hass.data[DOMAIN][HASS_DATA_QUOTE_STORE] = quote_store
+
+    coordinators: dict[timedelta, YahooSymbolUpdateCoordinator] = {}
+    for key_scan_interval, symbols in symbols_by_scan_interval.items():
+        LOGGER.info(
+            "Creating coordinator with scan_interval %s for symbols %s",
+            key_scan_interval,
+            symbols,
+        )
+        coordinators[key_scan_interval] = YahooSymbolUpdateCoordinator(
+            symbols,
+            hass,
+            key_scan_interval,
+            crumb_coordinator,
+            transport.session,
+            max_symbols_per_request=domain_config[CONF_MAX_SYMBOLS_PER_REQUEST],
+            max_parallel_requests=domain_config[CONF_MAX_PARALLEL_REQUESTS],
+            fields=request_fields,
+            market_hours_policy=_create_market_hours_policy(domain_config),
+            hedge_requests=domain_config[CONF_HEDGE_REQUESTS],
+            stream_quotes=domain_config[CONF_STREAM_QUOTES],
+            quote_store=quote_store,
+            conversion_engine=conversion_engine,
         )
 
-        # Using a static instance to keep the last successful cookies.
-        crumb_coordinator = CrumbCoordinator.get_static_instance(hass, websession)
+    # Pass down the coordinator to platforms. The entities are added right away and
+    # remain unavailable till the initial data is received.
+    hass.data[DOMAIN][HASS_DATA_COORDINATORS] = coordinators
+    hass.async_create_task(
+        discovery.async_load_platform(hass, Platform.SENSOR, DOMAIN, {}, config)
+    )
+
+    # Crumb and initial data are requested in the background to not delay startup
+    hass.data[DOMAIN][HASS_DATA_STARTUP_TASK] = hass.async_create_background_task(
+        _async_start_coordinators(hass, crumb_coordinator, coordinators),
+        "yahoofinance startup",
+    )
+
+
+async def _async_start_coordinators(
+    hass: HomeAssistant,
+    crumb_coordinator: CrumbCoordinator,
+    coordinators: dict[timedelta, YahooSymbolUpdateCoordinator],
+) -> None:
+    """Get crumb, request initial data for all the coordinators and start scheduler."""
+    start_time = time.monotonic()
+
+    await crumb_coordinator.user_agents.async_load()
+
+    # Conversion symbols of the cached currencies are requested with the initial data
+    currency_cache: CurrencyCache = hass.data[DOMAIN][HASS_DATA_CURRENCY_CACHE]
+    await currency_cache.async_load()
+    _add_cached_conversion_symbols(hass, coordinators, currency_cache)
+
+    # Get crumb first, data requests made meanwhile share this acquisition
+    crumb = await crumb_coordinator.async_get_crumb(wait_for_completion=True)
+    while crumb is None:
+        delay = max(crumb_coordinator.backoff_time, 1)
+        LOGGER.warning("Unable to get crumb, re-trying in %d seconds", delay)
+        await asyncio.sleep(delay)
+        crumb = await crumb_coordinator.async_get_crumb(wait_for_completion=True)
+
+    crumb_time = time.monotonic()
+
+    # Keep the crumb fresh so that data requests don't wait for the handshake
+    crumb_coordinator.async_start_renewal()
+
+    async def _async_initial_refresh(
+        scan_interval: timedelta, coordinator: YahooSymbolUpdateCoordinator
+    ) -> None:
+        refresh_start_time = time.monotonic()
+        await coordinator.async_refresh()
+        LOGGER.debug(
+            "Initial data for coordinator with update interval of %s took %.3f seconds",
+            scan_interval,
+            time.monotonic() - refresh_start_time,
+        )
 
-        crumb = await crumb_coordinator.try_get_crumb_cookies()  # Get crumb first
-        if crumb is None:
-            delay = crumb_coordinator.retry_duration
-            LOGGER.warning("Unable to get crumb, re-trying in %d seconds", delay)
-            async_call_later(hass, delay, _setup_coordinators)
-            return
+    LOGGER.info("Requesting initial data for %d coordinators", len(coordinators))
+    await asyncio.gather(
+        *[
+            _async_initial_refresh(scan_interval, coordinator)
+            for scan_interval, coordinator in coordinators.items()
+        ]
+    )
 
-        coordinators: dict[timedelta, YahooSymbolUpdateCoordinator] = {}
-        for key_scan_interval, symbols in symbols_by_scan_interval.items():
-            LOGGER.info(
-                "Creating coordinator with scan_interval %s for symbols %s",
-                key_scan_interval,
-                symbols,
-            )
-            coordinator = YahooSymbolUpdateCoordinator(
-                symbols, hass, key_scan_interval, crumb_coordinator, websession
-            )
-            coordinators[key_scan_interval] = coordinator
+    refresh_time = time.monotonic()
+
+    # A single timer drives all the timed coordinators and merges their requests
+    scheduler = YahooSymbolScheduler(hass, list(coordinators.values()))
+    hass.data[DOMAIN][HASS_DATA_SCHEDULER] = scheduler
+    scheduler.async_start()
 
-            LOGGER.info(
-                "Requesting initial data from coordinator with update interval of %s",
-                key_scan_interval,
+    for coordinator in coordinators.values():
+        if not coordinator.last_update_success:
+            LOGGER.debug(
+                "Coordinator did not report any data, requesting async_refresh"
             )
-            await coordinator.async_refresh()
+            hass.async_create_task(coordinator.async_request_refresh())
 
-        # Pass down the coordinator to platforms.
-        hass.data[DOMAIN][HASS_DATA_COORDINATORS] = coordinators
+    LOGGER.info(
+        "Startup took %.3f seconds (crumb %.3f seconds, initial data %.3f seconds)",
+        refresh_time - start_time,
+        crumb_time - start_time,
+        refresh_time - crumb_time,
+    )
 
-        for coordinator in coordinators.values():
-            if not coordinator.last_update_success:
-                LOGGER.debug(
-                    "Coordinator did not report any data, requesting async_refresh"
-                )
-                hass.async_create_task(coordinator.async_request_refresh())
 
-        hass.async_create_task(
-            discovery.async_load_platform(hass, Platform.SENSOR, DOMAIN, {}, config)
-        )
+def _create_market_hours_policy(domain_config: dict) -> MarketHoursPolicy | None:
+    """Create the market hours policy if adaptive polling is enabled."""
+    if not domain_config[CONF_ADAPTIVE_POLLING]:
+        return None
 
-    await _setup_coordinators()
+    return MarketHoursPolicy(
+        domain_config[CONF_CLOSED_MARKET_SCAN_INTERVAL], MARKET_OPEN_LEAD
+    )
+
+
+def _add_cached_conversion_symbols(
+    hass: HomeAssistant,
+    coordinators: dict[timedelta, YahooSymbolUpdateCoordinator],
+    currency_cache: CurrencyCache,
+) -> None:
+    """Add the conversion symbols of the symbols with a cached currency."""
+    domain_config = hass.data[DOMAIN][HASS_DATA_CONFIG]
+    conversion_engine: CurrencyConversionEngine = hass.data[DOMAIN][
+        HASS_DATA_CONVERSION_ENGINE
+    ]
+
+    symbol_definition: SymbolDefinition
+    for symbol_definition in domain_config[CONF_SYMBOLS]:
+        currency = currency_cache.get(symbol_definition.symbol)
+        if not symbol_definition.target_currency or currency is None:
+            continue
+
+        # The symbols are added to the coordinator of the converted symbol
+        coordinator = coordinators[symbol_definition.scan_interval]
+        for conversion_symbol in conversion_engine.get_conversion_symbols(
+            currency, symbol_definition.target_currency
+        ):
+            coordinator.add_symbol(conversion_symbol, request_refresh=False)
+
+
+def _create_quote_store(
+    domain_config: dict, conversion_engine: CurrencyConversionEngine
+) -> ColumnarQuoteStore | None:
+    """Create the columnar quote store if it is enabled and numpy is available."""
+    if not domain_config[CONF_COLUMNAR_STORE]:
+        return None
+
+    if not NUMPY_AVAILABLE:
+        LOGGER.warning("numpy is not installed, %s is ignored", CONF_COLUMNAR_STORE)
+        return None
+
+    return ColumnarQuoteStore.from_config(domain_config, conversion_engine)
 
 
 def convert_to_float(value) -> float | None:
@@ -291,6 +537,25 @@ def convert_to_float(value) -> float | None:
         return None
 
 
+def _stop_scheduler(hass: HomeAssistant) -> None:
+    """Stop the existing scheduler, crumb renewal and any startup still in progress."""
+    startup_task: asyncio.Task | None = hass.data[DOMAIN].get(HASS_DATA_STARTUP_TASK)
+    if startup_task is not None and not startup_task.done():
+        startup_task.cancel()
+
+    crumb_coordinator: CrumbCoordinator | None = hass.data[DOMAIN].get(
+        HASS_DATA_CRUMB_COORDINATOR
+    )
+    if crumb_coordinator is not None:
+        crumb_coordinator.async_stop_renewal()
+
+    scheduler: YahooSymbolScheduler | None = hass.data[DOMAIN].get(
+        HASS_DATA_SCHEDULER
+    )
+    if scheduler is not None:
+        scheduler.async_stop()
+
+
 def _remove_all_existing_symbols(hass: HomeAssistant) -> None:
     """Remove all exisiting symbols."""
     coordinators: dict[timedelta, YahooSymbolUpdateCoordinator] = hass.data[DOMAIN][
@@ -0,0 +1,151 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from email.utils import parsedate_to_datetime
+from enum import StrEnum
+import random
+import time
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CIRCUIT_BREAKER_BASE_DELAY,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_MAX_DELAY,
+    LOGGER,
+)
+
+
+class CircuitState(StrEnum):
+    """Circuit breaker state."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse the Retry-After header value (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_time.tzinfo is None:
+        return None
+
+    return max(0.0, (retry_time - dt_util.utcnow()).total_seconds())
+
+
+class CircuitBreaker:
+    """Circuit breaker for requests to a host.
+
+    The breaker opens after consecutive failures (429/5xx responses, timeouts and
+    connection errors), or right away if the host asked for a pause through
+    Retry-After. Requests are not made while it is open. Once the pause is over one
+    trial request is allowed (half-open), its success closes the breaker and its
+    failure opens it again for a longer pause.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        base_delay: float = CIRCUIT_BREAKER_BASE_DELAY,
+        max_delay: float = CIRCUIT_BREAKER_MAX_DELAY,
+    ) -> None:
+        """Initialize."""
+        self.host = host
+        self._failure_threshold = failure_threshold
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+        self._state = CircuitState.CLOSED
+        self._failure_count = 0
+        self._open_count = 0
+        """Number of times the breaker opened since it was last closed."""
+        self._open_until = 0.0
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the current state."""
+        if self._state == CircuitState.OPEN and time.monotonic() >= self._open_until:
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    @property
+    def remaining_time(self) -> float:
+        """Return the seconds for which requests are still paused."""
+        if self._state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Check if a request can be made, claiming the trial request if half-open."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.OPEN or self._trial_in_progress:
+            return False
+
+        self._state = CircuitState.HALF_OPEN
+        self._trial_in_progress = True
+        LOGGER.debug("Circuit breaker for %s is half-open, allowing trial", self.host)
+        return True
+
+    def record_success(self) -> None:
+        """Record a successful response and close the breaker."""
+        if self._state != CircuitState.CLOSED:
+            LOGGER.info("Circuit breaker for %s closed", self.host)
+
+        self._state = CircuitState.CLOSED
+        self._failure_count = 0
+        self._open_count = 0
+        self._trial_in_progress = False
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Record a failure, opening the breaker if needed."""
+        self._failure_count += 1
+        self._trial_in_progress = False
+
+        if (
+            retry_after is not None
+            or self._state == CircuitState.HALF_OPEN
+            or self._failure_count >= self._failure_threshold
+        ):
+            self._open(retry_after)
+
+    def release(self) -> None:
+        """Release the trial request which ended without a response."""
+        self._trial_in_progress = False
+
+    def _open(self, retry_after: float | None) -> None:
+        """Open the breaker for Retry-After or a jittered exponential backoff."""
+        if retry_after is not None:
+            delay = max(1.0, retry_after)
+        else:
+            delay = min(self._max_delay, self._base_delay * 2**self._open_count)
+            delay = delay / 2 + random.uniform(0, delay / 2)
+
+        self._open_count += 1
+        self._state = CircuitState.OPEN
+        self._open_until = time.monotonic() + delay
+
+        LOGGER.warning(
+            "Pausing requests to %s for %d seconds after %d failures",
+            self.host,
+            delay,
+            self._failure_count,
+        )
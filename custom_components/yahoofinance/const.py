@@ -28,6 +28,17 @@ ATTR_DIVIDEND_YIELD: Final = "dividendYield"
 # Hass data
 HASS_DATA_CONFIG: Final = "config"
 HASS_DATA_COORDINATORS: Final = "coordinators"
+HASS_DATA_SCHEDULER: Final = "scheduler"
+HASS_DATA_STARTUP_TASK: Final = "startup_task"
+HASS_DATA_CRUMB_COORDINATOR: Final = "crumb_coordinator"
+HASS_DATA_QUOTE_STORE: Final = "quote_store"
+HASS_DATA_CONVERSION_ENGINE: Final = "conversion_engine"
+HASS_DATA_CURRENCY_CACHE: Final = "currency_cache"
+
+STORAGE_VERSION: Final = 1
+STORAGE_KEY_USER_AGENTS: Final = "yahoofinance.user_agents"
+STORAGE_KEY_CRUMB: Final = "yahoofinance.crumb"
+STORAGE_KEY_CURRENCIES: Final = "yahoofinance.currencies"
 
 # JSON data pieces
 DATA_CURRENCY_SYMBOL: Final = "currency"
@@ -52,6 +63,12 @@ DATA_POST_MARKET_PRICE: Final = "postMarketPrice"
 DATA_PRE_MARKET_STATE: Final = "PRE"
 DATA_POST_MARKET_STATE: Final = "POST"
 
+CLOSED_MARKET_STATES: Final = ["CLOSED", "PREPRE", "POSTPOST"]
+"""Market states in which there is no trading."""
+
+ALWAYS_OPEN_QUOTE_TYPES: Final = ["CRYPTOCURRENCY", "CURRENCY"]
+"""Quote types which trade around the clock."""
+
 CONF_DECIMAL_PLACES: Final = "decimal_places"
 CONF_INCLUDE_FIFTY_DAY_VALUES: Final = "include_fifty_day_values"
 CONF_INCLUDE_POST_VALUES: Final = "include_post_values"
@@ -64,6 +81,18 @@ CONF_SHOW_CURRENCY_SYMBOL_AS_UNIT = "show_currency_symbol_as_unit"
 CONF_SHOW_OFF_MARKET_VALUES= "show_off_market_values"
 CONF_TARGET_CURRENCY: Final = "target_currency"
 CONF_NO_UNIT: Final = "no_unit"
+CONF_MAX_SYMBOLS_PER_REQUEST: Final = "max_symbols_per_request"
+CONF_MAX_PARALLEL_REQUESTS: Final = "max_parallel_requests"
+CONF_REQUESTS_PER_MINUTE: Final = "requests_per_minute"
+CONF_REQUEST_BURST: Final = "request_burst"
+CONF_USER_AGENTS: Final = "user_agents"
+CONF_CRUMB_TIMEOUT: Final = "crumb_timeout"
+CONF_HEDGE_REQUESTS: Final = "hedge_requests"
+CONF_STREAM_QUOTES: Final = "stream_quotes"
+CONF_COLUMNAR_STORE: Final = "columnar_store"
+CONF_TRIANGULATE_CONVERSIONS: Final = "triangulate_conversions"
+CONF_ADAPTIVE_POLLING: Final = "adaptive_polling"
+CONF_CLOSED_MARKET_SCAN_INTERVAL: Final = "closed_market_scan_interval"
 
 DEFAULT_CONF_DECIMAL_PLACES: Final = 2
 
@@ -79,6 +108,38 @@ DEFAULT_CONF_SHOW_CURRENCY_SYMBOL_AS_UNIT: Final = False
 DEFAULT_CONF_SHOW_OFF_MARKET_VALUES = False
 DEFAULT_CONF_NO_UNIT: Final = False
 
+DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST: Final = 100
+"""Symbols are split into shards of this size, each shard is a separate request."""
+
+DEFAULT_CONF_MAX_PARALLEL_REQUESTS: Final = 4
+"""Maximum number of shard requests in flight at the same time."""
+
+DEFAULT_CONF_REQUESTS_PER_MINUTE: Final = 60
+"""Rate at which requests can be made to Yahoo."""
+
+DEFAULT_CONF_REQUEST_BURST: Final = 10
+"""Number of requests which can be made at once before the rate applies."""
+
+DEFAULT_CONF_CRUMB_TIMEOUT: Final = 30
+"""Seconds a data request waits for the crumb being acquired."""
+
+DEFAULT_CONF_HEDGE_REQUESTS: Final = False
+DEFAULT_CONF_STREAM_QUOTES: Final = False
+DEFAULT_CONF_COLUMNAR_STORE: Final = False
+DEFAULT_CONF_TRIANGULATE_CONVERSIONS: Final = False
+
+REQUEST_PRIORITY_HIGH: Final = 0
+"""Priority of price and crumb requests."""
+
+REQUEST_PRIORITY_LOW: Final = 10
+"""Priority of requests which can wait behind price requests."""
+
+DEFAULT_CONF_ADAPTIVE_POLLING: Final = False
+DEFAULT_CONF_CLOSED_MARKET_SCAN_INTERVAL: Final = timedelta(hours=1)
+
+MARKET_OPEN_LEAD: Final = timedelta(minutes=15)
+"""Normal update interval is resumed this long before the expected market open."""
+
 DEFAULT_NUMERIC_DATA_GROUP: Final = "default"
 
 EVENT_DATA_UPDATED: Final = "yahoofinance_data_updated"
@@ -162,6 +223,16 @@ STRING_DATA_KEYS: Final = [
     DATA_MARKET_STATE,
 ]
 
+# Keys always requested from the quote endpoint, these are needed internally
+# irrespective of the configured groups.
+REQUIRED_DATA_KEYS: Final = [
+    ATTR_SYMBOL,
+    *STRING_DATA_KEYS,
+    DATA_REGULAR_MARKET_PRICE,
+    DATA_REGULAR_MARKET_PREVIOUS_CLOSE,
+    DATA_REGULAR_MARKET_TIME,
+]
+
 # Keys of date type values
 DATE_DATA_KEYS: Final = [DATA_DIVIDEND_DATE]
 
@@ -173,7 +244,15 @@ TIME_PRICE_DATA_DICT: Final = {
 }
 
 ATTRIBUTION: Final = "Data provided by Yahoo Finance"
-BASE: Final = "https://query1.finance.yahoo.com/v7/finance/quote?symbols="
+QUOTE_PATH: Final = "/v7/finance/quote?symbols="
+QUOTE_HOSTS: Final = ["query1.finance.yahoo.com", "query2.finance.yahoo.com"]
+"""Hosts serving quotes, the first one is preferred till latency is known."""
+
+QUOTE_BASES: Final = [f"https://{host}{QUOTE_PATH}" for host in QUOTE_HOSTS]
+BASE: Final = QUOTE_BASES[0]
+
+HOST_PROBE_INTERVAL: Final = 600
+"""Seconds after which an unused quote host gets a request to refresh its latency and health."""
 
 INITIAL_URL: Final = "https://finance.yahoo.com/quote/NQ%3DF/"
 CONSENT_HOST: Final = "consent.yahoo.com"
@@ -191,6 +270,41 @@ USER_AGENTS_FOR_XHR: Final = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
 ]
 
+DEFAULT_CONF_USER_AGENTS: Final = USER_AGENTS_FOR_XHR
+
+USER_AGENT_EXPLORATION_RATE: Final = 0.1
+"""Fraction of requests which try an agent other than the best scoring one first."""
+
+USER_AGENT_STATS_ALPHA: Final = 0.2
+"""Weight of the latest result in the user agent rate and latency averages."""
+
+USER_AGENT_STATS_SAVE_DELAY: Final = 60
+"""Seconds after which updated user agent stats are saved."""
+
+HEDGE_LATENCY_FACTOR: Final = 2
+"""Multiple of the agent latency after which another agent is tried in parallel."""
+
+HEDGE_DEFAULT_DELAY: Final = 1.0
+"""Seconds after which another agent is tried if the agent latency is not known."""
+
+HEDGE_MIN_DELAY: Final = 0.25
+HEDGE_MAX_DELAY: Final = 5.0
+
+HEDGE_PERCENTILE: Final = 0.95
+"""Latency percentile after which a duplicate data request is sent."""
+
+TIMEOUT_PERCENTILE: Final = 0.99
+"""Latency percentile from which the request timeout is derived."""
+
+LATENCY_TIMEOUT_FACTOR: Final = 3
+"""Multiple of the TIMEOUT_PERCENTILE latency used as request timeout."""
+
+LATENCY_MIN_TIMEOUT: Final = 2
+"""Minimum seconds of the latency derived request timeout."""
+
+LATENCY_MIN_SAMPLES: Final = 20
+"""Number of latency samples needed before timeout and hedging adapt to them."""
+
 XHR_REQUEST_HEADERS: Final = {
     "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
     "accept-encoding": "gzip,deflate,br,zstd",
@@ -200,6 +314,16 @@ XHR_REQUEST_HEADERS: Final = {
 
 CONF_SYMBOLS: Final = "symbols"
 DEFAULT_CURRENCY: Final = "USD"
+
+MINOR_CURRENCY_UNITS: Final = {"GBp": ("GBP", 0.01)}
+"""Major currency and multiplier of the minor currency units quoted by Yahoo."""
+
+PIVOT_CURRENCY: Final = "USD"
+"""Currency through which the cross rates are derived when triangulating."""
+
+CURRENCY_CACHE_SAVE_DELAY: Final = 60
+"""Seconds after which changed symbol currencies are saved."""
+
 DEFAULT_CURRENCY_SYMBOL: Final = "$"
 DOMAIN: Final = "yahoofinance"
 SERVICE_REFRESH: Final = "refresh_symbols"
@@ -214,12 +338,57 @@ CRUMB_RETRY_DELAY: Final = 15
 CRUMB_RETRY_DELAY_429: Final = 60
 """Duration for crumb re-try when receiving 429 code."""
 
+CRUMB_MAX_AGE: Final = timedelta(hours=12)
+"""Age after which the crumb is renewed in the background."""
+
+CRUMB_CHECK_INTERVAL: Final = timedelta(minutes=15)
+"""Interval at which the crumb age is checked."""
+
 TOO_MANY_CRUMB_RETRY_FAILURES_DELAY: Final = 300
 TOO_MANY_CRUMB_RETRY_FAILURES_COUNT: Final = 5
 
+RETRY_JITTER: Final = 0.5
+"""Fraction of the retry duration added as random jitter."""
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD: Final = 2
+"""Consecutive request failures after which requests to a host are paused."""
+
+CIRCUIT_BREAKER_BASE_DELAY: Final = 30
+"""Seconds for which requests are paused when the circuit breaker opens first."""
+
+CIRCUIT_BREAKER_MAX_DELAY: Final = 900
+"""Maximum seconds for which requests are paused by the circuit breaker."""
+
 MAX_LINE_SIZE: Final = 8190 * 5
 """Overide the default aiohttp max line size to avoid `Got more than 8190 byte` error."""
 
+CONNECTION_LIMIT: Final = 20
+"""Maximum number of connections to all the Yahoo hosts."""
+
+CONNECTION_LIMIT_PER_HOST: Final = 8
+"""Maximum number of connections to each Yahoo host (query1, query2, consent)."""
+
+CONNECTION_KEEPALIVE: Final = 120
+"""Seconds an idle connection is kept open for reuse."""
+
+STREAM_CHUNK_SIZE: Final = 64 * 1024
+"""Bytes read at a time from a streamed quote response."""
+
+JSON_EXECUTOR_THRESHOLD: Final = 256 * 1024
+"""Response bodies of at least these many bytes are decoded in the executor."""
+
+PREWARM_LEAD: Final = timedelta(seconds=10)
+"""Duration before a scheduled update at which the connection to the quote host is opened."""
+
+DNS_CACHE_TTL: Final = 600
+"""Seconds for which host name resolution is cached."""
+
+COOKIE_DOMAIN: Final = "yahoo.com"
+"""Domain of the stored cookies, they are sent to all the Yahoo hosts."""
+
+HASS_DATA_TRANSPORT: Final = "yahoofinance_transport"
+"""Key of the transport in hass.data, it is kept across configuration reloads."""
+
 CURRENCY_CODES: Final = {
     "aud": "$",
     "bdt": "৳",
@@ -6,39 +6,77 @@ https://github.com/iprak/yahoofinance
 from __future__ import annotations
 
 import asyncio
-from datetime import timedelta
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
 from http import HTTPStatus
 from http.cookies import SimpleCookie
+import random
 import re
+import time
 from typing import Any, Final
+from urllib.parse import urlsplit
 
 import aiohttp
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers import event
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
 
+from .circuitbreaker import CircuitBreaker, CircuitState, parse_retry_after
 from .const import (
+    ATTR_SYMBOL,
     BASE,
+    CONF_SHOW_OFF_MARKET_VALUES,
     CONSENT_HOST,
+    CRUMB_CHECK_INTERVAL,
+    CRUMB_MAX_AGE,
     CRUMB_RETRY_DELAY,
     CRUMB_RETRY_DELAY_429,
     DATA_REGULAR_MARKET_PRICE,
+    DEFAULT_CONF_CRUMB_TIMEOUT,
+    DEFAULT_CONF_HEDGE_REQUESTS,
+    DEFAULT_CONF_MAX_PARALLEL_REQUESTS,
+    DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST,
+    DEFAULT_CONF_REQUEST_BURST,
+    DEFAULT_CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_CONF_STREAM_QUOTES,
+    DEFAULT_CONF_USER_AGENTS,
+    DEFAULT_NUMERIC_DATA_GROUP,
     EVENT_DATA_UPDATED,
     GET_CRUMB_URL,
     INITIAL_REQUEST_HEADERS,
     INITIAL_URL,
+    JSON_EXECUTOR_THRESHOLD,
     LOGGER,
     MANUAL_SCAN_INTERVAL,
-    NUMERIC_DATA_DEFAULTS,
     NUMERIC_DATA_GROUPS,
-    STRING_DATA_KEYS,
+    QUOTE_BASES,
+    REQUEST_PRIORITY_LOW,
+    REQUIRED_DATA_KEYS,
+    RETRY_JITTER,
+    STORAGE_KEY_CRUMB,
+    STORAGE_VERSION,
+    STREAM_CHUNK_SIZE,
+    TIME_PRICE_DATA_DICT,
     TOO_MANY_CRUMB_RETRY_FAILURES_COUNT,
     TOO_MANY_CRUMB_RETRY_FAILURES_DELAY,
-    USER_AGENTS_FOR_XHR,
-    XHR_REQUEST_HEADERS,
 )
+from .currency import CurrencyConversionEngine
 from .dataclasses import ConsentData
+from .hostpool import QuoteHostPool
+from .latency import LatencyHistogram
+from .market import MarketHoursPolicy
+from .projector import ALL_DATA_PROJECTOR, QuoteProjector
+from .quotestore import ColumnarQuoteStore
+from .quotestream import QuoteStreamParser
+from .ratelimiter import RateLimiter
+from .transport import YahooTransport
+from .useragents import UserAgentSelector
 
 REQUEST_TIMEOUT: Final = 10
 DELAY_ASYNC_REQUEST_REFRESH: Final = 5
@@ -51,14 +89,18 @@ class CrumbCoordinator:
     _instance = None
     """Static instance of CrumbCoordinator."""
 
-    preferred_user_agent = ""
-    """The preferred (last successeful) user agent."""
-
-    def __init__(self, hass: HomeAssistant, websession: aiohttp.ClientSession) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        transport: YahooTransport,
+        rate_limiter: RateLimiter | None = None,
+        user_agents: UserAgentSelector | None = None,
+        acquire_timeout: float = DEFAULT_CONF_CRUMB_TIMEOUT,
+    ) -> None:
         """Initialize."""
 
         self.cookies: SimpleCookie[str] = None
-        """Cookies for requests."""
+        """Cookies obtained with the crumb, the transport cookie jar sends them with requests."""
         self.crumb: str | None = None
         """Crumb for requests."""
         self._hass = hass
@@ -67,23 +109,257 @@ class CrumbCoordinator:
         """Crumb retry request delay."""
 
         self._crumb_retry_count = 0
-        self._websession = websession
+        self.transport = transport
+        """Transport for the requests, the cookies are kept in its cookie jar."""
+
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY_CRUMB
+        )
+        self._restore_attempted = False
+        self._consent_given = False
+
+        self._crumb_time: datetime | None = None
+        """Time at which the crumb was obtained."""
+
+        self.acquire_timeout = acquire_timeout
+        """Seconds callers wait for the crumb being acquired."""
+        self._acquire_task: asyncio.Task[str | None] | None = None
+        self._backoff_until = 0.0
+        """Monotonic time till which crumb acquisition is not attempted."""
+        self._renewal_task: asyncio.Task | None = None
+        self._unsub_renewal_check: CALLBACK_TYPE | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+        self.rate_limiter = rate_limiter or RateLimiter(
+            DEFAULT_CONF_REQUESTS_PER_MINUTE, DEFAULT_CONF_REQUEST_BURST
+        )
+        """Rate limiter which all the Yahoo requests go through."""
+
+        self.user_agents = user_agents or UserAgentSelector(
+            hass, DEFAULT_CONF_USER_AGENTS
+        )
+        """Selector of the user agent for XHR requests."""
+
+        self._circuit_breakers: dict[str, CircuitBreaker] = {}
+        """Circuit breakers by host (and port)."""
+
+        self._latency_histograms: dict[str, LatencyHistogram] = {}
+        """Request latency histograms by endpoint."""
+
+        self.host_pool = QuoteHostPool(
+            QUOTE_BASES, self.get_circuit_breaker, self.get_latency_histogram
+        )
+        """Hosts serving quotes."""
 
     @staticmethod
     def get_static_instance(
-        hass: HomeAssistant, websession: aiohttp.ClientSession
+        hass: HomeAssistant,
+        transport: YahooTransport,
+        rate_limiter: RateLimiter | None = None,
+        user_agents: UserAgentSelector | None = None,
+        acquire_timeout: float | None = None,
     ) -> CrumbCoordinator:
         """Get the singleton static CrumbCoordinator instance."""
-        if CrumbCoordinator._instance is None:
-            CrumbCoordinator._instance = CrumbCoordinator(hass, websession)
-        return CrumbCoordinator._instance
+        instance = CrumbCoordinator._instance
+
+        # A new instance is needed for a different Home Assistant instance
+        if instance is None or instance._hass is not hass:  # noqa: SLF001
+            instance = CrumbCoordinator(hass, transport, rate_limiter, user_agents)
+            CrumbCoordinator._instance = instance
+
+            if acquire_timeout is not None:
+                instance.acquire_timeout = acquire_timeout
+        else:
+            # Use the latest configuration after a reload
+            instance.transport = transport
+            if rate_limiter is not None:
+                instance.rate_limiter = rate_limiter
+            if user_agents is not None:
+                instance.user_agents = user_agents
+            if acquire_timeout is not None:
+                instance.acquire_timeout = acquire_timeout
+
+        return instance
+
+    def get_circuit_breaker(self, url: str) -> CircuitBreaker:
+        """Get the circuit breaker for the host (and port) of the url."""
+        host = urlsplit(url).netloc
+        breaker = self._circuit_breakers.get(host)
+        if breaker is None:
+            breaker = self._circuit_breakers[host] = CircuitBreaker(host)
+        return breaker
+
+    def get_latency_histogram(self, url: str) -> LatencyHistogram:
+        """Get the latency histogram for the endpoint (host and path) of the url."""
+        parts = urlsplit(url)
+        endpoint = parts.netloc + parts.path
+        histogram = self._latency_histograms.get(endpoint)
+        if histogram is None:
+            histogram = self._latency_histograms[endpoint] = LatencyHistogram()
+        return histogram
 
     def reset(self) -> None:
         """Reset crumb and cookies."""
         self.crumb = self.cookies = None
+        self.transport.set_cookies(None)
+
+    @property
+    def backoff_time(self) -> float:
+        """Return the seconds for which crumb acquisition is not attempted."""
+        return max(0.0, self._backoff_until - time.monotonic())
+
+    async def async_get_crumb(self, wait_for_completion: bool = False) -> str | None:
+        """Return the crumb, acquiring it if there is none.
+
+        Concurrent callers share a single acquisition. The wait is limited to
+        acquire_timeout unless wait_for_completion is set. None is returned without
+        any request while backing off from a failure.
+        """
+        if self.crumb is not None:
+            return self.crumb
+
+        if self._acquire_task is None:
+            backoff_time = self.backoff_time
+            if backoff_time > 0:
+                LOGGER.debug("Crumb acquisition backing off for %d seconds", backoff_time)
+                return None
+
+            self._acquire_task = self._hass.async_create_background_task(
+                self._async_acquire(), "yahoofinance crumb acquisition"
+            )
+
+        timeout = None if wait_for_completion else self.acquire_timeout
+
+        try:
+            # Shielded so that a caller timing out doesn't cancel the acquisition
+            async with asyncio.timeout(timeout):
+                return await asyncio.shield(self._acquire_task)
+        except TimeoutError:
+            LOGGER.warning("Timed out waiting %d seconds for crumb", timeout)
+            return None
+
+    async def _async_acquire(self) -> str | None:
+        """Acquire crumb and cookies, backing off after a failure."""
+        try:
+            crumb = await self.try_get_crumb_cookies()
+            if crumb is None:
+                self._backoff_until = time.monotonic() + self.retry_duration
+            return crumb
+        finally:
+            self._acquire_task = None
+
+    @property
+    def crumb_age(self) -> timedelta | None:
+        """Return the age of the crumb, None if there is no crumb."""
+        if self.crumb is None or self._crumb_time is None:
+            return None
+        return dt_util.utcnow() - self._crumb_time
+
+    @callback
+    def async_start_renewal(self) -> None:
+        """Start checking the crumb age periodically."""
+        if self._unsub_renewal_check is not None:
+            return
+
+        self._unsub_renewal_check = event.async_track_time_interval(
+            self._hass, self._async_check_crumb_age, CRUMB_CHECK_INTERVAL
+        )
+        self._unsub_stop = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+
+    @callback
+    def async_stop_renewal(self) -> None:
+        """Stop checking the crumb age and cancel any renewal in progress."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+        if self._unsub_renewal_check is not None:
+            self._unsub_renewal_check()
+            self._unsub_renewal_check = None
+
+        if self._renewal_task is not None:
+            self._renewal_task.cancel()
+            self._renewal_task = None
+
+    @callback
+    def _async_handle_stop(self, _event: Event) -> None:
+        """Stop the renewal when Home Assistant stops."""
+        self._unsub_stop = None
+        self.async_stop_renewal()
+
+    @callback
+    def _async_check_crumb_age(self, _now: datetime) -> None:
+        """Renew the crumb if it is getting old."""
+        crumb_age = self.crumb_age
+        if crumb_age is not None and crumb_age >= CRUMB_MAX_AGE:
+            LOGGER.debug("Crumb is %s old, renewing", crumb_age)
+            self.async_request_renewal()
+
+    @callback
+    def async_request_renewal(self) -> None:
+        """Renew the crumb in the background, the current crumb is used till then.
+
+        The renewal is the single in-flight crumb acquisition, it is not started
+        while another acquisition is in progress or while backing off from a failure.
+        """
+        if self._acquire_task is not None:
+            LOGGER.debug("Crumb acquisition in progress, renewal not needed")
+            return
+
+        backoff_time = self.backoff_time
+        if backoff_time > 0:
+            LOGGER.debug("Crumb renewal backing off for %d seconds", backoff_time)
+            return
+
+        self._renewal_task = self._hass.async_create_background_task(
+            self._async_renew(), "yahoofinance crumb renewal"
+        )
+        self._acquire_task = self._renewal_task
+
+    async def _async_renew(self) -> str | None:
+        """Get a new crumb and cookies and swap them in together."""
+        # The handshake is made on a separate instance with its own cookie jar so
+        # that the current crumb and cookies remain usable till the new ones are
+        # available.
+        transport = self.transport.fork()
+        try:
+            renewal = CrumbCoordinator(
+                self._hass, transport, self.rate_limiter, self.user_agents
+            )
+            renewal._circuit_breakers = self._circuit_breakers  # noqa: SLF001
+            renewal._restore_attempted = True  # noqa: SLF001
+
+            crumb = await renewal.try_get_crumb_cookies()
+            if not crumb:
+                LOGGER.warning("Crumb renewal failed, keeping the current crumb")
+                self._backoff_until = time.monotonic() + self.retry_duration
+                return self.crumb
+
+            (self.crumb, self.cookies, self._crumb_time, self._consent_given) = (
+                crumb,
+                renewal.cookies,
+                renewal._crumb_time,  # noqa: SLF001
+                renewal._consent_given,  # noqa: SLF001
+            )
+            self.transport.set_cookies(transport.get_cookies())
+            LOGGER.info("Crumb renewed")
+            return crumb
+        finally:
+            self._acquire_task = self._renewal_task = None
+            await transport.async_close(close_connector=False)
 
     async def try_get_crumb_cookies(self) -> str | None:
-        """Try to get crumb and cookies for data requests."""
+        """Try to get crumb and cookies for data requests.
+
+        The crumb and cookies stored by the previous run are tried first.
+        """
+
+        if not self._restore_attempted:
+            self._restore_attempted = True
+            if await self.async_restore_crumb():
+                return self.crumb
 
         consent_data = await self.initial_navigation(INITIAL_URL)
         if consent_data is None:  # Consent check failed
@@ -108,9 +384,72 @@ class CrumbCoordinator:
                 "Attempting to get crumb but have no cookies, the operation might fail"
             )
 
-        await self.try_crumb_page()
+        if await self.try_crumb_page():
+            await self.async_save_crumb()
+
         return self.crumb
 
+    async def async_restore_crumb(self) -> bool:
+        """Restore the stored crumb and cookies if Yahoo still accepts them."""
+
+        data = await self._store.async_load()
+        if not data or not data.get("cookies"):
+            return False
+
+        self.cookies = SimpleCookie()
+        for name, value in data["cookies"].items():
+            self.cookies[name] = value
+        self.transport.set_cookies(self.cookies)
+
+        breaker = self.get_circuit_breaker(GET_CRUMB_URL)
+        status = 0
+        crumb = None
+
+        if breaker.allow_request():
+            # The crumb page returns the crumb for the cookies if they are still valid
+            try:
+                (status, crumb) = await self._fetch_crumb(
+                    self.user_agents.get_ordered_agents()[0], breaker
+                )
+            except (TimeoutError, aiohttp.ClientError) as ex:
+                LOGGER.debug("Error validating stored crumb. %s", ex)
+
+        if status != HTTPStatus.OK or not crumb:
+            LOGGER.info("Stored crumb was not accepted (status=%d)", status)
+            self.reset()
+            return False
+
+        self.crumb = crumb
+        self._consent_given = data.get("consent_given", False)
+        self._crumb_time = (
+            dt_util.parse_datetime(data.get("obtained") or "") or dt_util.utcnow()
+        )
+        LOGGER.info(
+            "Restored crumb %s, consent given=%s", self.crumb, self._consent_given
+        )
+
+        if crumb != data.get("crumb"):
+            await self.async_save_crumb()
+
+        return True
+
+    async def async_save_crumb(self) -> None:
+        """Store the crumb, cookies and consent result for the next start.
+
+        The cookies sent with the requests are stored, i.e. the ones in the jar.
+        """
+        await self._store.async_save(
+            {
+                "crumb": self.crumb,
+                "cookies": {
+                    name: morsel.value
+                    for name, morsel in self.transport.get_cookies().items()
+                },
+                "consent_given": self._consent_given,
+                "obtained": self._crumb_time.isoformat() if self._crumb_time else None,
+            }
+        )
+
     async def initial_navigation(self, url: str) -> ConsentData | None:
         """Navigate to base page. This determines if consent is needed.
 
@@ -122,7 +461,8 @@ class CrumbCoordinator:
         LOGGER.debug("Navigating to base page %s", url)
 
         try:
-            async with self._websession.get(
+            await self.rate_limiter.acquire()
+            async with self.transport.session.get(
                 url,
                 headers=INITIAL_REQUEST_HEADERS,
                 timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
@@ -166,13 +506,13 @@ class CrumbCoordinator:
     async def process_consent(self, consent_data: ConsentData) -> bool:
         """Process GDPR consent."""
 
-        # websession = async_get_clientsession(self._hass)
         form_data = self.build_consent_form_data(consent_data.consent_content)
         LOGGER.debug("Posting consent %s", str(form_data))
 
         try:
+            await self.rate_limiter.acquire()
             async with asyncio.timeout(REQUEST_TIMEOUT):
-                response = await self._websession.post(
+                response = await self.transport.session.post(
                     consent_data.consent_post_url,
                     data=form_data,
                     headers=INITIAL_REQUEST_HEADERS,
@@ -195,6 +535,7 @@ class CrumbCoordinator:
                     self.cookies = response.cookies
 
                 consent_data.successful_consent_url = response.url
+                self._consent_given = True
 
                 LOGGER.debug(
                     "After consent processing, have cookies=%s", bool(self.cookies)
@@ -213,45 +554,94 @@ class CrumbCoordinator:
         return self.cookies is None or len(self.cookies) == 0
 
     async def try_crumb_page(self) -> str | None:
-        """Try to get crumb from the end point."""
+        """Try to get crumb from the end point.
+
+        The agents are raced. The next agent is tried if the previous one received
+        429, failed or has not responded within the hedge delay. The first
+        successful response wins and the other requests are cancelled.
+        """
 
         LOGGER.info("Accessing crumb page")
-        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
         last_status = 0
+        breaker = self.get_circuit_breaker(GET_CRUMB_URL)
 
-        for user_agent in USER_AGENTS_FOR_XHR:
-            headers = {**XHR_REQUEST_HEADERS, "user-agent": user_agent}
-
-            async with self._websession.get(
-                GET_CRUMB_URL, headers=headers, timeout=timeout, cookies=self.cookies
-            ) as response:
-                last_status = response.status
-
-                if last_status == HTTPStatus.OK:
-                    self.preferred_user_agent = user_agent
+        user_agents = iter(self.user_agents.get_ordered_agents())
+        pending: dict[asyncio.Task[tuple[int, str | None]], str] = {}
+        hedge_delay = 0.0
+        start_next = True
 
-                    self.crumb = await response.text()
-                    if not self.crumb:
-                        LOGGER.error("No crumb reported")
-
-                    LOGGER.info("Crumb page reported %s", self.crumb)
-                    self._crumb_retry_count = 0
-                    return self.crumb
+        try:
+            while True:
+                if start_next:
+                    start_next = False
+                    user_agent = next(user_agents, None)
+
+                    if user_agent is not None and not breaker.allow_request():
+                        LOGGER.info(
+                            "Crumb requests are paused for %d seconds",
+                            breaker.remaining_time,
+                        )
+                        user_agents = iter(())
+                    elif user_agent is not None:
+                        task = self._hass.async_create_task(
+                            self._fetch_crumb(user_agent, breaker)
+                        )
+                        pending[task] = user_agent
+                        hedge_delay = self.user_agents.get_hedge_delay(user_agent)
+
+                if not pending:
+                    break
 
-                # Try next user-agent for 429, stop trying for any other failures
-                if last_status == 429:
-                    LOGGER.info(
-                        "Crumb request responded with status 429 for '%s', re-trying with different agent",
-                        user_agent,
-                    )
-                else:
-                    LOGGER.error(
-                        "Crumb request responded with status=%d, reason=%s",
-                        last_status,
-                        response.reason,
-                    )
+                (done, _) = await asyncio.wait(
+                    pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
 
-                    break
+                if not done:
+                    LOGGER.debug("No crumb response in %.3f seconds", hedge_delay)
+                    start_next = True
+                    continue
+
+                for task in done:
+                    user_agent = pending.pop(task)
+
+                    try:
+                        (last_status, content) = task.result()
+                    except (TimeoutError, aiohttp.ClientError) as ex:
+                        LOGGER.info("Crumb request failed for '%s'. %s", user_agent, ex)
+                        start_next = True
+                        continue
+
+                    if last_status == HTTPStatus.OK:
+                        self.crumb = content
+                        self._crumb_time = dt_util.utcnow()
+                        if not self.crumb:
+                            LOGGER.error("No crumb reported")
+
+                        LOGGER.info("Crumb page reported %s", self.crumb)
+                        self._crumb_retry_count = 0
+                        return self.crumb
+
+                    # Try next user-agent for 429, stop trying for any other failures
+                    if last_status == 429:
+                        LOGGER.info(
+                            "Crumb request responded with status 429 for '%s', re-trying with different agent",
+                            user_agent,
+                        )
+                        start_next = True
+                    else:
+                        LOGGER.error(
+                            "Crumb request responded with status=%d, reason=%s",
+                            last_status,
+                            content,
+                        )
+                        user_agents = iter(())
+        finally:
+            # Cancel the requests which lost the race
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Finished along with the winner, ignore outcome
 
         self._crumb_retry_count = self._crumb_retry_count + 1
 
@@ -271,6 +661,9 @@ class CrumbCoordinator:
             else:
                 self.retry_duration = CRUMB_RETRY_DELAY
 
+            # Don't retry before the host is accepting requests again
+            self.retry_duration = max(self.retry_duration, breaker.remaining_time)
+
             LOGGER.info(
                 "Crumb failure, will retry after %d seconds",
                 self.retry_duration,
@@ -278,6 +671,41 @@ class CrumbCoordinator:
 
         return None
 
+    async def _fetch_crumb(
+        self, user_agent: str, breaker: CircuitBreaker
+    ) -> tuple[int, str | None]:
+        """Request the crumb page with the user agent.
+
+        Returns:
+            The response status with the crumb if successful, the reason otherwise
+
+        """
+        headers = self.transport.get_xhr_headers(user_agent)
+
+        await self.rate_limiter.acquire()
+        start_time = time.monotonic()
+
+        async with (
+            track_request(breaker, self.user_agents, user_agent),
+            self.transport.session.get(
+                GET_CRUMB_URL,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response,
+        ):
+            update_request_stats(
+                breaker,
+                self.user_agents,
+                user_agent,
+                response,
+                time.monotonic() - start_time,
+            )
+
+            if response.status == HTTPStatus.OK:
+                return (response.status, await response.text())
+
+            return (response.status, response.reason)
+
     # async def parse_crumb_from_content(self, content: str) -> str:
     #     """Parse and update crumb from response content."""
 
@@ -328,22 +756,23 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     @staticmethod
     def parse_symbol_data(symbol_data: dict) -> dict[str, any]:
         """Return data pieces which we care about, use 0 for missing numeric values."""
-        data = {}
+        return ALL_DATA_PROJECTOR.project(symbol_data)
 
-        # get() ensures that we have an entry in symbol_data.
-        for data_group in NUMERIC_DATA_GROUPS.values():
-            for value in data_group:
-                key = value[0]
-
-                # Default value for most missing numeric keys is 0
-                default_value = NUMERIC_DATA_DEFAULTS.get(key, 0)
+    @staticmethod
+    def build_request_fields(domain_config: dict) -> list[str]:
+        """Return the quote fields to request based on the enabled data groups."""
+        fields = dict.fromkeys(REQUIRED_DATA_KEYS)
 
-                data[key] = symbol_data.get(key, default_value)
+        for group, group_items in NUMERIC_DATA_GROUPS.items():
+            if group == DEFAULT_NUMERIC_DATA_GROUP or domain_config.get(group, False):
+                fields.update(dict.fromkeys(value[0] for value in group_items))
 
-        for key in STRING_DATA_KEYS:
-            data[key] = symbol_data.get(key)
+        # Off market prices are used for the sensor value even if their groups are off
+        if domain_config.get(CONF_SHOW_OFF_MARKET_VALUES, False):
+            for time_key, price_key in TIME_PRICE_DATA_DICT.items():
+                fields.update(dict.fromkeys((time_key, price_key)))
 
-        return data
+        return list(fields)
 
     @staticmethod
     def fix_conversion_symbol(symbol: str, symbol_data: any) -> str:
@@ -379,6 +808,14 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         update_interval: timedelta,
         cc: CrumbCoordinator,
         webSession: aiohttp.ClientSession,
+        max_symbols_per_request: int = DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST,
+        max_parallel_requests: int = DEFAULT_CONF_MAX_PARALLEL_REQUESTS,
+        fields: list[str] | None = None,
+        market_hours_policy: MarketHoursPolicy | None = None,
+        hedge_requests: bool = DEFAULT_CONF_HEDGE_REQUESTS,
+        stream_quotes: bool = DEFAULT_CONF_STREAM_QUOTES,
+        quote_store: ColumnarQuoteStore | None = None,
+        conversion_engine: CurrencyConversionEngine | None = None,
     ) -> None:
         """Initialize."""
         self._symbols = symbols
@@ -387,10 +824,45 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self.websession = webSession
         self._cc = cc
         self.failed_count = 0
+        self._max_symbols_per_request = max_symbols_per_request
+        self._max_parallel_requests = max_parallel_requests
+
+        self._fields = fields
+        """Quote fields to request, all fields are returned if None."""
+
+        self._projector = QuoteProjector(fields)
+        """Extracts the data pieces of the requested fields from the quotes."""
+
+        self.stale_symbols: set[str] = set()
+        """Symbols whose data could not be refreshed in the last update."""
+
+        self._refresh_task: asyncio.Task | None = None
+        """The refresh in flight from async_refresh_coalesced."""
 
         if isinstance(update_interval, str) and update_interval == MANUAL_SCAN_INTERVAL:
             update_interval = None
 
+        self.scan_interval: timedelta | None = update_interval
+        """The configured update interval, this is retained if a scheduler drives the updates."""
+
+        self._symbol_next_update: dict[str, datetime] = {}
+        """Time of the next scheduled update by symbol."""
+
+        self._market_hours_policy = market_hours_policy
+        """Policy to adapt the update time to the market state, None to disable."""
+
+        self._hedge_requests = hedge_requests
+        """Send a duplicate data request if there is no response by the p95 latency."""
+
+        self._stream_quotes = stream_quotes
+        """Parse the quotes as the response arrives instead of decoding it at once."""
+
+        self._quote_store = quote_store
+        """Columnar store computing the entity values after every refresh."""
+
+        self._conversion_engine = conversion_engine
+        """Conversion rates rebuilt after every refresh."""
+
         super().__init__(
             hass,
             LOGGER,
@@ -402,15 +874,48 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Return symbols tracked by the coordinator."""
         return self._symbols
 
+    def get_symbol_shards(self, symbols: list[str] | None = None) -> list[list[str]]:
+        """Split symbols into shards of at most max_symbols_per_request symbols."""
+        if symbols is None:
+            symbols = self._symbols or []
+
+        # A single (possibly empty) shard keeps the request behavior for small lists
+        size = self._max_symbols_per_request
+        if len(symbols) <= size:
+            return [symbols]
+
+        return [symbols[index : index + size] for index in range(0, len(symbols), size)]
+
+    def has_any_symbol(self, symbols: list[str]) -> bool:
+        """Check if any of the symbols is tracked by the coordinator."""
+        return any(symbol in (self._symbols or []) for symbol in symbols)
+
+    async def async_refresh_coalesced(self) -> None:
+        """Refresh data, a refresh already in flight is shared instead of repeated."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = self.hass.async_create_task(self.async_refresh())
+        else:
+            LOGGER.debug("Joining refresh already in progress")
+
+        # Shielded so that a cancelled caller does not cancel the shared refresh
+        await asyncio.shield(self._refresh_task)
+
     async def _async_request_refresh_later(self, _now):
         """Request async_request_refresh."""
         await self.async_request_refresh()
 
-    def add_symbol(self, symbol: str) -> bool:
-        """Add symbol to the symbol list."""
+    def add_symbol(self, symbol: str, request_refresh: bool = True) -> bool:
+        """Add symbol to the symbol list.
+
+        Without request_refresh the symbol is only requested with the next update.
+        """
         if symbol not in self._symbols:
             self._symbols.append(symbol)
 
+            if not request_refresh:
+                LOGGER.debug("Added %s", symbol)
+                return True
+
             # Request a refresh to get data for the missing symbol.
             # This would have been called while data for sensor was being parsed.
             # async_request_refresh has debouncing built into it, so multiple calls
@@ -430,66 +935,153 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         return False
 
-    async def get_json(self) -> dict:
-        """Get the JSON data."""
+    async def get_json(self, symbols: list[str] | None = None) -> dict:
+        """Get the JSON data for the symbols, all tracked symbols by default.
 
-        url = await self.build_request_url()
+        The quote hosts are tried in the order of their health and latency. The next
+        host is tried if a host is paused, throttles, fails or reports a server error.
+        """
 
-        preferred_user_agent = self._cc.preferred_user_agent
-        if preferred_user_agent:
-            LOGGER.info(
-                "Requesting data request with the preferred agent '%s'",
-                preferred_user_agent,
-            )
+        host_pool = self._cc.host_pool
+        error: Exception | None = None
 
-            [result_json, status] = await self._fetch_json(url, preferred_user_agent)
+        for base in host_pool.get_ordered_bases():
+            url = await self.build_request_url(symbols, base)
+            try:
+                [result_json, status] = await self._get_json_from_host(url)
+            except (UpdateFailed, TimeoutError, aiohttp.ClientError) as ex:
+                LOGGER.debug("Data request to %s failed. %s", urlsplit(url).netloc, ex)
+                error = ex
+                continue
+            finally:
+                host_pool.record_use(base)
 
             if status == HTTPStatus.OK:
                 return result_json
 
-            if status == 429:
-                LOGGER.info(
-                    "Data request responded with status 429 for '%s', re-trying other agents",
-                    preferred_user_agent,
-                )
+            error = None
+            if status != 429 and status < HTTPStatus.INTERNAL_SERVER_ERROR:
+                break
 
-        for user_agent in USER_AGENTS_FOR_XHR:
-            # Skip if we have already tried the agent
-            if preferred_user_agent == user_agent:
-                continue
+        if error is not None:
+            raise error
 
-            [result_json, status] = await self._fetch_json(url, user_agent)
+        return None
 
-            if status == HTTPStatus.OK:
-                LOGGER.info("Successful data received for '%s'", user_agent)
-                return result_json
+    async def _get_json_from_host(self, url: str) -> tuple[dict, int]:
+        """Get the JSON data from the host of the url, trying the agents on 429."""
+        breaker = self._cc.get_circuit_breaker(url)
+        status = 0
+
+        # Agents are tried in the order of their observed success
+        for user_agent in self._cc.user_agents.get_ordered_agents():
+            # Stop trying other agents once the host has paused us
+            self.check_circuit_breaker(breaker)
+            [result_json, status] = await self._fetch_json(url, user_agent, breaker)
 
             if status != 429:
-                break
+                return [result_json, status]
 
             LOGGER.info(
                 "Data request responded with status 429 for '%s', re-trying with different agent",
                 user_agent,
             )
 
-        return None
+        return [None, status]
+
+    @staticmethod
+    def check_circuit_breaker(breaker: CircuitBreaker) -> None:
+        """Raise UpdateFailed if requests to the host are paused."""
+        if not breaker.allow_request():
+            raise UpdateFailed(
+                f"Requests to {breaker.host} are paused for {breaker.remaining_time:.0f} seconds"
+            )
+
+    async def async_prewarm_connection(self) -> None:
+        """Open a connection to the quote host ahead of a data request.
+
+        The response is not used, the connection is returned to the pool and the
+        data request that follows does not pay for the DNS, TCP and TLS setup.
+        """
+        # The host is not marked as used, a due probe is left to the data request
+        base = self._cc.host_pool.peek_preferred_base()
+        breaker = self._cc.get_circuit_breaker(base)
+        if breaker.state != CircuitState.CLOSED:
+            return
+
+        parts = urlsplit(base)
+        url = f"{parts.scheme}://{parts.netloc}/"
+        start_time = time.monotonic()
+
+        try:
+            await self._cc.rate_limiter.acquire(REQUEST_PRIORITY_LOW)
+            async with (
+                asyncio.timeout(REQUEST_TIMEOUT),
+                self.websession.head(url, allow_redirects=False) as response,
+            ):
+                LOGGER.debug(
+                    "Pre-warmed connection to %s in %.3f seconds, status=%d",
+                    parts.netloc,
+                    time.monotonic() - start_time,
+                    response.status,
+                )
+        except (TimeoutError, aiohttp.ClientError) as ex:
+            LOGGER.debug("Pre-warming connection to %s failed. %s", parts.netloc, ex)
 
-    async def _fetch_json(self, url, user_agent) -> tuple[dict, int]:
+    def get_paused_time(self) -> float:
+        """Return the seconds for which data requests are paused on all the hosts."""
+        return self._cc.host_pool.get_paused_time()
+
+    async def _fetch_json(
+        self, url, user_agent, breaker: CircuitBreaker
+    ) -> tuple[dict, int]:
         """Fetch JSON data with the specified user agent."""
 
-        headers = {**XHR_REQUEST_HEADERS, "user-agent": user_agent}
+        headers = self._cc.transport.get_xhr_headers(user_agent)
         LOGGER.debug("Requesting data from '%s' with agent %s", url, user_agent)
 
-        async with asyncio.timeout(REQUEST_TIMEOUT):
-            response = await self.websession.get(
-                url, headers=headers, cookies=self._cc.cookies
+        rate_limiter = self._cc.rate_limiter
+        await rate_limiter.acquire()
+        if rate_limiter.last_wait_time > 0:
+            LOGGER.debug(
+                "Data request waited %.3f seconds for rate limiter, queue depth=%d",
+                rate_limiter.last_wait_time,
+                rate_limiter.queue_depth,
+            )
+
+        user_agents = self._cc.user_agents
+        histogram = self._cc.get_latency_histogram(url)
+        timeout = histogram.get_timeout(REQUEST_TIMEOUT)
+
+        # Hedging is skipped for the single trial request of a recovering host
+        hedge_delay = None
+        if self._hedge_requests and breaker.state == CircuitState.CLOSED:
+            hedge_delay = histogram.get_hedge_delay()
+
+        # The adaptive timeout covers the headers, whose latency is recorded
+        async with track_request(breaker, user_agents, user_agent, histogram):
+            async with asyncio.timeout(timeout):
+                if hedge_delay is None:
+                    (response, latency) = await self._async_get(url, headers)
+                else:
+                    (response, latency) = await self._async_get_hedged(
+                        url, headers, hedge_delay
+                    )
+
+            update_request_stats(
+                breaker, user_agents, user_agent, response, latency, histogram
             )
 
+        # The response is recorded, body and decode errors are not reported again
+        async with asyncio.timeout(REQUEST_TIMEOUT):
             # Try next user-agent for 429
             if response.status == 429:
                 return [None, 429]
 
-            result_json = await response.json()
+            if response.status == HTTPStatus.OK and self._stream_quotes:
+                return [await self._async_stream_json(response), response.status]
+
+            result_json = await async_decode_json(self.hass, response)
 
             if response.status == HTTPStatus.OK:
                 return [result_json, response.status]
@@ -515,10 +1107,10 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                     url,
                 )
 
-                # Reset crumb so that it gets recalculated
+                # Get a new crumb, the current one is used till it is available
                 if finance_error_code == "Unauthorized":
-                    LOGGER.info("Resetting crumbs")
-                    self._cc.reset()
+                    LOGGER.info("Renewing crumb")
+                    self._cc.async_request_renewal()
 
             else:
                 LOGGER.info(
@@ -530,17 +1122,130 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         return [None, response.status]
 
-    async def build_request_url(self) -> str:
-        """Build the request url."""
-        url = BASE + ",".join(self._symbols)
+    async def _async_stream_json(self, response: aiohttp.ClientResponse) -> Any:
+        """Decode the quote response as it arrives.
+
+        Each quote is reduced to the symbol data right away, so the raw quotes are
+        never held together in memory.
+        """
+        result: list[dict] = []
+
+        def _on_quote(quote: dict[str, Any]) -> None:
+            symbol_data = self._projector.project(quote)
+            symbol_data[ATTR_SYMBOL] = quote.get(ATTR_SYMBOL)
+            result.append(symbol_data)
+
+        parser = QuoteStreamParser(_on_quote)
+        try:
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+            document = parser.close()
+        except ValueError as ex:
+            raise build_invalid_json_error(response, ex) from ex
+
+        LOGGER.debug("Streamed %d quotes", parser.quote_count)
+
+        quote_response = (
+            document.get("quoteResponse") if isinstance(document, dict) else None
+        )
+        if isinstance(quote_response, dict) and quote_response.get("result") == []:
+            quote_response["result"] = result
+
+        return document
+
+    async def _async_get(
+        self, url: str, headers: dict[str, str]
+    ) -> tuple[aiohttp.ClientResponse, float]:
+        """Request the url, return the response and its latency."""
+        start_time = time.monotonic()
+        response = await self.websession.get(url, headers=headers)
+        return (response, time.monotonic() - start_time)
+
+    async def _async_get_hedge(
+        self, url: str, headers: dict[str, str]
+    ) -> tuple[aiohttp.ClientResponse, float]:
+        """Request the url as hedge, it is served after the other requests by the rate limiter."""
+        await self._cc.rate_limiter.acquire(REQUEST_PRIORITY_LOW)
+        return await self._async_get(url, headers)
+
+    async def _async_get_hedged(
+        self, url: str, headers: dict[str, str], hedge_delay: float
+    ) -> tuple[aiohttp.ClientResponse, float]:
+        """Request the url, a duplicate request is sent if there is no response by hedge_delay.
+
+        The first response is used and the other request is cancelled.
+        """
+        tasks = [asyncio.create_task(self._async_get(url, headers))]
+        pending = set(tasks)
+        winner: asyncio.Task | None = None
+        error: BaseException | None = None
+
+        try:
+            while pending:
+                wait_timeout = hedge_delay if len(tasks) == 1 else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
 
-        crumb = self._cc.crumb
+                if not done:
+                    LOGGER.debug(
+                        "No response in %.3f seconds, sending hedged request",
+                        hedge_delay,
+                    )
+                    hedge = asyncio.create_task(self._async_get_hedge(url, headers))
+                    tasks.append(hedge)
+                    pending.add(hedge)
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+                    error = error or task.exception()
+
+                # A failed request is not hedged, only a slow one
+                if len(tasks) == 1:
+                    break
+
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif (
+                    task is not winner
+                    and not task.cancelled()
+                    and task.exception() is None
+                ):
+                    # Release the connection of the response not used
+                    (response, _) = task.result()
+                    response.release()
+
+    async def build_request_url(
+        self, symbols: list[str] | None = None, base: str = BASE
+    ) -> str:
+        """Build the request url for the symbols, all tracked symbols by default.
+
+        UpdateFailed is raised if there is no crumb.
+        """
+        if symbols is None:
+            symbols = self._symbols
+
+        url = base + ",".join(symbols)
+
+        if self._fields:
+            url = url + "&fields=" + ",".join(self._fields)
+
+        # A request without crumb is rejected and would only start another handshake
+        crumb = await self._cc.async_get_crumb()
         if crumb is None:
-            crumb = await self._cc.try_get_crumb_cookies()
-        if crumb is not None:
-            url = url + "&crumb=" + crumb
+            backoff_time = self._cc.backoff_time
+            raise UpdateFailed(
+                f"No crumb, crumb acquisition backing off for {backoff_time:.0f} seconds",
+                retry_after=backoff_time,
+            )
 
-        return url
+        return url + "&crumb=" + crumb
 
     @staticmethod
     def get_finance_error_code(error_json) -> tuple[str, str] | None:
@@ -559,49 +1264,179 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
         The exception will get properly handled in the caller (DataUpdateCoordinator.async_refresh)
         which also updates last_update_success. UpdateFailed is raised if JSON is invalid.
+
+        Symbols are requested in shards. A failed shard only leaves its symbols stale,
+        UpdateFailed is raised only if all the shards failed.
         """
 
-        retry_after = RETRY_INTERVALS[min(self.failed_count, len(RETRY_INTERVALS) - 1)]
+        retry_after = self.get_retry_after()
 
         try:
-            json = await self.get_json()
+            (result, stale_symbols) = await self.async_fetch_symbols(self._symbols or [])
+        except UpdateFailed as error:
+            self._handle_update_error(retry_after)
+            raise UpdateFailed(*error.args, retry_after=retry_after) from error
         except (TimeoutError, aiohttp.ClientError) as error:
-            self.failed_count += 1
+            self._handle_update_error(retry_after)
             raise UpdateFailed(error, retry_after=retry_after) from error
+        except Exception:
+            self._handle_update_error(retry_after)
+            raise
+
+        stale = set(stale_symbols)
+        requested_symbols = [
+            symbol for symbol in self._symbols or [] if symbol not in stale
+        ]
+        return self._handle_update_result(
+            requested_symbols, result, stale_symbols, dt_util.utcnow()
+        )
 
-        if json is None:
-            self.failed_count += 1
-            raise UpdateFailed("No data received", retry_after=retry_after)
+    async def async_fetch_symbols(
+        self, symbols: list[str]
+    ) -> tuple[list[dict], list[str]]:
+        """Request data for the symbols in shards and return (result, stale symbols).
 
-        if "quoteResponse" not in json:
-            self.failed_count += 1
-            raise UpdateFailed(
-                "Data invalid, 'quoteResponse' not found.", retry_after=retry_after
-            )
+        The first error is raised if all the shards failed. UpdateFailed is raised
+        without making requests if data requests are paused.
+        """
 
-        quoteResponse = json["quoteResponse"]  # pylint: disable=invalid-name
+        paused_time = self.get_paused_time()
+        if paused_time > 0:
+            raise UpdateFailed(f"Data requests are paused for {paused_time:.0f} seconds")
 
-        if "error" in quoteResponse:
-            if quoteResponse["error"] is not None:
-                self.failed_count += 1
-                raise UpdateFailed(quoteResponse["error"], retry_after=retry_after)
+        shards = self.get_symbol_shards(symbols)
+        semaphore = asyncio.Semaphore(self._max_parallel_requests)
 
-        if "result" not in quoteResponse:
-            self.failed_count += 1
-            raise UpdateFailed(
-                "Data invalid, no 'result' found", retry_after=retry_after
-            )
+        async def _fetch_shard(shard: list[str]) -> list[dict]:
+            async with semaphore:
+                return await self.async_fetch_result(shard)
 
-        result = quoteResponse["result"]
-        if result is None:
-            self.failed_count += 1
-            raise UpdateFailed(
-                "Data invalid, 'result' is None", retry_after=retry_after
+        shard_results = await asyncio.gather(
+            *[_fetch_shard(shard) for shard in shards], return_exceptions=True
+        )
+
+        rate_limiter = self._cc.rate_limiter
+        LOGGER.debug(
+            "Requested %d shards, rate limiter queue depth=%d, average wait=%.3f seconds",
+            len(shards),
+            rate_limiter.queue_depth,
+            rate_limiter.average_wait_time,
+        )
+
+        result = []
+        stale_symbols = []
+        failed_shard_count = 0
+        first_error: Exception | None = None
+
+        for shard, shard_result in zip(shards, shard_results, strict=True):
+            if isinstance(shard_result, BaseException):
+                if not isinstance(shard_result, Exception):
+                    raise shard_result
+
+                first_error = first_error or shard_result
+                failed_shard_count += 1
+                stale_symbols.extend(shard)
+            else:
+                result.extend(shard_result)
+
+        if failed_shard_count == len(shards):
+            raise first_error
+
+        if stale_symbols:
+            LOGGER.warning(
+                "Data request failed for %d of %d shards (%s), keeping previous data for %s",
+                failed_shard_count,
+                len(shards),
+                first_error,
+                stale_symbols,
             )
 
-        (error_encountered, data) = self.process_json_result(result)
+        return (result, stale_symbols)
+
+    def get_due_symbols(self, now: datetime) -> list[str]:
+        """Return the symbols which are due for an update at the specified time."""
+        if self.scan_interval is None:
+            return []
+
+        return [
+            symbol
+            for symbol in self._symbols or []
+            if symbol not in self._symbol_next_update
+            or self._symbol_next_update[symbol] <= now
+        ]
+
+    @callback
+    def async_set_scheduled_result(
+        self,
+        requested_symbols: list[str],
+        result: list[dict],
+        stale_symbols: list[str],
+        now: datetime,
+    ) -> None:
+        """Update data from a request made by the scheduler."""
+        data = self._handle_update_result(
+            requested_symbols, result, stale_symbols, now
+        )
+        self.async_set_updated_data(data)
+
+    @callback
+    def async_set_scheduled_error(self, error: Exception, now: datetime) -> None:
+        """Report failure of a request made by the scheduler."""
+        retry_after = self.get_retry_after()
+        self._handle_update_error(retry_after, now)
+        self.async_set_update_error(error)
+
+    def get_retry_after(self) -> float:
+        """Return the jittered retry delay after a failure.
+
+        The delay is not less than the time for which data requests are paused.
+        """
+        retry_after = RETRY_INTERVALS[min(self.failed_count, len(RETRY_INTERVALS) - 1)]
+        retry_after += random.uniform(0, retry_after * RETRY_JITTER)
+        return max(retry_after, self.get_paused_time())
+
+    def _handle_update_error(
+        self, retry_after: float, now: datetime | None = None
+    ) -> None:
+        """Update failure count and the time of the next update after a failure."""
+        self.failed_count += 1
+
+        next_update = (now or dt_util.utcnow()) + timedelta(seconds=retry_after)
+        for symbol in self._symbols or []:
+            self._symbol_next_update[symbol] = next_update
+
+    def _handle_update_result(
+        self,
+        requested_symbols: list[str],
+        result: list[dict],
+        stale_symbols: list[str],
+        now: datetime,
+    ) -> dict[str, Any]:
+        """Process the result of a successful request and return the updated data."""
+
+        self.stale_symbols = set(stale_symbols)
+
+        (error_encountered, data) = self.process_json_result(result, requested_symbols)
         self.failed_count = 0
 
+        if self._conversion_engine is not None:
+            self._conversion_engine.update(data)
+
+        if self._quote_store is not None:
+            self._quote_store.update(data)
+
+        if self.scan_interval is not None:
+            for symbol in requested_symbols:
+                self._symbol_next_update[symbol] = self._get_next_update(
+                    symbol, data.get(symbol), now
+                )
+
+            # Symbols of the failed shards are retried like a failed update
+            if stale_symbols:
+                retry_time = now + timedelta(seconds=self.get_retry_after())
+                for symbol in stale_symbols:
+                    self._symbol_next_update[symbol] = retry_time
+
         if error_encountered:
             LOGGER.info("Data = %s", result)
         else:
@@ -610,14 +1445,61 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self.hass.bus.fire(EVENT_DATA_UPDATED, {"symbols": ",".join(self._symbols)})
         return data
 
-    def process_json_result(self, result) -> tuple[bool, dict[str, Any]]:
-        """Process json result and return (error status, updated data)."""
+    def _get_next_update(
+        self, symbol: str, symbol_data: dict | None, now: datetime
+    ) -> datetime:
+        """Return the time of the next update for the symbol."""
+        if self._market_hours_policy is None:
+            return now + self.scan_interval
+
+        return self._market_hours_policy.get_next_update(
+            symbol, symbol_data, now, self.scan_interval
+        )
+
+    async def async_fetch_result(self, symbols: list[str]) -> list[dict]:
+        """Request data for the symbols and return the validated quote result.
+
+        UpdateFailed is raised if JSON is invalid.
+        """
+
+        json = await self.get_json(symbols)
+
+        if json is None:
+            raise UpdateFailed("No data received")
+
+        if "quoteResponse" not in json:
+            raise UpdateFailed("Data invalid, 'quoteResponse' not found.")
+
+        quoteResponse = json["quoteResponse"]  # pylint: disable=invalid-name
+
+        if "error" in quoteResponse:
+            if quoteResponse["error"] is not None:
+                raise UpdateFailed(quoteResponse["error"])
+
+        if "result" not in quoteResponse:
+            raise UpdateFailed("Data invalid, no 'result' found")
+
+        result = quoteResponse["result"]
+        if result is None:
+            raise UpdateFailed("Data invalid, 'result' is None")
+
+        return result
+
+    def process_json_result(
+        self, result, requested_symbols: list[str] | None = None
+    ) -> tuple[bool, dict[str, Any]]:
+        """Process json result and return (error status, updated data).
+
+        The result is checked against requested_symbols, all tracked symbols by default.
+        """
 
         # Using current data if available. If returned data is missing then we might be
         # able to use previous data.
         data = self.data or {}
 
-        symbols = self._symbols.copy()
+        symbols = (
+            self._symbols if requested_symbols is None else requested_symbols
+        ).copy()
         error_encountered = False
 
         for symbol_data in result:
@@ -638,7 +1520,9 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                     LOGGER.warning("Received %s not in symbol list", symbol)
                     error_encountered = True
 
-            data[symbol] = self.parse_symbol_data(symbol_data)
+            data[symbol] = self._projector.project_record(
+                symbol_data, data.get(symbol)
+            )
 
             LOGGER.debug(
                 "Updated %s to %s",
@@ -653,6 +1537,81 @@ class YahooSymbolUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         return (error_encountered, data)
 
 
+@asynccontextmanager
+async def track_request(
+    breaker: CircuitBreaker,
+    user_agents: UserAgentSelector,
+    user_agent: str,
+    histogram: LatencyHistogram | None = None,
+) -> AsyncIterator[None]:
+    """Report a request which ended without a response to the circuit breaker and agent stats."""
+    start_time = time.monotonic()
+    try:
+        yield
+    except (TimeoutError, aiohttp.ClientError) as error:
+        # A timeout is a latency sample too, it lets the timeout grow with the latency
+        if histogram is not None and isinstance(error, TimeoutError):
+            histogram.record(time.monotonic() - start_time)
+
+        breaker.record_failure()
+        user_agents.record_result(user_agent, None)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+
+
+def update_request_stats(
+    breaker: CircuitBreaker,
+    user_agents: UserAgentSelector,
+    user_agent: str,
+    response: aiohttp.ClientResponse,
+    latency: float,
+    histogram: LatencyHistogram | None = None,
+) -> None:
+    """Report the response status to the circuit breaker, agent stats and latency histogram."""
+    user_agents.record_result(user_agent, response.status, latency)
+
+    if histogram is not None:
+        histogram.record(latency)
+
+    if response.status == 429 or response.status >= 500:
+        breaker.record_failure(parse_retry_after(response.headers.get("Retry-After")))
+    else:
+        breaker.record_success()
+
+
+async def async_decode_json(
+    hass: HomeAssistant, response: aiohttp.ClientResponse
+) -> Any:
+    """Decode the JSON response body, None if it is empty.
+
+    Large bodies are decoded in the executor to not block the event loop.
+    """
+    body = await response.read()
+    if not body.strip():
+        return None
+
+    try:
+        if len(body) >= JSON_EXECUTOR_THRESHOLD:
+            return await hass.async_add_executor_job(json_loads, body)
+        return json_loads(body)
+    except ValueError as ex:
+        raise build_invalid_json_error(response, ex) from ex
+
+
+def build_invalid_json_error(
+    response: aiohttp.ClientResponse, error: ValueError
+) -> aiohttp.ClientResponseError:
+    """Build the client error for a response whose body is not valid JSON."""
+    return aiohttp.ClientResponseError(
+        response.request_info,
+        response.history,
+        status=response.status,
+        message=f"Invalid JSON response: {error}",
+    )
+
+
 def debug_log_response(response: aiohttp.ClientResponse, title: str) -> None:
     """Debug log the response."""
     LOGGER.debug("%s: %d, %s", title, response.status, response.reason)
@@ -0,0 +1,253 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CURRENCY_CACHE_SAVE_DELAY,
+    DOMAIN,
+    HASS_DATA_COORDINATORS,
+    LOGGER,
+    MINOR_CURRENCY_UNITS,
+    STORAGE_KEY_CURRENCIES,
+    STORAGE_VERSION,
+)
+from .market import get_market_price
+
+
+def get_conversion_symbol(
+    original_currency: str, target_currency: str | None
+) -> tuple[str | None, float | None]:
+    """Return (conversion symbol, multiplier) for converting to the target currency.
+
+    The value is multiplied by the multiplier and the price of the conversion symbol.
+    The conversion symbol is None if only the multiplier is needed, the multiplier
+    is None if there is no conversion.
+    """
+    if target_currency == original_currency:
+        return (None, None)
+
+    # GBp needs to be converted to GBP. There is no symbol in YahooFinance for this
+    # and we will simply use the multiplication factor of 0.01.
+    (major_currency, multiplier) = MINOR_CURRENCY_UNITS.get(
+        original_currency, (original_currency, None)
+    )
+
+    if not target_currency or target_currency.upper() == major_currency.upper():
+        return (None, multiplier)
+
+    return (f"{major_currency}{target_currency}=X".upper(), multiplier or 1)
+
+
+def get_pivot_legs(
+    original_currency: str, target_currency: str, pivot_currency: str
+) -> tuple[tuple[str, bool], ...]:
+    """Return the (symbol, inverted) legs for converting through the pivot currency.
+
+    Only pivot currency symbols are used, the rate is the product of the leg prices
+    where an inverted leg contributes 1 / price. The minor unit multiplier is not
+    included.
+    """
+    (major_currency, _) = MINOR_CURRENCY_UNITS.get(
+        original_currency, (original_currency, None)
+    )
+    from_currency = major_currency.upper()
+    to_currency = target_currency.upper()
+    pivot_currency = pivot_currency.upper()
+
+    legs = []
+    if from_currency != pivot_currency:
+        legs.append((f"{pivot_currency}{from_currency}=X", True))
+    if to_currency != pivot_currency:
+        legs.append((f"{pivot_currency}{to_currency}=X", False))
+
+    return tuple(legs)
+
+
+@dataclass(frozen=True, slots=True)
+class ConversionRate:
+    """Conversion rate of a currency pair."""
+
+    conversion_symbols: tuple[str, ...]
+    """Symbols whose prices make up the rate, empty if only the multiplier applies."""
+
+    multiplier: float | None
+    """Minor unit multiplier, None if there is no conversion."""
+
+    value: float | None
+    """Rate to multiply with, None while a conversion symbol has no price."""
+
+    @property
+    def available(self) -> bool:
+        """Return if the rate is known."""
+        return not self.conversion_symbols or self.value is not None
+
+
+def convert_values(
+    symbol_data: Mapping[str, Any], keys: Iterable[str], conversion: float | None
+) -> dict[str, Any]:
+    """Return the values of the keys multiplied by the conversion."""
+    if conversion is None:
+        return {key: symbol_data[key] for key in keys}
+
+    return {
+        key: None if (value := symbol_data[key]) is None else value * conversion
+        for key in keys
+    }
+
+
+class CurrencyConversionEngine:
+    """Conversion rates of all the currency pairs in use.
+
+    The rate table is rebuilt once per refresh from the data of all the coordinators
+    and sensors look up the rate of their currency pair.
+
+    With a pivot currency, cross rates are derived from the pivot currency symbols
+    (e.g. USDEUR=X and USDJPY=X for EUR to JPY) so that the number of conversion
+    symbols grows with the number of currencies instead of currency pairs.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        show_off_market_values: bool,
+        pivot_currency: str | None = None,
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._show_off_market_values = show_off_market_values
+        self._pivot_currency = pivot_currency
+
+        self._rates: dict[tuple[str, str | None], ConversionRate] = {}
+        """Rate by (from, to) currency."""
+        self._data: Mapping[str, Mapping[str, Any]] | None = None
+        """Data of the last update, it is checked first for new pairs."""
+
+    def get_rate(self, from_currency: str, to_currency: str | None) -> ConversionRate:
+        """Return the rate for converting from_currency to to_currency.
+
+        A rate which is not known yet is looked up again.
+        """
+        pair = (from_currency, to_currency)
+        rate = self._rates.get(pair)
+        if rate is None or not rate.available:
+            rate = self._rates[pair] = self._build_rate(pair, self._data)
+
+        return rate
+
+    def get_conversion_symbols(
+        self, from_currency: str, to_currency: str | None
+    ) -> tuple[str, ...]:
+        """Return the symbols whose prices make up the rate of the currency pair."""
+        return tuple(symbol for symbol, _ in self._get_legs(from_currency, to_currency))
+
+    def update(self, data: Mapping[str, Mapping[str, Any]] | None = None) -> None:
+        """Rebuild the rates of all the pairs in use, data is checked first."""
+        self._data = data
+        for pair in self._rates:
+            self._rates[pair] = self._build_rate(pair, data)
+
+    def _build_rate(
+        self,
+        pair: tuple[str, str | None],
+        data: Mapping[str, Mapping[str, Any]] | None,
+    ) -> ConversionRate:
+        """Return the rate of the currency pair from the latest data."""
+        (_, multiplier) = get_conversion_symbol(*pair)
+        legs = self._get_legs(*pair)
+        if not legs:
+            return ConversionRate((), multiplier, multiplier)
+
+        value = multiplier
+        for symbol, inverted in legs:
+            symbol_data = data.get(symbol) if data else None
+            if symbol_data is None:
+                symbol_data = self._find_symbol_data(symbol)
+
+            price = get_market_price(symbol_data, self._show_off_market_values)
+            if not price:
+                value = None
+                break
+
+            value = value / price if inverted else value * price
+
+        LOGGER.debug("%s to %s is %s", pair[0], pair[1], value)
+        return ConversionRate(tuple(symbol for symbol, _ in legs), multiplier, value)
+
+    def _get_legs(
+        self, from_currency: str, to_currency: str | None
+    ) -> tuple[tuple[str, bool], ...]:
+        """Return the (symbol, inverted) legs of the rate of the currency pair."""
+        (conversion_symbol, _) = get_conversion_symbol(from_currency, to_currency)
+        if conversion_symbol is None:
+            return ()
+
+        if self._pivot_currency is None:
+            return ((conversion_symbol, False),)
+
+        return get_pivot_legs(from_currency, to_currency, self._pivot_currency)
+
+    def _find_symbol_data(self, symbol: str) -> Mapping[str, Any] | None:
+        """Find data for the specified symbol in all coordinators."""
+        coordinators = self._hass.data[DOMAIN].get(HASS_DATA_COORDINATORS)
+
+        if coordinators:
+            for coordinator in coordinators.values():
+                data = coordinator.data
+                if data is not None:
+                    symbol_data = data.get(symbol)
+                    if symbol_data is not None:
+                        return symbol_data
+
+        return None
+
+
+class CurrencyCache:
+    """Currencies of the converted symbols persisted across restarts.
+
+    With the cached currencies the conversion symbols are known at startup and are
+    requested along with the initial data instead of after it.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY_CURRENCIES
+        )
+
+        self._currencies: dict[str, str] = {}
+        """Currency by symbol."""
+
+    async def async_load(self) -> None:
+        """Load the persisted currencies."""
+        data = await self._store.async_load()
+        if not data:
+            return
+
+        self._currencies.update(data.get("currencies", {}))
+        LOGGER.debug("Loaded symbol currencies %s", self._currencies)
+
+    def get(self, symbol: str) -> str | None:
+        """Return the currency of the symbol, None if it is not known."""
+        return self._currencies.get(symbol)
+
+    def set(self, symbol: str, currency: str) -> None:
+        """Record the currency of the symbol."""
+        if self._currencies.get(symbol) == currency:
+            return
+
+        self._currencies[symbol] = currency
+        self._store.async_delay_save(self._data_to_save, CURRENCY_CACHE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the currencies to persist."""
+        return {"currencies": self._currencies}
@@ -67,3 +67,17 @@ class ConsentData:
     """Url to navigate to after successful consent"""
     need_consent: bool = False
     """Consent is needed"""
+
+
+@dataclass
+class UserAgentStats:
+    """Class for the observed results of requests made with a user agent."""
+
+    request_count: int = 0
+    """Number of requests made"""
+    success_rate: float = 1.0
+    """Moving average of successful requests"""
+    throttle_rate: float = 0.0
+    """Moving average of requests which received 429"""
+    latency: float = 0.0
+    """Moving average of response time in seconds"""
@@ -0,0 +1,91 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import math
+import time
+
+from .circuitbreaker import CircuitBreaker, CircuitState
+from .const import HOST_PROBE_INTERVAL, LOGGER
+from .latency import LatencyHistogram
+
+STATE_RANKS = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+class QuoteHostPool:
+    """Pool of the hosts serving quotes.
+
+    Hosts accepting requests are preferred over the ones recovering from failures,
+    and then the one with the lower median latency (hosts without latency samples
+    come last). A host which has not been used
+    for HOST_PROBE_INTERVAL is tried first once so that its health and latency stay
+    current, a failed probe falls back to the other hosts.
+    """
+
+    def __init__(
+        self,
+        bases: list[str],
+        get_circuit_breaker: Callable[[str], CircuitBreaker],
+        get_latency_histogram: Callable[[str], LatencyHistogram],
+    ) -> None:
+        """Initialize."""
+        self.bases = bases
+        """Base url (scheme, host and path) of each host."""
+
+        self._get_circuit_breaker = get_circuit_breaker
+        self._get_latency_histogram = get_latency_histogram
+
+        now = time.monotonic()
+        self._last_used = {base: now for base in bases}
+        """Monotonic time at which each host was last requested."""
+
+    def get_ordered_bases(self) -> list[str]:
+        """Return the base urls in the order in which the hosts should be tried."""
+        ordered = self._order_bases()
+        self._last_used[ordered[0]] = time.monotonic()
+        return ordered
+
+    def peek_preferred_base(self) -> str:
+        """Return the base url of the host to be tried first without using it."""
+        return self._order_bases()[0]
+
+    def _order_bases(self) -> list[str]:
+        """Return the base urls in the order in which the hosts should be tried."""
+        ordered = sorted(self.bases, key=self._get_sort_key)
+
+        now = time.monotonic()
+        for base in ordered[1:]:
+            if (
+                self._get_circuit_breaker(base).state != CircuitState.OPEN
+                and now - self._last_used[base] >= HOST_PROBE_INTERVAL
+            ):
+                LOGGER.debug("Probing quote host %s", base)
+                ordered.remove(base)
+                ordered.insert(0, base)
+                break
+
+        return ordered
+
+    def record_use(self, base: str) -> None:
+        """Record that the host was requested."""
+        self._last_used[base] = time.monotonic()
+
+    def get_paused_time(self) -> float:
+        """Return the seconds till any of the hosts accepts requests again."""
+        return min(
+            self._get_circuit_breaker(base).remaining_time for base in self.bases
+        )
+
+    def _get_sort_key(self, base: str) -> tuple[int, float]:
+        """Return the sort key of the host from its health and median latency."""
+        state = self._get_circuit_breaker(base).state
+        latency = self._get_latency_histogram(base).get_percentile(0.5)
+        return (STATE_RANKS[state], math.inf if latency is None else latency)
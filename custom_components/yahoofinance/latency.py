@@ -0,0 +1,76 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+import bisect
+from typing import Final
+
+from .const import (
+    HEDGE_PERCENTILE,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_MIN_TIMEOUT,
+    LATENCY_TIMEOUT_FACTOR,
+    TIMEOUT_PERCENTILE,
+)
+
+BUCKET_BOUNDS: Final = tuple(0.025 * 1.25**i for i in range(35))
+"""Upper bounds in seconds of the histogram buckets, from 25ms to about 48s."""
+
+MAX_SAMPLE_COUNT: Final = 1000
+"""Counts are halved once there are more samples so that recent latency dominates."""
+
+
+class LatencyHistogram:
+    """Histogram of request latency for an endpoint.
+
+    Latency is counted in exponentially sized buckets. The request timeout and the
+    delay for a hedged request are derived from the percentiles once there are
+    enough samples.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.sample_count = 0
+        """Number of samples in the histogram."""
+
+    def record(self, latency: float) -> None:
+        """Record the latency in seconds of a request."""
+        self._counts[bisect.bisect_left(BUCKET_BOUNDS, latency)] += 1
+        self.sample_count += 1
+
+        if self.sample_count > MAX_SAMPLE_COUNT:
+            self._counts = [count // 2 for count in self._counts]
+            self.sample_count = sum(self._counts)
+
+    def get_percentile(self, percentile: float) -> float | None:
+        """Return the upper bound of the latency percentile, None if there are no samples."""
+        if self.sample_count == 0:
+            return None
+
+        rank = percentile * self.sample_count
+        cumulative = 0
+        for index, count in enumerate(self._counts):
+            cumulative += count
+            if cumulative >= rank:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+
+        return BUCKET_BOUNDS[-1]
+
+    def get_timeout(self, max_timeout: float) -> float:
+        """Return the request timeout, max_timeout till there are enough samples."""
+        if self.sample_count < LATENCY_MIN_SAMPLES:
+            return max_timeout
+
+        timeout = self.get_percentile(TIMEOUT_PERCENTILE) * LATENCY_TIMEOUT_FACTOR
+        return min(max(timeout, LATENCY_MIN_TIMEOUT), max_timeout)
+
+    def get_hedge_delay(self) -> float | None:
+        """Return the delay after which to send a hedged request, None if not known."""
+        if self.sample_count < LATENCY_MIN_SAMPLES:
+            return None
+
+        return self.get_percentile(HEDGE_PERCENTILE)
@@ -0,0 +1,165 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from .const import (
+    ALWAYS_OPEN_QUOTE_TYPES,
+    CLOSED_MARKET_STATES,
+    DATA_MARKET_STATE,
+    DATA_PRE_MARKET_TIME,
+    DATA_QUOTE_TYPE,
+    DATA_REGULAR_MARKET_PRICE,
+    DATA_REGULAR_MARKET_TIME,
+    LOGGER,
+    TIME_PRICE_DATA_DICT,
+)
+
+
+def get_market_price(
+    symbol_data: Mapping[str, Any] | None, show_off_market_values: bool
+) -> float | None:
+    """Return the market price of the symbol data.
+
+    The latest of the pre, post and regular market prices is used if
+    show_off_market_values.
+    """
+    if not symbol_data:
+        return None
+    if not show_off_market_values:
+        return symbol_data[DATA_REGULAR_MARKET_PRICE]
+
+    price_time = 0
+    price = None
+    for t, p in TIME_PRICE_DATA_DICT.items():
+        if price_time < symbol_data[t]:
+            price_time = symbol_data[t]
+            price = symbol_data[p]
+    return price
+
+
+class MarketHoursPolicy:
+    """Adapt the symbol update time to the market state.
+
+    Symbols whose market is closed are updated at the closed market interval. The
+    time at which the market of a symbol opens is learned from the transition out of
+    the closed state and the normal interval is used again ahead of that time.
+
+    The open time is taken from the quote timestamps of the new session rather than
+    the update time, which can be up to a closed market interval later.
+    """
+
+    def __init__(self, closed_market_interval: timedelta, open_lead: timedelta) -> None:
+        """Initialize."""
+        self._closed_market_interval = closed_market_interval
+        self._open_lead = open_lead
+
+        self._market_closed: dict[str, bool] = {}
+        """Last observed market closed status by symbol."""
+
+        self._open_times: dict[str, timedelta] = {}
+        """Learned market open time (UTC time of day) by symbol."""
+
+        self._closed_times: dict[str, datetime] = {}
+        """Time of the last update which found the market closed by symbol."""
+
+    @staticmethod
+    def is_market_closed(symbol_data: dict | None) -> bool:
+        """Check if the market for the symbol data is closed."""
+        if not symbol_data:
+            return False
+
+        if symbol_data[DATA_QUOTE_TYPE] in ALWAYS_OPEN_QUOTE_TYPES:
+            return False
+
+        return symbol_data[DATA_MARKET_STATE] in CLOSED_MARKET_STATES
+
+    def get_next_update(
+        self,
+        symbol: str,
+        symbol_data: dict | None,
+        now: datetime,
+        scan_interval: timedelta,
+    ) -> datetime:
+        """Return the time of the next update for the symbol."""
+
+        market_closed = self.is_market_closed(symbol_data)
+        was_market_closed = self._market_closed.get(symbol, False)
+        self._market_closed[symbol] = market_closed
+
+        if not market_closed:
+            if was_market_closed:
+                open_time = self._get_session_start(symbol, symbol_data, now)
+                self._open_times[symbol] = self._get_time_of_day(open_time)
+                LOGGER.debug(
+                    "%s market opened around %s UTC", symbol, open_time.time()
+                )
+
+            return now + scan_interval
+
+        self._closed_times[symbol] = now
+
+        next_open = self.get_next_open(symbol, now)
+        if next_open is None:
+            return now + max(self._closed_market_interval, scan_interval)
+
+        # Use the normal interval in the window around the expected open
+        wake_up_time = next_open - self._open_lead
+        if wake_up_time <= now:
+            return now + scan_interval
+
+        return min(
+            now + max(self._closed_market_interval, scan_interval), wake_up_time
+        )
+
+    def get_next_open(self, symbol: str, now: datetime) -> datetime | None:
+        """Return the next expected market open time, None if it is not known.
+
+        The open time is returned as long as it has not been passed by open_lead.
+        """
+        open_time = self._open_times.get(symbol)
+        if open_time is None:
+            return None
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        next_open = midnight + open_time - timedelta(days=1)
+        while next_open + self._open_lead <= now:
+            next_open += timedelta(days=1)
+
+        return next_open
+
+    def _get_session_start(
+        self, symbol: str, symbol_data: Mapping[str, Any], now: datetime
+    ) -> datetime:
+        """Return the start of the session the symbol data belongs to.
+
+        The earliest pre or regular market timestamp after the last closed market
+        update is used, the update time if there is none.
+        """
+        closed_time = self._closed_times.get(symbol)
+        session_start = now
+
+        for key in (DATA_PRE_MARKET_TIME, DATA_REGULAR_MARKET_TIME):
+            value = symbol_data.get(key)
+            if not value:
+                continue
+
+            # Timestamps up to the closed market update belong to the last session
+            quote_time = datetime.fromtimestamp(value, UTC)
+            if (closed_time is None or quote_time > closed_time) and (
+                quote_time < session_start
+            ):
+                session_start = quote_time
+
+        return session_start
+
+    @staticmethod
+    def _get_time_of_day(now: datetime) -> timedelta:
+        """Return the time of day as duration since midnight."""
+        return now - now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -0,0 +1,105 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any
+
+from .const import NUMERIC_DATA_DEFAULTS, NUMERIC_DATA_GROUPS, STRING_DATA_KEYS
+
+
+class QuoteRecord(Mapping[str, Any]):
+    """Data pieces of a quote.
+
+    The values are held in a list indexed by the field positions shared by all the
+    records of a projector, and are replaced in place on every refresh.
+    """
+
+    __slots__ = ("_fields", "_values")
+
+    def __init__(self, fields: dict[str, int], values: list[Any]) -> None:
+        """Initialize."""
+        self._fields = fields
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of the data piece."""
+        return self._values[self._fields[key]]
+
+    def __contains__(self, key: object) -> bool:
+        """Check if the data piece is part of the record."""
+        return key in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the data piece keys."""
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        """Return the number of data pieces."""
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        """Return the representation of the record."""
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+
+class QuoteProjector:
+    """Extract the tracked data pieces from a quote.
+
+    The (key, default) pairs are compiled once from the requested fields, the
+    projection is then a single pass over them without any lookups per key.
+    """
+
+    def __init__(self, fields: Iterable[str] | None = None) -> None:
+        """Initialize with the fields to extract, all the data pieces if None."""
+        requested_fields = None if fields is None else set(fields)
+
+        items: dict[str, Any] = {}
+        for data_group in NUMERIC_DATA_GROUPS.values():
+            for value in data_group:
+                key = value[0]
+                if requested_fields is None or key in requested_fields:
+                    # Default value for most missing numeric keys is 0
+                    items[key] = NUMERIC_DATA_DEFAULTS.get(key, 0)
+
+        items.update(dict.fromkeys(STRING_DATA_KEYS))
+
+        self.items: tuple[tuple[str, Any], ...] = tuple(items.items())
+        """Extracted (key, default value) pairs."""
+
+        self._keys = tuple(items)
+        self._defaults = tuple(items.values())
+        self._fields = {key: index for (index, key) in enumerate(self._keys)}
+
+    def project(self, symbol_data: dict[str, Any]) -> dict[str, Any]:
+        """Return the data pieces of the quote, defaults are used for missing keys."""
+        return dict(
+            zip(
+                self._keys,
+                map(symbol_data.get, self._keys, self._defaults),
+                strict=True,
+            )
+        )
+
+    def project_record(
+        self, symbol_data: Mapping[str, Any], record: Any = None
+    ) -> QuoteRecord:
+        """Return the data pieces of the quote as a record.
+
+        The record is updated in place if it was created by this projector.
+        """
+        values = map(symbol_data.get, self._keys, self._defaults)
+
+        # pylint: disable=protected-access
+        if isinstance(record, QuoteRecord) and record._fields is self._fields:  # noqa: SLF001
+            record._values[:] = values  # noqa: SLF001
+            return record
+
+        return QuoteRecord(self._fields, list(values))
+
+
+ALL_DATA_PROJECTOR = QuoteProjector()
+"""Projector of all the data pieces."""
@@ -0,0 +1,331 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+import math
+from operator import itemgetter
+from typing import Any
+
+from .const import (
+    CONF_DECIMAL_PLACES,
+    CONF_SHOW_OFF_MARKET_VALUES,
+    DATA_CURRENCY_SYMBOL,
+    DATA_FINANCIAL_CURRENCY,
+    DATA_REGULAR_MARKET_PREVIOUS_CLOSE,
+    DATA_REGULAR_MARKET_PRICE,
+    DEFAULT_CURRENCY,
+    DEFAULT_NUMERIC_DATA_GROUP,
+    NUMERIC_DATA_GROUPS,
+    PERCENTAGE_DATA_KEYS_NEEDING_MULTIPLICATION,
+    TIME_PRICE_DATA_DICT,
+)
+from .currency import ConversionRate, CurrencyConversionEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+"""numpy is needed for the columnar store."""
+
+INITIAL_CAPACITY = 64
+TRENDING_STATES = {-1.0: "down", 0.0: "neutral", 1.0: "up"}
+
+
+@dataclass(slots=True)
+class QuoteStoreValues:
+    """Precomputed values of a symbol."""
+
+    market_price: float | None
+    previous_close: float | None
+    trending: str | None
+    attributes: dict[str, float | int | None]
+
+
+class ColumnarQuoteStore:
+    """Numeric quote data of all the symbols held as one float64 array per field.
+
+    After every refresh the values shown by the entities are computed for all the
+    symbols in one vectorized pass: the market price, conversion to the target
+    currency, percentage scaling, rounding and the trending state. Missing values
+    are held as NaN. Integer values are reported as integers unless they are
+    converted. Conversion rates are taken from the conversion engine once per
+    currency pair.
+    """
+
+    def __init__(
+        self,
+        attribute_items: list[tuple],
+        decimal_places: int,
+        show_off_market_values: bool,
+        conversion_engine: CurrencyConversionEngine,
+    ) -> None:
+        """Initialize with the (key, is currency) numeric attributes to compute."""
+        self._conversion_engine = conversion_engine
+        self._decimal_places = decimal_places
+        self._show_off_market_values = show_off_market_values
+
+        keys = dict.fromkeys(value[0] for value in attribute_items)
+        keys.update(
+            dict.fromkeys(
+                (DATA_REGULAR_MARKET_PRICE, DATA_REGULAR_MARKET_PREVIOUS_CLOSE)
+            )
+        )
+        if show_off_market_values:
+            keys.update(dict.fromkeys(TIME_PRICE_DATA_DICT.keys()))
+            keys.update(dict.fromkeys(TIME_PRICE_DATA_DICT.values()))
+
+        self._keys = tuple(keys)
+        self._get_values = itemgetter(*self._keys)
+        columns = {key: index for (index, key) in enumerate(self._keys)}
+
+        self._attribute_keys = tuple(value[0] for value in attribute_items)
+        self._attribute_columns = np.array(
+            [columns[key] for key in self._attribute_keys], dtype=np.intp
+        )
+        self._currency_attributes = np.array(
+            [bool(value[1]) for value in attribute_items], dtype=bool
+        )
+        self._percent_attributes = np.array(
+            [
+                key in PERCENTAGE_DATA_KEYS_NEEDING_MULTIPLICATION
+                for key in self._attribute_keys
+            ],
+            dtype=bool,
+        )
+        self._price_column = columns[DATA_REGULAR_MARKET_PRICE]
+        self._previous_close_column = columns[DATA_REGULAR_MARKET_PREVIOUS_CLOSE]
+        self._time_columns: list[int] = []
+        self._time_price_columns: list[int] = []
+        if show_off_market_values:
+            self._time_columns = [columns[key] for key in TIME_PRICE_DATA_DICT]
+            self._time_price_columns = [
+                columns[key] for key in TIME_PRICE_DATA_DICT.values()
+            ]
+
+        self._rows: dict[str, int] = {}
+        """Row of the symbol in the arrays."""
+        self._target_currencies: dict[str, str | None] = {}
+        self._currency_resolved: set[str] = set()
+
+        self._values = np.full((len(self._keys), INITIAL_CAPACITY), np.nan)
+        self._integers = np.zeros((len(self._keys), INITIAL_CAPACITY), dtype=bool)
+        """Whether the value was an integer in the symbol data."""
+        self._conversion_pairs: dict[tuple[str, str | None], int] = {}
+        """Index of the (from, to) currency pairs in use."""
+        self._pair_indexes = np.full(INITIAL_CAPACITY, -1, dtype=np.intp)
+        """Currency pair of the row, -1 if there is no conversion."""
+
+        self._market_prices = np.empty(0)
+        self._previous_closes = np.empty(0)
+        self._trends = np.empty(0)
+        self._attributes = np.empty((len(self._attribute_keys), 0))
+        self._integer_attributes = np.empty((len(self._attribute_keys), 0), dtype=bool)
+
+    @staticmethod
+    def from_config(
+        domain_config: dict, conversion_engine: CurrencyConversionEngine
+    ) -> ColumnarQuoteStore:
+        """Create the store for the attributes of the enabled data groups."""
+        attribute_items = [
+            value
+            for (group, group_items) in NUMERIC_DATA_GROUPS.items()
+            if group == DEFAULT_NUMERIC_DATA_GROUP or domain_config.get(group, False)
+            for value in group_items
+        ]
+
+        return ColumnarQuoteStore(
+            attribute_items,
+            domain_config[CONF_DECIMAL_PLACES],
+            domain_config[CONF_SHOW_OFF_MARKET_VALUES],
+            conversion_engine,
+        )
+
+    def register(self, symbol: str, target_currency: str | None) -> None:
+        """Add the symbol of an entity and the currency it is presented in."""
+        self._get_row(symbol)
+        self._target_currencies[symbol] = target_currency
+        self._currency_resolved.discard(symbol)
+
+    def update(self, data: Mapping[str, Mapping[str, Any]]) -> None:
+        """Store the symbol data and compute the values of all the symbols."""
+        if data:
+            rows = [self._get_row(symbol) for symbol in data]
+            row_values = [
+                self._get_values(symbol_data) for symbol_data in data.values()
+            ]
+            self._values[:, rows] = np.array(row_values, dtype=np.float64).T
+            self._integers[:, rows] = np.array(
+                [[type(value) is int for value in values] for values in row_values],
+                dtype=bool,
+            ).T
+
+            for symbol, symbol_data in data.items():
+                if symbol not in self._currency_resolved:
+                    self._resolve_conversion(symbol, symbol_data)
+
+        self._compute()
+
+    def get_values(self, symbol: str) -> QuoteStoreValues | None:
+        """Return the precomputed values of the symbol, None if it is not known.
+
+        Values are known once the symbol data has been stored after registration.
+        """
+        if symbol not in self._currency_resolved:
+            return None
+
+        row = self._rows[symbol]
+
+        cells = self._attributes[:, row].tolist()
+        if self._decimal_places == 0:
+            attributes = {
+                key: None if math.isnan(value) else int(value)
+                for (key, value) in zip(self._attribute_keys, cells, strict=True)
+            }
+        else:
+            integers = self._integer_attributes[:, row].tolist()
+            attributes = {
+                key: None if math.isnan(value) else int(value) if integer else value
+                for (key, value, integer) in zip(
+                    self._attribute_keys, cells, integers, strict=True
+                )
+            }
+
+        market_price = float(self._market_prices[row])
+        previous_close = float(self._previous_closes[row])
+        trend = float(self._trends[row])
+
+        return QuoteStoreValues(
+            None if math.isnan(market_price) else market_price,
+            None if math.isnan(previous_close) else previous_close,
+            TRENDING_STATES.get(trend),
+            attributes,
+        )
+
+    def _get_row(self, symbol: str) -> int:
+        """Return the row of the symbol, a row is added for a new symbol."""
+        row = self._rows.get(symbol)
+        if row is not None:
+            return row
+
+        row = len(self._rows)
+        capacity = self._values.shape[1]
+        if row >= capacity:
+            extra = capacity
+            self._values = np.concatenate(
+                (self._values, np.full((len(self._keys), extra), np.nan)), axis=1
+            )
+            self._integers = np.concatenate(
+                (self._integers, np.zeros((len(self._keys), extra), dtype=bool)),
+                axis=1,
+            )
+            self._pair_indexes = np.concatenate(
+                (self._pair_indexes, np.full(extra, -1, dtype=np.intp))
+            )
+
+        self._rows[symbol] = row
+        return row
+
+    def _resolve_conversion(
+        self, symbol: str, symbol_data: Mapping[str, Any]
+    ) -> None:
+        """Set up the conversion of the symbol from the currency in its data."""
+        self._currency_resolved.add(symbol)
+
+        original_currency = (
+            symbol_data[DATA_CURRENCY_SYMBOL]
+            or symbol_data[DATA_FINANCIAL_CURRENCY]
+            or DEFAULT_CURRENCY
+        )
+        target_currency = self._target_currencies.get(symbol)
+
+        pair_index = -1
+        if target_currency != original_currency:
+            pair_index = self._conversion_pairs.setdefault(
+                (original_currency, target_currency), len(self._conversion_pairs)
+            )
+
+        self._pair_indexes[self._rows[symbol]] = pair_index
+
+    def _compute(self) -> None:
+        """Compute the values of all the symbols."""
+        count = len(self._rows)
+        values = self._values[:, :count]
+
+        if self._show_off_market_values:
+            # Price with the latest time, there is no price if no time is known
+            times = np.nan_to_num(values[self._time_columns], nan=0.0)
+            latest = np.argmax(times, axis=0)
+            market_prices = values[self._time_price_columns][
+                latest, np.arange(count)
+            ]
+            market_prices[times.max(axis=0, initial=0.0) <= 0] = np.nan
+        else:
+            market_prices = values[self._price_column].copy()
+
+        # An unknown rate becomes NaN. The last rate is used by the rows without
+        # conversion (-1).
+        pair_rates = [
+            self._conversion_engine.get_rate(*pair) for pair in self._conversion_pairs
+        ]
+        rates = np.array(
+            [self._get_rate(rate) for rate in pair_rates] + [1.0], dtype=np.float64
+        )
+        pair_indexes = self._pair_indexes[:count]
+        conversions = rates[pair_indexes]
+
+        self._market_prices = market_prices * conversions
+        self._previous_closes = values[self._previous_close_column] * conversions
+        self._trends = np.sign(self._market_prices - self._previous_closes)
+
+        attributes = values[self._attribute_columns]
+        attributes[self._currency_attributes] *= conversions
+        attributes[self._percent_attributes] *= 100
+
+        if self._decimal_places == 0:
+            attributes = np.trunc(attributes)
+        elif self._decimal_places > 0:
+            attributes = self._round(attributes)
+
+        self._attributes = attributes
+
+        # Converted values are not integers anymore
+        converted = np.array(
+            [rate.value is not None for rate in pair_rates] + [False], dtype=bool
+        )
+        integers = self._integers[self._attribute_columns, :count]
+        integers[self._currency_attributes] &= ~converted[pair_indexes]
+        self._integer_attributes = integers
+
+    @staticmethod
+    def _get_rate(rate: ConversionRate) -> float:
+        """Return the rate as a number, NaN if it is not known."""
+        if rate.value is not None:
+            return rate.value
+
+        # Neither a multiplier nor a conversion symbol
+        return 1.0 if rate.available else np.nan
+
+    def _round(self, values: np.ndarray) -> np.ndarray:
+        """Round the values to decimal_places like round() does.
+
+        np.round rounds the scaled value, which can land on a half when the exact
+        value does not. Such values are rounded by round() from the exact value.
+        """
+        scale = 10.0**self._decimal_places
+        scaled = values * scale
+        rounded = np.round(scaled) / scale
+
+        halves = np.abs(scaled - np.floor(scaled) - 0.5) <= 4 * np.spacing(
+            np.abs(scaled)
+        )
+        for index in zip(*np.nonzero(halves), strict=True):
+            rounded[index] = round(float(values[index]), self._decimal_places)
+
+        return rounded
@@ -0,0 +1,102 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import codecs
+import json
+import re
+from typing import Any
+
+from homeassistant.util.json import json_loads
+
+RESULT_START = re.compile(r'"result"\s*:\s*\[')
+ITEM_SEPARATOR = re.compile(r"[\s,]*")
+
+
+class QuoteStreamParser:
+    """Incremental parser of a quote response.
+
+    The objects of quoteResponse.result are decoded one at a time as the body
+    arrives and handed to on_quote, only the object being decoded is held in memory.
+    The rest of the document is decoded once complete, with an empty result.
+    """
+
+    def __init__(self, on_quote: Callable[[dict[str, Any]], None]) -> None:
+        """Initialize."""
+        self._on_quote = on_quote
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+
+        self._buffer = ""
+        self._prefix: str | None = None
+        """Document before the result array, None till the array is found."""
+        self._tail: list[str] | None = None
+        """Document after the result array, None till the array ends."""
+
+        self.quote_count = 0
+        """Number of quotes handed to on_quote."""
+
+    def feed(self, data: bytes) -> None:
+        """Parse the next chunk of the body."""
+        self._buffer += self._text_decoder.decode(data)
+        self._process(final=False)
+
+    def close(self) -> Any:
+        """Parse the end of the body and return the document without the quotes.
+
+        The whole document is returned if it does not have a result array.
+        """
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._process(final=True)
+
+        if self._prefix is None:
+            return json_loads(self._buffer) if self._buffer.strip() else None
+
+        if self._tail is None:
+            raise ValueError("Quote result array is incomplete")
+
+        return json_loads(self._prefix + "[]" + "".join(self._tail))
+
+    def _process(self, final: bool) -> None:
+        """Hand over the complete quotes in the buffer."""
+        if self._tail is not None:
+            self._tail.append(self._buffer)
+            self._buffer = ""
+            return
+
+        if self._prefix is None:
+            match = RESULT_START.search(self._buffer)
+            if match is None:
+                return
+
+            self._prefix = self._buffer[: match.end() - 1]
+            self._buffer = self._buffer[match.end() :]
+
+        buffer = self._buffer
+        index = 0
+        while True:
+            index = ITEM_SEPARATOR.match(buffer, index).end()
+            if index >= len(buffer):
+                break
+
+            if buffer[index] == "]":
+                self._tail = [buffer[index + 1 :]]
+                self._buffer = ""
+                return
+
+            try:
+                (quote, index) = self._json_decoder.raw_decode(buffer, index)
+            except json.JSONDecodeError:
+                # The quote is incomplete till the final chunk
+                if final:
+                    raise
+                break
+
+            self._on_quote(quote)
+            self.quote_count += 1
+
+        self._buffer = buffer[index:]
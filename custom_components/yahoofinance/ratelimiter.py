@@ -0,0 +1,128 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+
+from .const import LOGGER, REQUEST_PRIORITY_HIGH
+
+
+class RateLimiter:
+    """Token bucket rate limiter shared by all the Yahoo requests.
+
+    Tokens are added at requests_per_minute up to burst. Requests waiting for a token
+    are served in priority order (lower value first) and then in arrival order.
+    """
+
+    def __init__(self, requests_per_minute: int, burst: int) -> None:
+        """Initialize."""
+        self._rate = requests_per_minute / 60
+        self._capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._wakeup_handle: asyncio.TimerHandle | None = None
+
+        self.last_wait_time = 0.0
+        """Seconds the last request waited for a token."""
+        self.total_wait_time = 0.0
+        """Total seconds all requests waited for a token."""
+        self.request_count = 0
+        """Number of requests which acquired a token."""
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for a token."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @property
+    def average_wait_time(self) -> float:
+        """Return the average seconds a request waited for a token."""
+        if self.request_count == 0:
+            return 0.0
+        return self.total_wait_time / self.request_count
+
+    async def acquire(self, priority: int = REQUEST_PRIORITY_HIGH) -> None:
+        """Wait till a request can be made."""
+        start_time = time.monotonic()
+        self._refill()
+
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record_wait(0.0)
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        LOGGER.debug(
+            "Request waiting for rate limiter, priority=%d, queue depth=%d",
+            priority,
+            self.queue_depth,
+        )
+        self._schedule_wakeup()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Pass the token on if it was granted just before cancellation
+            if future.done() and not future.cancelled():
+                self._tokens += 1
+            self._release_waiters()
+            raise
+
+        self._record_wait(time.monotonic() - start_time)
+
+    def _record_wait(self, wait_time: float) -> None:
+        """Record the wait time of a request."""
+        self.last_wait_time = wait_time
+        self.total_wait_time += wait_time
+        self.request_count += 1
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def _release_waiters(self) -> None:
+        """Grant tokens to the waiting requests in priority order."""
+        if self._wakeup_handle is not None:
+            self._wakeup_handle.cancel()
+            self._wakeup_handle = None
+
+        self._refill()
+
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # Cancelled
+                continue
+
+            self._tokens -= 1
+            future.set_result(None)
+
+        # Drop cancelled requests at the head of the queue
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._waiters:
+            self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """Schedule release of the waiting requests when the next token is available."""
+        if self._wakeup_handle is not None:
+            return
+
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._wakeup_handle = asyncio.get_running_loop().call_later(
+            delay, self._release_waiters
+        )
@@ -0,0 +1,255 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import math
+from typing import Final
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_time_interval,
+)
+
+from .const import CONNECTION_KEEPALIVE, LOGGER, PREWARM_LEAD
+from .coordinator import YahooSymbolUpdateCoordinator
+
+SCHEDULER_TOLERANCE: Final = timedelta(seconds=5)
+"""Coordinators due within this duration of a tick are included in the tick."""
+
+
+class YahooSymbolScheduler:
+    """Drive all the timed coordinators from a single timer.
+
+    The timer runs on the GCD of the coordinator intervals. On every tick the symbols
+    which are due from all the coordinators are requested together and the results
+    are handed back to the owning coordinators. Ticks are skipped while the circuit
+    breaker has paused data requests.
+
+    If the idle connections would have been closed by the next tick with due symbols,
+    a connection to the quote host is opened shortly before it so that the update does
+    not wait for the connection setup.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinators: list[YahooSymbolUpdateCoordinator]
+    ) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._coordinators = [
+            coordinator
+            for coordinator in coordinators
+            if coordinator.scan_interval is not None
+        ]
+
+        self.tick_interval: timedelta | None = None
+        """Interval of the scheduler timer, None if there are no timed coordinators."""
+
+        if self._coordinators:
+            seconds = math.gcd(
+                *[
+                    int(coordinator.scan_interval.total_seconds())
+                    for coordinator in self._coordinators
+                ]
+            )
+            self.tick_interval = timedelta(seconds=max(seconds, 1))
+
+        self._tick_in_progress = False
+        self._last_request_time: datetime | None = None
+        self._unsub_tick: CALLBACK_TYPE | None = None
+        self._unsub_prewarm: CALLBACK_TYPE | None = None
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Take over the coordinator timers and start the scheduler timer."""
+        if self.tick_interval is None:
+            return
+
+        for coordinator in self._coordinators:
+            # The coordinator should not schedule its own updates, the refresh
+            # scheduled by the initial refresh is cancelled too
+            coordinator.update_interval = None
+            coordinator._async_unsub_refresh()  # noqa: SLF001
+
+        LOGGER.info(
+            "Starting scheduler for %d coordinators with tick interval %s",
+            len(self._coordinators),
+            self.tick_interval,
+        )
+
+        self._unsub_tick = async_track_time_interval(
+            self._hass, self._async_tick, self.tick_interval
+        )
+        self._unsub_stop = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the scheduler timer."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+
+        if self._unsub_prewarm is not None:
+            self._unsub_prewarm()
+            self._unsub_prewarm = None
+
+    @callback
+    def _async_handle_stop(self, _event: Event) -> None:
+        """Stop the scheduler when Home Assistant stops."""
+        self._unsub_stop = None
+        self.async_stop()
+
+    def get_due_symbols(
+        self, now: datetime
+    ) -> dict[YahooSymbolUpdateCoordinator, list[str]]:
+        """Return the due symbols by coordinator."""
+        due_time = now + min(SCHEDULER_TOLERANCE, self.tick_interval / 2)
+        due_symbols = {}
+
+        for coordinator in self._coordinators:
+            symbols = coordinator.get_due_symbols(due_time)
+            if symbols:
+                due_symbols[coordinator] = symbols
+
+        return due_symbols
+
+    async def _async_tick(self, now: datetime) -> None:
+        """Request data for all the due symbols in one batch."""
+        if self._tick_in_progress:
+            LOGGER.debug("Previous scheduler tick is still in progress")
+            return
+
+        # Symbols stay due and get requested once the host accepts requests again
+        paused_time = self._coordinators[0].get_paused_time()
+        if paused_time > 0:
+            LOGGER.debug("Scheduler paused for %d seconds", paused_time)
+            return
+
+        due_symbols = self.get_due_symbols(now)
+        if due_symbols:
+            self._tick_in_progress = True
+            try:
+                await self._async_update(due_symbols, now)
+            finally:
+                self._tick_in_progress = False
+                self._last_request_time = now
+
+        self._schedule_prewarm(now)
+
+    def get_next_due_tick(self, now: datetime) -> datetime | None:
+        """Return the time of the next tick which has due symbols."""
+        max_interval = max(
+            coordinator.scan_interval for coordinator in self._coordinators
+        )
+
+        # Every symbol is due again within the longest interval
+        for tick in range(1, max_interval // self.tick_interval + 1):
+            tick_time = now + self.tick_interval * tick
+            if self.get_due_symbols(tick_time):
+                return tick_time
+
+        return None
+
+    @callback
+    def _schedule_prewarm(self, now: datetime) -> None:
+        """Schedule opening a connection ahead of the next tick with due symbols."""
+        if self._unsub_prewarm is not None:
+            self._unsub_prewarm()
+            self._unsub_prewarm = None
+
+        # There is no next tick if the scheduler was stopped
+        if self._unsub_tick is None:
+            return
+
+        next_tick = self.get_next_due_tick(now)
+        if next_tick is None:
+            return
+
+        # The connection of the last request is still open if the next request comes
+        # within the keep-alive time
+        if (
+            self._last_request_time is not None
+            and (next_tick - self._last_request_time).total_seconds()
+            <= CONNECTION_KEEPALIVE
+        ):
+            return
+
+        prewarm_time = max(next_tick - PREWARM_LEAD, now)
+        self._unsub_prewarm = async_track_point_in_utc_time(
+            self._hass, self._async_prewarm, prewarm_time
+        )
+
+    @callback
+    def _async_prewarm(self, now: datetime) -> None:
+        """Open a connection to the quote host."""
+        self._unsub_prewarm = None
+        self._last_request_time = now
+        self._hass.async_create_task(self._coordinators[0].async_prewarm_connection())
+
+    async def _async_update(
+        self,
+        due_symbols: dict[YahooSymbolUpdateCoordinator, list[str]],
+        now: datetime,
+    ) -> None:
+        """Request data for the due symbols and update the coordinators."""
+
+        owners: dict[str, list[YahooSymbolUpdateCoordinator]] = {}
+        for coordinator, symbols in due_symbols.items():
+            for symbol in symbols:
+                owners.setdefault(symbol, []).append(coordinator)
+
+        symbols = list(owners)
+        LOGGER.debug("Scheduler requesting %d symbols", len(symbols))
+
+        # All the coordinators share the crumb and session, any one can make the request
+        requester = next(iter(due_symbols))
+
+        try:
+            (result, stale_symbols) = await requester.async_fetch_symbols(symbols)
+        except Exception as error:  # noqa: BLE001
+            LOGGER.warning("Scheduled data request failed. %s", error)
+            for coordinator in due_symbols:
+                coordinator.async_set_scheduled_error(error, now)
+            return
+
+        results: dict[YahooSymbolUpdateCoordinator, list[dict]] = {
+            coordinator: [] for coordinator in due_symbols
+        }
+
+        for symbol_data in result:
+            symbol = symbol_data["symbol"]
+            symbol_owners = owners.get(symbol)
+
+            if symbol_owners is None:
+                fixed_symbol = YahooSymbolUpdateCoordinator.fix_conversion_symbol(
+                    symbol, symbol_data
+                )
+                symbol_owners = owners.get(fixed_symbol)
+
+            if symbol_owners is None:
+                LOGGER.warning("Received %s not in symbol list", symbol)
+                continue
+
+            for coordinator in symbol_owners:
+                results[coordinator].append(symbol_data)
+
+        stale = set(stale_symbols)
+        for coordinator, coordinator_symbols in due_symbols.items():
+            coordinator.async_set_scheduled_result(
+                [symbol for symbol in coordinator_symbols if symbol not in stale],
+                results[coordinator],
+                [symbol for symbol in coordinator_symbols if symbol in stale],
+                now,
+            )
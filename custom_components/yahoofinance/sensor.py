@@ -42,21 +42,31 @@ from .const import (
     DATA_QUOTE_SOURCE_NAME,
     DATA_QUOTE_TYPE,
     DATA_REGULAR_MARKET_PREVIOUS_CLOSE,
-    DATA_REGULAR_MARKET_PRICE,
     DATA_SHORT_NAME,
     DATE_DATA_KEYS,
     DEFAULT_CURRENCY,
     DEFAULT_NUMERIC_DATA_GROUP,
     DOMAIN,
     HASS_DATA_CONFIG,
+    HASS_DATA_CONVERSION_ENGINE,
     HASS_DATA_COORDINATORS,
+    HASS_DATA_CURRENCY_CACHE,
+    HASS_DATA_QUOTE_STORE,
     LOGGER,
     NUMERIC_DATA_GROUPS,
     PERCENTAGE_DATA_KEYS_NEEDING_MULTIPLICATION,
     TIME_PRICE_DATA_DICT,
 )
 from .coordinator import YahooSymbolUpdateCoordinator
+from .currency import (
+    CurrencyCache,
+    CurrencyConversionEngine,
+    convert_values,
+    get_conversion_symbol,
+)
 from .dataclasses import SymbolDefinition
+from .market import get_market_price
+from .quotestore import ColumnarQuoteStore
 
 ENTITY_ID_FORMAT = SENSOR_DOMAIN + "." + DOMAIN + "_{}"
 
@@ -75,7 +85,9 @@ async def async_setup_platform(
     domain_config = hass.data[DOMAIN][HASS_DATA_CONFIG]
     symbol_definitions: list[SymbolDefinition] = domain_config[CONF_SYMBOLS]
 
-    # We don't know the currency of a symbol so can't added conversion symbols upfront
+    # Conversion symbols for the cached symbol currencies are added upfront and
+    # requested with the initial data. A sensor adds the conversion symbols itself
+    # once it finds that its currency was not cached or has changed.
 
     sensors = [
         YahooFinanceSensor(
@@ -84,7 +96,8 @@ async def async_setup_platform(
         for symbol in symbol_definitions
     ]
 
-    # We have already invoked async_refresh on coordinator, so don't update_before_add
+    # Initial data is requested in the background, entities remain unavailable till
+    # then. So don't update_before_add.
     async_add_entities(sensors, update_before_add=False)
     LOGGER.info("Entities added for %s", [item.symbol for item in symbol_definitions])
 
@@ -132,6 +145,21 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
         self._no_unit = symbol_definition.no_unit
         self._show_off_market_values = domain_config[CONF_SHOW_OFF_MARKET_VALUES]
 
+        # Values are precomputed for all the symbols if the columnar store is enabled
+        self._quote_store: ColumnarQuoteStore | None = hass.data.get(
+            DOMAIN, {}
+        ).get(HASS_DATA_QUOTE_STORE)
+        if self._quote_store is not None:
+            self._quote_store.register(symbol, self._target_currency)
+
+        # Currencies of converted symbols are cached for requesting the conversion
+        # symbols with the initial data at the next startup
+        self._currency_cache: CurrencyCache | None = None
+        if self._target_currency:
+            self._currency_cache = hass.data.get(DOMAIN, {}).get(
+                HASS_DATA_CURRENCY_CACHE
+            )
+
         self._unique_id = symbol
         self.entity_id = async_generate_entity_id(ENTITY_ID_FORMAT, symbol, hass=hass)
 
@@ -160,6 +188,10 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
                     key = value[0]
                     self._attr_extra_state_attributes[key] = None
 
+        self._currency_data_keys = tuple(
+            value[0] for value in self._numeric_data_to_include if value[1]
+        )
+
         # Delay initial data population to `available` which is called from `_async_write_ha_state`
         LOGGER.debug(
             "Created entity for %s with target_currency=%s",
@@ -265,80 +297,46 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
 
         return round(value, self._decimal_places)
 
-    def _find_symbol_data(self, symbol: str) -> any | None:
-        """Find data for the specified symbol in all coordinators."""
-        coordinators: dict[timedelta, YahooSymbolUpdateCoordinator] = self._hass.data[
-            DOMAIN
-        ][HASS_DATA_COORDINATORS]
-
-        if coordinators:
-            for coordinator in coordinators.values():
-                data = coordinator.data
-                if data is not None:
-                    symbol_data = data.get(symbol)
-                    if symbol_data is not None:
-                        return symbol_data
-
-        return None
-
     def _get_market_price(self, symbol_data: dict) -> float | None:
-        if not symbol_data:
-            return None
-        if not self._show_off_market_values:
-          return symbol_data[DATA_REGULAR_MARKET_PRICE]
-        price_time = 0
-        price = None
-        for t, p in TIME_PRICE_DATA_DICT.items():
-            if price_time < symbol_data[t]:
-                price_time = symbol_data[t]
-                price = symbol_data[p]
-        return price
+        return get_market_price(symbol_data, self._show_off_market_values)
 
     def _get_target_currency_conversion(self) -> float | None:
         """Return the conversion factor to target currency."""
-        value = None
         self._waiting_on_conversion = False
 
         if not self._original_currency:
             return None
 
-        # GBp needs to be converted to GBP. There is no symbol in YahooFinance for this
-        # and we will simply use the multiplication factor of 0.01.
-
-        if not self._target_currency:
-            return 0.01 if self._original_currency == "GBp" else None
-
         if self._target_currency == self._original_currency:
             LOGGER.info("%s No conversion necessary", self._symbol)
             return None
 
-        if self._original_currency == "GBp":
-            value = 0.01
-            conversion_symbol = f"GBP{self._target_currency}=X".upper()
-        else:
-            value = 1
-            conversion_symbol = (
-                f"{self._original_currency}{self._target_currency}=X".upper()
-            )
+        # Only the minor unit multiplier can apply without a target currency
+        if not self._target_currency:
+            return get_conversion_symbol(self._original_currency, None)[1]
 
-        # Locate conversion symbol in all coordinators
-        symbol_data = self._find_symbol_data(conversion_symbol)
+        # The rate is shared by all the sensors with the same currencies
+        conversion_engine: CurrencyConversionEngine = self._hass.data[DOMAIN][
+            HASS_DATA_CONVERSION_ENGINE
+        ]
+        rate = conversion_engine.get_rate(
+            self._original_currency, self._target_currency
+        )
 
-        if symbol_data is not None:
-            value = value * self._get_market_price(symbol_data)
-            LOGGER.debug("%s %s is %s", self._symbol, conversion_symbol, value)
-        else:
-            LOGGER.info(
-                "%s No data found for %s, symbol added to coordinator",
-                self._symbol,
-                conversion_symbol,
-            )
-            self._waiting_on_conversion = True
+        if rate.available:
+            return rate.value
 
-            # The conversion symbol is added to the current coordinator
-            self.coordinator.add_symbol(conversion_symbol)
+        LOGGER.info(
+            "%s No data found for %s, symbols added to coordinator",
+            self._symbol,
+            rate.conversion_symbols,
+        )
+        self._waiting_on_conversion = True
 
-        return value
+        # The conversion symbols are added to the current coordinator
+        for conversion_symbol in rate.conversion_symbols:
+            self.coordinator.add_symbol(conversion_symbol)
+        return rate.multiplier
 
     def _update_original_currency_once(self, symbol_data) -> bool:
         """Calculate the original currency once."""
@@ -361,6 +359,9 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
 
         self._original_currency = currency or financial_currency or DEFAULT_CURRENCY
 
+        if self._currency_cache is not None:
+            self._currency_cache.set(self._symbol, self._original_currency)
+
     def update_properties(self) -> None:
         """Update local fields. This is also used in unit testing."""
 
@@ -380,35 +381,18 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
         self._short_name = symbol_data[DATA_SHORT_NAME]
         self._long_name = symbol_data[DATA_LONG_NAME]
 
-        market_price = self._get_market_price(symbol_data)
-        self._market_price = self.safe_convert(market_price, conversion)
-        # _market_price gets rounded in the `state` getter.
-
-        if conversion:
-            LOGGER.info(
-                "%s converted %s X %s = %s",
-                self._symbol,
-                market_price,
-                conversion,
-                self._market_price,
-            )
-
-        self._previous_close = self.safe_convert(
-            symbol_data[DATA_REGULAR_MARKET_PREVIOUS_CLOSE], conversion
+        store_values = (
+            self._quote_store.get_values(self._symbol)
+            if self._quote_store is not None
+            else None
         )
 
-        for value in self._numeric_data_to_include:
-            key = value[0]
-            attr_value = symbol_data[key]
-
-            # Convert if currency value
-            if value[1]:
-                attr_value = self.safe_convert(attr_value, conversion)
-
-            if key in PERCENTAGE_DATA_KEYS_NEEDING_MULTIPLICATION:
-                attr_value = attr_value * 100
-
-            self._attr_extra_state_attributes[key] = self._round(attr_value)
+        if store_values is not None:
+            self._market_price = store_values.market_price
+            self._previous_close = store_values.previous_close
+            self._attr_extra_state_attributes.update(store_values.attributes)
+        else:
+            self._update_numeric_values(symbol_data, conversion)
 
         # Add some other string attributes
         self._attr_extra_state_attributes[ATTR_QUOTE_TYPE] = symbol_data[
@@ -447,7 +431,11 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
         self._currency = currency.upper()
         lower_currency = self._currency.lower()
 
-        trending_state = self._calc_trending_state()
+        trending_state = (
+            store_values.trending
+            if store_values is not None
+            else self._calc_trending_state()
+        )
 
         # Fall back to currency based icon if there is no trending state
         if trending_state is not None:
@@ -466,6 +454,41 @@ class YahooFinanceSensor(CoordinatorEntity, SensorEntity):
             lower_currency
         )
 
+    def _update_numeric_values(
+        self, symbol_data: dict, conversion: float | None
+    ) -> None:
+        """Update the market price and numeric attributes from the symbol data."""
+        market_price = self._get_market_price(symbol_data)
+        self._market_price = self.safe_convert(market_price, conversion)
+        # _market_price gets rounded in the `state` getter.
+
+        if conversion:
+            LOGGER.info(
+                "%s converted %s X %s = %s",
+                self._symbol,
+                market_price,
+                conversion,
+                self._market_price,
+            )
+
+        self._previous_close = self.safe_convert(
+            symbol_data[DATA_REGULAR_MARKET_PREVIOUS_CLOSE], conversion
+        )
+
+        # All the currency values are converted together
+        converted_values = convert_values(
+            symbol_data, self._currency_data_keys, conversion
+        )
+
+        for value in self._numeric_data_to_include:
+            key = value[0]
+            attr_value = converted_values[key] if value[1] else symbol_data[key]
+
+            if key in PERCENTAGE_DATA_KEYS_NEEDING_MULTIPLICATION:
+                attr_value = attr_value * 100
+
+            self._attr_extra_state_attributes[key] = self._round(attr_value)
+
     def _calc_trending_state(self) -> str | None:
         """Return the trending state for the symbol."""
         if self._market_price is None or self._previous_close is None:
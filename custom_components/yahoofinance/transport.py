@@ -0,0 +1,148 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from http.cookies import BaseCookie
+
+import aiohttp
+from aiohttp.abc import AbstractCookieJar
+from yarl import URL
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.util import ssl as ssl_util
+
+from .const import (
+    CONNECTION_KEEPALIVE,
+    CONNECTION_LIMIT,
+    CONNECTION_LIMIT_PER_HOST,
+    COOKIE_DOMAIN,
+    DNS_CACHE_TTL,
+    HASS_DATA_TRANSPORT,
+    LOGGER,
+    MAX_LINE_SIZE,
+    XHR_REQUEST_HEADERS,
+)
+
+COOKIE_URL = URL(f"https://finance.{COOKIE_DOMAIN}")
+
+
+class YahooTransport:
+    """HTTP transport for all the Yahoo requests.
+
+    One long-lived session is used so that connections are reused across refresh
+    cycles and configuration reloads. Cookies received from Yahoo are kept in the
+    session cookie jar and sent along with every request.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._connector: aiohttp.TCPConnector | None = None
+        self._session: aiohttp.ClientSession | None = None
+        self._xhr_headers: dict[str, dict[str, str]] = {}
+        """XHR request headers by user agent."""
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the session, it is created on first use."""
+        if self._session is None:
+            self._session = self._create_session(aiohttp.CookieJar())
+        return self._session
+
+    @property
+    def cookie_jar(self) -> AbstractCookieJar:
+        """Return the cookie jar of the session."""
+        return self.session.cookie_jar
+
+    def _create_session(self, cookie_jar: aiohttp.CookieJar) -> aiohttp.ClientSession:
+        """Create a session on the shared connection pool."""
+        if self._connector is None:
+            self._connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=CONNECTION_KEEPALIVE,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                ssl=ssl_util.get_default_context(),
+            )
+
+        # Testing showed that the response header for initial request can up to 40KB
+        return aiohttp.ClientSession(
+            connector=self._connector,
+            connector_owner=False,
+            cookie_jar=cookie_jar,
+            max_field_size=MAX_LINE_SIZE,
+            max_line_size=MAX_LINE_SIZE,
+        )
+
+    def fork(self) -> YahooTransport:
+        """Return a transport with its own cookie jar on the same connection pool."""
+        transport = YahooTransport(self._hass)
+        transport._session = self._create_session(aiohttp.CookieJar())  # noqa: SLF001
+        transport._connector = self._connector  # noqa: SLF001
+        transport._xhr_headers = self._xhr_headers  # noqa: SLF001
+        return transport
+
+    def get_xhr_headers(self, user_agent: str) -> dict[str, str]:
+        """Return the XHR request headers for the user agent, these should not be modified."""
+        headers = self._xhr_headers.get(user_agent)
+        if headers is None:
+            headers = self._xhr_headers[user_agent] = {
+                **XHR_REQUEST_HEADERS,
+                "user-agent": user_agent,
+            }
+        return headers
+
+    def set_cookies(self, cookies: BaseCookie[str] | None) -> None:
+        """Replace the cookies in the jar, cookies without domain are used for all Yahoo hosts."""
+        if not cookies:
+            if self._session is not None:
+                self._session.cookie_jar.clear()
+            return
+
+        self.cookie_jar.clear()
+
+        for name, morsel in cookies.items():
+            if not morsel["domain"]:
+                morsel = morsel.copy()  # noqa: PLW2901
+                morsel["domain"] = COOKIE_DOMAIN
+            self.cookie_jar.update_cookies({name: morsel}, COOKIE_URL)
+
+    def get_cookies(self) -> BaseCookie[str]:
+        """Return the cookies in the jar."""
+        cookies: BaseCookie[str] = BaseCookie()
+        for morsel in self.cookie_jar:
+            cookies[morsel.key] = morsel
+        return cookies
+
+    async def async_close(self, close_connector: bool = True) -> None:
+        """Close the session and, unless shared with other sessions, the connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        if close_connector and self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+
+@callback
+def async_get_transport(hass: HomeAssistant) -> YahooTransport:
+    """Return the transport, it is created once and closed when Home Assistant closes."""
+    transport: YahooTransport | None = hass.data.get(HASS_DATA_TRANSPORT)
+    if transport is not None:
+        return transport
+
+    transport = hass.data[HASS_DATA_TRANSPORT] = YahooTransport(hass)
+
+    async def _async_close(_event: Event) -> None:
+        LOGGER.debug("Closing transport")
+        hass.data.pop(HASS_DATA_TRANSPORT, None)
+        await transport.async_close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return transport
+
@@ -0,0 +1,130 @@
+"""The Yahoo finance component.
+
+https://github.com/iprak/yahoofinance
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from http import HTTPStatus
+import random
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_LATENCY_FACTOR,
+    HEDGE_MAX_DELAY,
+    HEDGE_MIN_DELAY,
+    LOGGER,
+    STORAGE_KEY_USER_AGENTS,
+    STORAGE_VERSION,
+    USER_AGENT_EXPLORATION_RATE,
+    USER_AGENT_STATS_ALPHA,
+    USER_AGENT_STATS_SAVE_DELAY,
+)
+from .dataclasses import UserAgentStats
+
+
+class UserAgentSelector:
+    """Select the user agents for requests based on their observed results.
+
+    Agents are ordered by a score derived from the success rate, 429 rate and
+    latency. Occasionally a different agent is tried first so that the stats of
+    all the agents stay current. The stats are persisted across restarts.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        user_agents: list[str],
+        exploration_rate: float = USER_AGENT_EXPLORATION_RATE,
+    ) -> None:
+        """Initialize."""
+        self._user_agents = list(user_agents)
+        self._exploration_rate = exploration_rate
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY_USER_AGENTS
+        )
+
+        self.stats: dict[str, UserAgentStats] = {
+            user_agent: UserAgentStats() for user_agent in self._user_agents
+        }
+        """Stats by user agent."""
+
+    @property
+    def user_agents(self) -> list[str]:
+        """Return the configured user agents."""
+        return self._user_agents
+
+    async def async_load(self) -> None:
+        """Load the persisted stats of the configured agents."""
+        data = await self._store.async_load()
+        if not data:
+            return
+
+        for user_agent, stats in data.get("agents", {}).items():
+            if user_agent in self.stats:
+                self.stats[user_agent] = UserAgentStats(**stats)
+
+        LOGGER.debug("Loaded user agent stats %s", self.stats)
+
+    def get_score(self, user_agent: str) -> float:
+        """Return the score of the agent, higher is better."""
+        stats = self.stats[user_agent]
+        return stats.success_rate * (1 - stats.throttle_rate) / (1 + stats.latency)
+
+    def get_ordered_agents(self) -> list[str]:
+        """Return the agents in the order in which they should be tried."""
+        ordered = sorted(self._user_agents, key=self.get_score, reverse=True)
+
+        if len(ordered) > 1 and random.random() < self._exploration_rate:
+            explored = random.choice(ordered[1:])
+            ordered.remove(explored)
+            ordered.insert(0, explored)
+            LOGGER.debug("Exploring user agent '%s'", explored)
+
+        return ordered
+
+    def get_hedge_delay(self, user_agent: str) -> float:
+        """Return the seconds to wait for the agent before trying another agent."""
+        stats = self.stats.get(user_agent)
+        if stats is None or stats.latency == 0:
+            return HEDGE_DEFAULT_DELAY
+
+        return min(
+            max(stats.latency * HEDGE_LATENCY_FACTOR, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY
+        )
+
+    def record_result(
+        self, user_agent: str, status: int | None, latency: float | None = None
+    ) -> None:
+        """Record the result of a request, status is None if there was no response."""
+        stats = self.stats.get(user_agent)
+        if stats is None:
+            return
+
+        alpha = USER_AGENT_STATS_ALPHA
+        success = 1.0 if status == HTTPStatus.OK else 0.0
+        throttled = 1.0 if status == HTTPStatus.TOO_MANY_REQUESTS else 0.0
+
+        stats.request_count += 1
+        stats.success_rate += alpha * (success - stats.success_rate)
+        stats.throttle_rate += alpha * (throttled - stats.throttle_rate)
+        if latency is not None:
+            if stats.request_count == 1:
+                stats.latency = latency
+            else:
+                stats.latency += alpha * (latency - stats.latency)
+
+        self._store.async_delay_save(self._data_to_save, USER_AGENT_STATS_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the stats to persist."""
+        return {
+            "agents": {
+                user_agent: asdict(stats) for user_agent, stats in self.stats.items()
+            }
+        }
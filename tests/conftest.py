@@ -6,11 +6,16 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from custom_components.yahoofinance.const import DEFAULT_SCAN_INTERVAL
+from custom_components.yahoofinance.const import (
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    HASS_DATA_STARTUP_TASK,
+)
 from custom_components.yahoofinance.coordinator import (
     CrumbCoordinator,
     YahooSymbolUpdateCoordinator,
 )
+from custom_components.yahoofinance.transport import YahooTransport
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
@@ -39,6 +44,13 @@ def create_mock_coordinator(
     return coordinator
 
 
+async def async_wait_for_startup(hass: HomeAssistant) -> None:
+    """Wait for the background startup of the component to finish."""
+    await hass.async_block_till_done()
+    await hass.data[DOMAIN][HASS_DATA_STARTUP_TASK]
+    await hass.async_block_till_done()
+
+
 @pytest.fixture
 def mock_json():
     """Return sample JSON data."""
@@ -60,6 +72,6 @@ def multiple_sample_data() -> tuple[list[str], dict]:
 def create_mock_crumb_coordinator(hass: HomeAssistant) -> CrumbCoordinator:
     """Fixture to provide a test instance of CrumbCoordinator."""
     crumb = TEST_CRUMB
-    instance = CrumbCoordinator(hass, SESSION)
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
     instance.try_get_crumb_cookies = AsyncMock(return_value=crumb)
     return instance
@@ -0,0 +1,126 @@
+"""Tests for Yahoo Finance component."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.yahoofinance.circuitbreaker import (
+    CircuitBreaker,
+    CircuitState,
+    parse_retry_after,
+)
+from homeassistant.util import dt as dt_util
+
+MONOTONIC = "custom_components.yahoofinance.circuitbreaker.time.monotonic"
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("120", 120),
+        (" 5 ", 5),
+        ("invalid", None),
+    ],
+)
+def test_parse_retry_after(value, expected) -> None:
+    """Retry-After is parsed from seconds."""
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_date() -> None:
+    """Retry-After is parsed from HTTP date."""
+    retry_time = dt_util.utcnow() + timedelta(minutes=2)
+    value = retry_time.strftime("%a, %d %b %Y %H:%M:%S GMT")
+    assert parse_retry_after(value) == pytest.approx(120, abs=2)
+
+
+def test_opens_after_threshold() -> None:
+    """Breaker opens after consecutive failures."""
+    breaker = CircuitBreaker("host", failure_threshold=2, base_delay=30)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.allow_request() is False
+    assert 15 <= breaker.remaining_time <= 30
+
+
+def test_success_resets_failures() -> None:
+    """Failures need to be consecutive."""
+    breaker = CircuitBreaker("host", failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_retry_after_opens_immediately() -> None:
+    """Retry-After opens the breaker for the requested duration."""
+    breaker = CircuitBreaker("host", failure_threshold=5)
+
+    breaker.record_failure(120)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.remaining_time == pytest.approx(120, abs=1)
+
+
+def test_half_open_trial() -> None:
+    """A single trial request is allowed after the pause."""
+    with patch(MONOTONIC, return_value=0) as mock_monotonic:
+        breaker = CircuitBreaker("host", failure_threshold=1, base_delay=30)
+        breaker.record_failure()
+        assert breaker.allow_request() is False
+
+        mock_monotonic.return_value = 31
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.remaining_time == 0
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.allow_request() is True
+
+
+def test_failed_trial_backs_off_exponentially() -> None:
+    """A failed trial opens the breaker for a longer duration."""
+    with (
+        patch(MONOTONIC, return_value=0) as mock_monotonic,
+        patch(
+            "custom_components.yahoofinance.circuitbreaker.random.uniform",
+            side_effect=lambda low, high: high,
+        ),
+    ):
+        breaker = CircuitBreaker(
+            "host", failure_threshold=1, base_delay=30, max_delay=100
+        )
+        breaker.record_failure()
+        assert breaker.remaining_time == 30
+
+        mock_monotonic.return_value = 30
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.remaining_time == 60
+
+        mock_monotonic.return_value = 90
+        assert breaker.allow_request() is True
+        breaker.record_failure()
+        assert breaker.remaining_time == 100  # Capped at max_delay
+
+
+def test_released_trial() -> None:
+    """A trial which ended without response allows another trial."""
+    with patch(MONOTONIC, return_value=0) as mock_monotonic:
+        breaker = CircuitBreaker("host", failure_threshold=1, base_delay=30)
+        breaker.record_failure()
+
+        mock_monotonic.return_value = 31
+        assert breaker.allow_request() is True
+        breaker.release()
+        assert breaker.allow_request() is True
@@ -1,26 +1,48 @@
 """Tests for Yahoo Finance component."""
 
 import asyncio
+from datetime import timedelta
 from http import HTTPStatus
+import json
 import random
-from unittest.mock import AsyncMock, Mock, patch
+from http.cookies import SimpleCookie
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import aiohttp
 import pytest
+from yarl import URL
 
 from custom_components.yahoofinance import (
     DEFAULT_SCAN_INTERVAL,
     YahooSymbolUpdateCoordinator,
     coordinator,
+    latency,
 )
+from custom_components.yahoofinance.circuitbreaker import CircuitState
 from custom_components.yahoofinance.const import (
     BASE,
+    CONF_INCLUDE_FIFTY_DAY_VALUES,
+    CONF_INCLUDE_PRE_VALUES,
+    CONF_SHOW_OFF_MARKET_VALUES,
+    CRUMB_MAX_AGE,
+    DATA_CURRENCY_SYMBOL,
+    DATA_MARKET_STATE,
+    DATA_POST_MARKET_PRICE,
+    DATA_PRE_MARKET_TIME,
     DATA_REGULAR_MARKET_PRICE,
+    DEFAULT_NUMERIC_DATA_GROUP,
+    GET_CRUMB_URL,
     MANUAL_SCAN_INTERVAL,
+    NUMERIC_DATA_GROUPS,
+    STORAGE_KEY_CRUMB,
 )
 from custom_components.yahoofinance.coordinator import CrumbCoordinator
+from custom_components.yahoofinance.dataclasses import ConsentData
+from custom_components.yahoofinance.transport import YahooTransport
+from custom_components.yahoofinance.useragents import UserAgentSelector
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
 
 from . import TEST_CRUMB, TEST_SYMBOL  # noqa: TID251
 from .conftest import create_mock_coordinator  # noqa: TID251
@@ -269,7 +291,7 @@ async def test_logging_when_process_json_result_reports_error(
 
     mock_response = Mock()
     mock_response.status = HTTPStatus.NO_CONTENT
-    mock_response.json = AsyncMock(return_value=mock_json)
+    mock_response.read = AsyncMock(return_value=json.dumps(mock_json).encode())
 
     mock_coordinator.websession.get = AsyncMock(return_value=mock_response)
     mock_coordinator.process_json_result = Mock(return_value=(True, None))
@@ -283,14 +305,14 @@ async def test_logging_when_process_json_result_reports_error(
 
 def test_crumbcoordinator_ctor(hass: HomeAssistant) -> None:
     """Test CrumbCoordinator contructor."""
-    instance = CrumbCoordinator(hass, SESSION)
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
     assert instance.cookies is None
     assert instance.crumb is None
 
 
 def test_crumbcoordinator_reset(hass: HomeAssistant) -> None:
     """Test CrumbCoordinator contructor."""
-    instance = CrumbCoordinator(hass, SESSION)
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
     instance.cookies = "cookies"
     instance.crumb = "crumb"
 
@@ -299,6 +321,110 @@ def test_crumbcoordinator_reset(hass: HomeAssistant) -> None:
     assert instance.crumb is None
 
 
+def build_crumb_transport(
+    hass: HomeAssistant, status: int, crumb: str = TEST_CRUMB
+) -> YahooTransport:
+    """Build transport whose get returns the crumb page response."""
+    response = Mock()
+    response.status = status
+    response.reason = "reason"
+    response.headers = {}
+    response.text = AsyncMock(return_value=crumb)
+
+    websession = MagicMock()
+    websession.cookie_jar = aiohttp.CookieJar()
+    websession.get.return_value.__aenter__ = AsyncMock(return_value=response)
+    websession.get.return_value.__aexit__ = AsyncMock(return_value=None)
+
+    transport = YahooTransport(hass)
+    transport._session = websession
+    return transport
+
+
+async def test_crumbcoordinator_restores_crumb(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Stored crumb and cookies are used if they are still accepted."""
+    hass_storage[STORAGE_KEY_CRUMB] = {
+        "version": 1,
+        "key": STORAGE_KEY_CRUMB,
+        "data": {
+            "crumb": "old",
+            "cookies": {"A1": "cookie"},
+            "consent_given": True,
+        },
+    }
+
+    transport = build_crumb_transport(hass, HTTPStatus.OK)
+    instance = CrumbCoordinator(hass, transport)
+    instance.initial_navigation = AsyncMock()
+
+    assert await instance.try_get_crumb_cookies() == TEST_CRUMB
+    assert instance.cookies["A1"].value == "cookie"
+    assert transport.session.get.call_count == 1
+
+    # Stored cookies are sent to all the Yahoo hosts
+    for url in (BASE, GET_CRUMB_URL):
+        assert transport.cookie_jar.filter_cookies(URL(url))["A1"].value == "cookie"
+    instance.initial_navigation.assert_not_called()
+
+    # Crumb issued for the cookies was stored
+    assert hass_storage[STORAGE_KEY_CRUMB]["data"]["crumb"] == TEST_CRUMB
+
+
+async def test_crumbcoordinator_rejected_stored_crumb(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Full handshake is made if the stored crumb is rejected."""
+    hass_storage[STORAGE_KEY_CRUMB] = {
+        "version": 1,
+        "key": STORAGE_KEY_CRUMB,
+        "data": {"crumb": "old", "cookies": {"A1": "cookie"}},
+    }
+
+    transport = build_crumb_transport(hass, HTTPStatus.UNAUTHORIZED)
+    instance = CrumbCoordinator(hass, transport)
+    instance.initial_navigation = AsyncMock(return_value=None)
+
+    assert await instance.try_get_crumb_cookies() is None
+    assert instance.cookies is None
+    assert len(transport.cookie_jar) == 0
+    instance.initial_navigation.assert_called_once()
+
+
+async def test_crumbcoordinator_saves_crumb(hass: HomeAssistant, hass_storage) -> None:
+    """Crumb and the cookies in the jar are stored and restored."""
+    transport = build_crumb_transport(hass, HTTPStatus.OK)
+    instance = CrumbCoordinator(hass, transport)
+
+    async def mock_initial_navigation(url):
+        # Session cookies set by an earlier response are only in the jar
+        cookies = SimpleCookie()
+        cookies["A1"] = "cookie"
+        cookies["A3"] = "session"
+        transport.set_cookies(cookies)
+        instance.cookies = SimpleCookie()
+        instance.cookies["A1"] = "cookie"
+        return ConsentData()
+
+    instance.initial_navigation = AsyncMock(side_effect=mock_initial_navigation)
+
+    assert await instance.try_get_crumb_cookies() == TEST_CRUMB
+    data = hass_storage[STORAGE_KEY_CRUMB]["data"]
+    assert data["crumb"] == TEST_CRUMB
+    assert data["cookies"] == {"A1": "cookie", "A3": "session"}
+    assert data["consent_given"] is False
+    assert data["obtained"] is not None
+
+    restored_transport = build_crumb_transport(hass, HTTPStatus.OK)
+    restored = CrumbCoordinator(hass, restored_transport)
+    assert await restored.async_restore_crumb() is True
+    assert {
+        name: morsel.value
+        for name, morsel in restored_transport.get_cookies().items()
+    } == {"A1": "cookie", "A3": "session"}
+
+
 async def test_build_request_url(hass: HomeAssistant, mocked_crumb_coordinator) -> None:
     """Test build_request_url."""
 
@@ -316,6 +442,219 @@ async def test_build_request_url(hass: HomeAssistant, mocked_crumb_coordinator)
     )
 
 
+@pytest.mark.parametrize(
+    ("symbols", "max_symbols_per_request", "expected_shards"),
+    [
+        ([], 2, [[]]),
+        (["A"], 2, [["A"]]),
+        (["A", "B"], 2, [["A", "B"]]),
+        (["A", "B", "C"], 2, [["A", "B"], ["C"]]),
+        (["A", "B", "C", "D", "E"], 2, [["A", "B"], ["C", "D"], ["E"]]),
+    ],
+)
+def test_get_symbol_shards(
+    hass: HomeAssistant,
+    symbols,
+    max_symbols_per_request,
+    expected_shards,
+    mocked_crumb_coordinator,
+) -> None:
+    """Test splitting of symbols into shards."""
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        symbols,
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+        max_symbols_per_request=max_symbols_per_request,
+    )
+    assert mock_coordinator.get_symbol_shards() == expected_shards
+
+
+async def test_sharded_requests(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Symbols are requested in shards and the results are merged."""
+    symbols = ["A", "B", "C", "D", "E"]
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        symbols,
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+        max_symbols_per_request=2,
+    )
+
+    async def mock_get_json(shard):
+        return {
+            "quoteResponse": {
+                "result": [{"symbol": symbol} for symbol in shard],
+                "error": None,
+            }
+        }
+
+    mock_coordinator.get_json = AsyncMock(side_effect=mock_get_json)
+
+    await mock_coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert mock_coordinator.get_json.call_count == 3
+    assert mock_coordinator.last_update_success is True
+    assert set(mock_coordinator.data) == set(symbols)
+    assert mock_coordinator.stale_symbols == set()
+
+
+async def test_failed_shard_marks_symbols_stale(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """A failed shard leaves previous data for its symbols and does not fail the update."""
+    symbols = ["A", "B", "C"]
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        symbols,
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+        max_symbols_per_request=2,
+    )
+
+    async def mock_get_json(shard):
+        if "C" in shard:
+            raise aiohttp.ClientError
+        return {"quoteResponse": {"result": [{"symbol": symbol} for symbol in shard]}}
+
+    mock_coordinator.get_json = AsyncMock(side_effect=mock_get_json)
+
+    previous_c_data = {DATA_REGULAR_MARKET_PRICE: random.random()}
+    mock_coordinator.data = {"C": previous_c_data}
+
+    await mock_coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert mock_coordinator.last_update_success is True
+    assert mock_coordinator.stale_symbols == {"C"}
+    assert mock_coordinator.data["C"] is previous_c_data
+    assert "A" in mock_coordinator.data
+    assert "B" in mock_coordinator.data
+
+    # Stale symbols are retried after the error retry interval
+    now = dt_util.utcnow()
+    assert mock_coordinator.get_due_symbols(now) == []
+    assert mock_coordinator.get_due_symbols(now + timedelta(seconds=16)) == ["C"]
+
+
+async def test_build_request_url_with_fields(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Test build_request_url includes the requested fields."""
+
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        [TEST_SYMBOL],
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+        fields=["symbol", DATA_REGULAR_MARKET_PRICE],
+    )
+    assert (
+        await mock_coordinator.build_request_url()
+        == BASE
+        + TEST_SYMBOL
+        + "&fields=symbol,"
+        + DATA_REGULAR_MARKET_PRICE
+        + "&crumb="
+        + TEST_CRUMB
+    )
+
+
+@pytest.mark.parametrize(
+    ("domain_config", "expected_fields", "unexpected_fields"),
+    [
+        (
+            {},
+            ["symbol", DATA_CURRENCY_SYMBOL, DATA_MARKET_STATE],
+            ["fiftyDayAverage", DATA_PRE_MARKET_TIME, DATA_POST_MARKET_PRICE],
+        ),
+        (
+            {CONF_INCLUDE_FIFTY_DAY_VALUES: True},
+            ["fiftyDayAverage", "fiftyDayAverageChangePercent"],
+            [DATA_PRE_MARKET_TIME],
+        ),
+        (
+            {CONF_INCLUDE_PRE_VALUES: True},
+            [DATA_PRE_MARKET_TIME, "preMarketChange"],
+            [DATA_POST_MARKET_PRICE],
+        ),
+        (
+            {CONF_SHOW_OFF_MARKET_VALUES: True},
+            [DATA_PRE_MARKET_TIME, DATA_POST_MARKET_PRICE],
+            ["preMarketChange"],
+        ),
+    ],
+)
+def test_build_request_fields(
+    domain_config, expected_fields, unexpected_fields
+) -> None:
+    """Test request fields are derived from the enabled groups."""
+    fields = YahooSymbolUpdateCoordinator.build_request_fields(domain_config)
+
+    assert len(fields) == len(set(fields))
+    for value in NUMERIC_DATA_GROUPS[DEFAULT_NUMERIC_DATA_GROUP]:
+        assert value[0] in fields
+    for field in expected_fields:
+        assert field in fields
+    for field in unexpected_fields:
+        assert field not in fields
+
+
+async def test_refresh_coalesced(hass: HomeAssistant, mocked_crumb_coordinator) -> None:
+    """Overlapping refresh calls share the refresh in flight."""
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        [TEST_SYMBOL],
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+    )
+
+    refresh_started = asyncio.Event()
+    release_refresh = asyncio.Event()
+
+    async def mock_async_refresh():
+        refresh_started.set()
+        await release_refresh.wait()
+
+    mock_coordinator.async_refresh = AsyncMock(side_effect=mock_async_refresh)
+
+    first = hass.async_create_task(mock_coordinator.async_refresh_coalesced())
+    await refresh_started.wait()
+    second = hass.async_create_task(mock_coordinator.async_refresh_coalesced())
+    await asyncio.sleep(0)
+
+    release_refresh.set()
+    await asyncio.gather(first, second)
+    assert mock_coordinator.async_refresh.call_count == 1
+
+    # A later call starts a new refresh
+    await mock_coordinator.async_refresh_coalesced()
+    assert mock_coordinator.async_refresh.call_count == 2
+
+
+def test_has_any_symbol(hass: HomeAssistant, mocked_crumb_coordinator) -> None:
+    """Test has_any_symbol."""
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        [TEST_SYMBOL, TEST_SYMBOL2],
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+    )
+    assert mock_coordinator.has_any_symbol([TEST_SYMBOL2]) is True
+    assert mock_coordinator.has_any_symbol([SECOND_TEST_SYMBOL, TEST_SYMBOL]) is True
+    assert mock_coordinator.has_any_symbol([SECOND_TEST_SYMBOL]) is False
+    assert mock_coordinator.has_any_symbol([]) is False
+
+
 def test_get_finance_error_code() -> None:
     """Test get_finance_error_code."""
     assert YahooSymbolUpdateCoordinator.get_finance_error_code(None) is None
@@ -336,3 +675,712 @@ def test_manual_scan_interval(hass: HomeAssistant, mocked_crumb_coordinator) ->
         SESSION,
     )
     assert mock_coordinator.update_interval is None
+
+
+async def test_throttled_request_stops_trying_agents(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Agents are not cycled once the host has paused requests."""
+    mock_coordinator = create_mock_coordinator(hass, mocked_crumb_coordinator)
+
+    mock_response = Mock()
+    mock_response.status = 429
+    mock_response.headers = {}
+    mock_coordinator.websession.get = AsyncMock(return_value=mock_response)
+
+    await mock_coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    # Breaker of each quote host opens after 2 failures
+    assert mock_coordinator.websession.get.call_count == 4
+    assert mock_coordinator.last_update_success is False
+    assert mock_coordinator.get_paused_time() > 0
+
+    # No request is made while paused
+    await mock_coordinator.async_refresh()
+    assert mock_coordinator.websession.get.call_count == 4
+
+
+async def test_invalid_error_body_recorded_once(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """A server error with a non-JSON body is a single breaker failure."""
+    mock_coordinator = create_mock_coordinator(hass, mocked_crumb_coordinator)
+
+    mock_response = Mock()
+    mock_response.status = HTTPStatus.SERVICE_UNAVAILABLE
+    mock_response.headers = {}
+    mock_response.read = AsyncMock(return_value=b"<html>")
+    mock_coordinator.websession.get = AsyncMock(return_value=mock_response)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await mock_coordinator.get_json()
+
+    # Each quote host was requested once
+    assert mock_coordinator.websession.get.call_count == 2
+    for base in mocked_crumb_coordinator.host_pool.bases:
+        breaker = mocked_crumb_coordinator.get_circuit_breaker(base)
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker._failure_count == 1
+
+
+async def test_retry_after_pauses_requests(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Retry-After pauses requests for the requested duration."""
+    mock_coordinator = create_mock_coordinator(hass, mocked_crumb_coordinator)
+
+    mock_response = Mock()
+    mock_response.status = 429
+    mock_response.headers = {"Retry-After": "600"}
+    mock_coordinator.websession.get = AsyncMock(return_value=mock_response)
+
+    await mock_coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    # Each quote host asked for a pause
+    assert mock_coordinator.websession.get.call_count == 2
+    assert mock_coordinator.get_paused_time() == pytest.approx(600, abs=1)
+    assert mock_coordinator.get_retry_after() >= 599
+
+
+async def test_crumbcoordinator_renewal_swaps_crumb(hass: HomeAssistant) -> None:
+    """Current crumb is used till the renewed crumb is available."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    instance.crumb = "old"
+    instance.cookies = SimpleCookie()
+
+    handshake_started = asyncio.Event()
+    handshake_continue = asyncio.Event()
+
+    async def mock_try_get_crumb_cookies(self):
+        handshake_started.set()
+        await handshake_continue.wait()
+        self.cookies = SimpleCookie()
+        self.cookies["A1"] = "new"
+        self.crumb = "new"
+        return self.crumb
+
+    with patch.object(
+        CrumbCoordinator, "try_get_crumb_cookies", mock_try_get_crumb_cookies
+    ):
+        instance.async_request_renewal()
+        instance.async_request_renewal()  # Renewal already in progress
+
+        await handshake_started.wait()
+        assert instance.crumb == "old"
+        assert "A1" not in instance.cookies
+
+        handshake_continue.set()
+        await hass.async_block_till_done()
+
+    assert instance.crumb == "new"
+    assert instance.cookies["A1"].value == "new"
+
+
+async def test_crumbcoordinator_renewal_is_single_acquisition(
+    hass: HomeAssistant,
+) -> None:
+    """Renewal and acquisition never run together."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    handshake_continue = asyncio.Event()
+    handshake_count = 0
+
+    async def mock_try_get_crumb_cookies(self):
+        nonlocal handshake_count
+        handshake_count += 1
+        await handshake_continue.wait()
+        self.crumb = TEST_CRUMB
+        return self.crumb
+
+    with patch.object(
+        CrumbCoordinator, "try_get_crumb_cookies", mock_try_get_crumb_cookies
+    ):
+        # Renewal is not started while the crumb is being acquired
+        acquisition = asyncio.create_task(instance.async_get_crumb())
+        await asyncio.sleep(0)
+        instance.async_request_renewal()
+
+        handshake_continue.set()
+        assert await acquisition == TEST_CRUMB
+        assert handshake_count == 1
+
+        # Callers without crumb wait for the renewal in progress
+        handshake_continue.clear()
+        instance.async_request_renewal()
+        instance.crumb = None
+        waiter = asyncio.create_task(instance.async_get_crumb())
+        await asyncio.sleep(0)
+
+        handshake_continue.set()
+        assert await waiter == TEST_CRUMB
+        await hass.async_block_till_done()
+        assert handshake_count == 2
+
+
+async def test_crumbcoordinator_failed_renewal_keeps_crumb(
+    hass: HomeAssistant,
+) -> None:
+    """Current crumb is kept if renewal fails."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    instance.crumb = "old"
+
+    with patch.object(
+        CrumbCoordinator, "try_get_crumb_cookies", AsyncMock(return_value=None)
+    ):
+        instance.async_request_renewal()
+        await hass.async_block_till_done()
+
+    assert instance.crumb == "old"
+
+
+async def test_crumbcoordinator_renews_old_crumb(hass: HomeAssistant) -> None:
+    """Crumb is renewed once it gets old."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    instance.crumb = "crumb"
+    instance._crumb_time = dt_util.utcnow()
+    instance.async_request_renewal = Mock()
+
+    instance._async_check_crumb_age(dt_util.utcnow())
+    instance.async_request_renewal.assert_not_called()
+
+    instance._crumb_time = dt_util.utcnow() - CRUMB_MAX_AGE
+    instance._async_check_crumb_age(dt_util.utcnow())
+    instance.async_request_renewal.assert_called_once()
+
+
+async def test_unauthorized_requests_renewal(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Unauthorized response renews the crumb without discarding the current one."""
+    mock_coordinator = create_mock_coordinator(hass, mocked_crumb_coordinator)
+    mocked_crumb_coordinator.crumb = TEST_CRUMB
+    mocked_crumb_coordinator.async_request_renewal = Mock()
+
+    mock_response = Mock()
+    mock_response.status = HTTPStatus.UNAUTHORIZED
+    mock_response.read = AsyncMock(
+        return_value=json.dumps(
+            {
+                "finance": {
+                    "result": None,
+                    "error": {"code": "Unauthorized", "description": "Invalid Crumb"},
+                }
+            }
+        ).encode()
+    )
+    mock_coordinator.websession.get = AsyncMock(return_value=mock_response)
+
+    await mock_coordinator.async_refresh()
+
+    mocked_crumb_coordinator.async_request_renewal.assert_called_once()
+    assert mocked_crumb_coordinator.crumb == TEST_CRUMB
+
+
+async def test_unauthorized_during_backoff_makes_single_handshake(
+    hass: HomeAssistant,
+) -> None:
+    """Concurrent Unauthorized responses and a failed handshake don't repeat it."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    instance.crumb = "old"
+    instance.retry_duration = 60
+
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        ["A", "B"],
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        instance,
+        SESSION,
+        max_symbols_per_request=1,
+    )
+
+    mock_response = Mock()
+    mock_response.status = HTTPStatus.UNAUTHORIZED
+    mock_response.read = AsyncMock(
+        return_value=json.dumps(
+            {
+                "finance": {
+                    "result": None,
+                    "error": {"code": "Unauthorized", "description": "Invalid Crumb"},
+                }
+            }
+        ).encode()
+    )
+    mock_coordinator.websession.get = AsyncMock(return_value=mock_response)
+    mock_try_get_crumb_cookies = AsyncMock(return_value=None)
+
+    with patch.object(
+        CrumbCoordinator, "try_get_crumb_cookies", mock_try_get_crumb_cookies
+    ):
+        # Both shards are rejected, the renewal fails
+        await mock_coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert mock_coordinator.websession.get.call_count == 2
+        assert mock_try_get_crumb_cookies.call_count == 1
+        assert instance.backoff_time > 55
+
+        # No handshake and no data request without crumb during the backoff
+        instance.crumb = None
+        await mock_coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert mock_coordinator.last_update_success is False
+        assert mock_coordinator.websession.get.call_count == 2
+        assert mock_try_get_crumb_cookies.call_count == 1
+
+        # Crumb is acquired once the backoff expires
+        instance._backoff_until = 0
+        await mock_coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert mock_try_get_crumb_cookies.call_count == 2
+
+
+async def test_crumbcoordinator_single_flight(hass: HomeAssistant) -> None:
+    """Concurrent callers share a single crumb acquisition."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    handshake_continue = asyncio.Event()
+
+    async def mock_try_get_crumb_cookies():
+        await handshake_continue.wait()
+        instance.crumb = TEST_CRUMB
+        return TEST_CRUMB
+
+    instance.try_get_crumb_cookies = AsyncMock(side_effect=mock_try_get_crumb_cookies)
+
+    tasks = [asyncio.create_task(instance.async_get_crumb()) for _ in range(3)]
+    await asyncio.sleep(0)
+    handshake_continue.set()
+
+    assert await asyncio.gather(*tasks) == [TEST_CRUMB] * 3
+    assert instance.try_get_crumb_cookies.call_count == 1
+
+    # Existing crumb is returned without acquisition
+    assert await instance.async_get_crumb() == TEST_CRUMB
+    assert instance.try_get_crumb_cookies.call_count == 1
+
+
+async def test_crumbcoordinator_acquisition_timeout(hass: HomeAssistant) -> None:
+    """Callers stop waiting after the timeout but the acquisition continues."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass), acquire_timeout=0.01)
+    handshake_continue = asyncio.Event()
+
+    async def mock_try_get_crumb_cookies():
+        await handshake_continue.wait()
+        instance.crumb = TEST_CRUMB
+        return TEST_CRUMB
+
+    instance.try_get_crumb_cookies = AsyncMock(side_effect=mock_try_get_crumb_cookies)
+
+    assert await instance.async_get_crumb() is None
+
+    handshake_continue.set()
+    await hass.async_block_till_done()
+    assert instance.crumb == TEST_CRUMB
+    assert instance.try_get_crumb_cookies.call_count == 1
+
+
+async def test_crumbcoordinator_acquisition_backoff(hass: HomeAssistant) -> None:
+    """Failed acquisition is not retried by other callers during the backoff."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+    instance.retry_duration = 60
+    instance.try_get_crumb_cookies = AsyncMock(return_value=None)
+
+    assert await instance.async_get_crumb() is None
+    assert instance.backoff_time > 55
+
+    assert await instance.async_get_crumb() is None
+    assert instance.try_get_crumb_cookies.call_count == 1
+
+
+def build_hedged_crumb_coordinator(
+    hass: HomeAssistant,
+    responses: dict[str, tuple[float, int, str]],
+    cancelled_agents: list[str] | None = None,
+) -> CrumbCoordinator:
+    """Build CrumbCoordinator whose agents respond after a delay with status and content."""
+    instance = CrumbCoordinator(
+        hass,
+        YahooTransport(hass),
+        user_agents=UserAgentSelector(hass, list(responses), 0)
+    )
+
+    async def mock_fetch_crumb(user_agent, breaker):
+        (delay, status, content) = responses[user_agent]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled_agents is not None:
+                cancelled_agents.append(user_agent)
+            raise
+        return (status, content)
+
+    instance._fetch_crumb = AsyncMock(side_effect=mock_fetch_crumb)
+    return instance
+
+
+async def test_try_crumb_page_hedges_slow_agent(hass: HomeAssistant) -> None:
+    """Next agent is tried if the first is slow, the loser is cancelled."""
+    cancelled_agents = []
+    instance = build_hedged_crumb_coordinator(
+        hass,
+        {"slow": (5, HTTPStatus.OK, "slow"), "fast": (0.01, HTTPStatus.OK, "fast")},
+        cancelled_agents,
+    )
+    instance.user_agents.get_hedge_delay = Mock(return_value=0.01)
+
+    assert await instance.try_crumb_page() == "fast"
+    await hass.async_block_till_done()
+    assert instance._fetch_crumb.call_count == 2
+    assert cancelled_agents == ["slow"]
+
+
+async def test_try_crumb_page_first_agent_wins(hass: HomeAssistant) -> None:
+    """Other agents are not tried if the first agent responds quickly."""
+    instance = build_hedged_crumb_coordinator(
+        hass,
+        {"first": (0, HTTPStatus.OK, "first"), "second": (0, HTTPStatus.OK, "second")},
+    )
+
+    assert await instance.try_crumb_page() == "first"
+    assert instance._fetch_crumb.call_count == 1
+
+
+async def test_try_crumb_page_429_tries_next_agent(hass: HomeAssistant) -> None:
+    """Next agent is tried immediately after 429."""
+    instance = build_hedged_crumb_coordinator(
+        hass,
+        {
+            "first": (0, HTTPStatus.TOO_MANY_REQUESTS, "reason"),
+            "second": (0, HTTPStatus.OK, "second"),
+        },
+    )
+    instance.user_agents.get_hedge_delay = Mock(return_value=10)
+
+    async with asyncio.timeout(1):
+        assert await instance.try_crumb_page() == "second"
+
+
+async def test_try_crumb_page_stops_on_error(hass: HomeAssistant) -> None:
+    """Other agents are not tried after an error other than 429."""
+    instance = build_hedged_crumb_coordinator(
+        hass,
+        {
+            "first": (0, HTTPStatus.FORBIDDEN, "reason"),
+            "second": (0, HTTPStatus.OK, "second"),
+        },
+    )
+
+    assert await instance.try_crumb_page() is None
+    assert instance._fetch_crumb.call_count == 1
+    assert instance.retry_duration > 0
+
+
+def test_latency_histogram_per_endpoint(hass: HomeAssistant) -> None:
+    """Latency is tracked per endpoint, independent of the query."""
+    instance = CrumbCoordinator(hass, YahooTransport(hass))
+
+    histogram = instance.get_latency_histogram(BASE + "A")
+    assert instance.get_latency_histogram(BASE + "B") is histogram
+    assert instance.get_latency_histogram("https://query1.finance.yahoo.com/x") is not (
+        histogram
+    )
+
+
+def build_hedged_coordinator(
+    hass: HomeAssistant,
+    crumb_coordinator: CrumbCoordinator,
+    delays: list[float],
+    cancelled_requests: list[int],
+) -> YahooSymbolUpdateCoordinator:
+    """Build coordinator whose requests respond after the delays."""
+    coordinator = YahooSymbolUpdateCoordinator(
+        [TEST_SYMBOL],
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        crumb_coordinator,
+        Mock(),
+        hedge_requests=True,
+    )
+
+    # Enough fast samples for hedging to start
+    for base in crumb_coordinator.host_pool.bases:
+        histogram = crumb_coordinator.get_latency_histogram(base)
+        for _ in range(20):
+            histogram.record(0.01)
+
+    request_delays = iter(delays)
+
+    async def mock_get(*args, **kwargs):
+        index = len(coordinator.websession.get.call_args_list)
+        try:
+            await asyncio.sleep(next(request_delays))
+        except asyncio.CancelledError:
+            cancelled_requests.append(index)
+            raise
+
+        response = Mock()
+        response.status = HTTPStatus.OK
+        response.headers = {}
+        response.read = AsyncMock(return_value=json.dumps({"index": index}).encode())
+        return response
+
+    coordinator.websession.get = AsyncMock(side_effect=mock_get)
+    return coordinator
+
+
+async def test_slow_request_is_hedged(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """A duplicate request is sent for a slow request and the first response wins."""
+    cancelled_requests = []
+    mock_coordinator = build_hedged_coordinator(
+        hass, mocked_crumb_coordinator, [5, 0], cancelled_requests
+    )
+
+    assert await mock_coordinator.get_json() == {"index": 2}
+    await hass.async_block_till_done()
+    assert mock_coordinator.websession.get.call_count == 2
+    assert cancelled_requests == [1]
+
+
+async def test_fast_request_is_not_hedged(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """No duplicate request is sent for a fast request."""
+    cancelled_requests = []
+    mock_coordinator = build_hedged_coordinator(
+        hass, mocked_crumb_coordinator, [0, 0], cancelled_requests
+    )
+
+    assert await mock_coordinator.get_json() == {"index": 1}
+    assert mock_coordinator.websession.get.call_count == 1
+    assert cancelled_requests == []
+
+
+async def test_adaptive_timeout(hass: HomeAssistant, mocked_crumb_coordinator) -> None:
+    """Request times out based on the observed latency."""
+    mock_coordinator = build_hedged_coordinator(
+        hass, mocked_crumb_coordinator, [60, 60], []
+    )
+    mock_coordinator._hedge_requests = False
+    histogram = mocked_crumb_coordinator.get_latency_histogram(BASE)
+    sample_count = histogram.sample_count
+
+    # Fast responses shorten the timeout to the floor
+    start_time = hass.loop.time()
+    with (
+        patch.object(latency, "LATENCY_MIN_TIMEOUT", 0.1),
+        pytest.raises(TimeoutError),
+    ):
+        await mock_coordinator.get_json()
+    assert hass.loop.time() - start_time < 1
+
+    # The timeout is recorded as a latency sample
+    assert histogram.sample_count == sample_count + 1
+
+
+async def test_adaptive_timeout_excludes_body(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """A slow body is not cut short by the adaptive timeout of the headers."""
+    mock_coordinator = build_hedged_coordinator(
+        hass, mocked_crumb_coordinator, [0], []
+    )
+    mock_coordinator._hedge_requests = False
+
+    async def slow_read():
+        await asyncio.sleep(0.5)
+        return b'{"a": 1}'
+
+    response = Mock()
+    response.status = HTTPStatus.OK
+    response.headers = {}
+    response.read = AsyncMock(side_effect=slow_read)
+    mock_coordinator.websession.get = AsyncMock(return_value=response)
+
+    with patch.object(latency, "LATENCY_MIN_TIMEOUT", 0.1):
+        assert await mock_coordinator.get_json() == {"a": 1}
+
+
+async def test_prewarm_connection(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """A HEAD request opens the connection to the quote host."""
+    mock_coordinator = create_mock_coordinator(hass, mocked_crumb_coordinator)
+    mock_coordinator.websession = MagicMock()
+    response = Mock()
+    response.status = HTTPStatus.OK
+    mock_coordinator.websession.head.return_value.__aenter__ = AsyncMock(
+        return_value=response
+    )
+    mock_coordinator.websession.head.return_value.__aexit__ = AsyncMock(
+        return_value=None
+    )
+
+    await mock_coordinator.async_prewarm_connection()
+    assert mock_coordinator.websession.head.call_count == 1
+    assert mock_coordinator.websession.head.call_args.args[0] == (
+        "https://query1.finance.yahoo.com/"
+    )
+
+    # Errors are ignored
+    mock_coordinator.websession.head.side_effect = aiohttp.ClientError
+    await mock_coordinator.async_prewarm_connection()
+
+    # Another host is used while the preferred one is paused
+    mock_coordinator.websession.head.reset_mock()
+    mock_coordinator.websession.head.side_effect = None
+    mocked_crumb_coordinator.get_circuit_breaker(BASE).record_failure(600)
+    await mock_coordinator.async_prewarm_connection()
+    assert mock_coordinator.websession.head.call_args.args[0] == (
+        "https://query2.finance.yahoo.com/"
+    )
+
+    # Paused hosts are not contacted
+    mock_coordinator.websession.head.reset_mock()
+    for base in mocked_crumb_coordinator.host_pool.bases:
+        mocked_crumb_coordinator.get_circuit_breaker(base).record_failure(600)
+    await mock_coordinator.async_prewarm_connection()
+    assert mock_coordinator.websession.head.call_count == 0
+
+
+@pytest.mark.parametrize(
+    ("body", "expected"),
+    [
+        (b"", None),
+        (b"  ", None),
+        (b'{"a": 1}', {"a": 1}),
+    ],
+)
+async def test_decode_json(hass: HomeAssistant, body: bytes, expected) -> None:
+    """Response body is decoded from the raw bytes."""
+    response = Mock()
+    response.read = AsyncMock(return_value=body)
+    assert await coordinator.async_decode_json(hass, response) == expected
+
+
+async def test_decode_large_json_in_executor(hass: HomeAssistant) -> None:
+    """Large response body is decoded in the executor."""
+    response = Mock()
+    response.read = AsyncMock(return_value=b'{"a": 1}')
+
+    with (
+        patch.object(coordinator, "JSON_EXECUTOR_THRESHOLD", 4),
+        patch.object(
+            hass, "async_add_executor_job", wraps=hass.async_add_executor_job
+        ) as mock_add_executor_job,
+    ):
+        assert await coordinator.async_decode_json(hass, response) == {"a": 1}
+
+    assert mock_add_executor_job.call_count == 1
+
+
+async def test_decode_invalid_json(hass: HomeAssistant) -> None:
+    """Invalid response body is reported as a client error."""
+    response = Mock()
+    response.status = HTTPStatus.BAD_GATEWAY
+    response.read = AsyncMock(return_value=b"<html>")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await coordinator.async_decode_json(hass, response)
+
+
+def build_streamed_coordinator(
+    hass: HomeAssistant, crumb_coordinator: CrumbCoordinator, symbols, body: bytes
+) -> YahooSymbolUpdateCoordinator:
+    """Build coordinator whose response body arrives in small chunks."""
+    coordinator = YahooSymbolUpdateCoordinator(
+        symbols,
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        crumb_coordinator,
+        Mock(),
+        stream_quotes=True,
+    )
+
+    async def iter_chunked(_size):
+        for index in range(0, len(body), 100):
+            yield body[index : index + 100]
+
+    response = Mock()
+    response.status = HTTPStatus.OK
+    response.headers = {}
+    response.content.iter_chunked = iter_chunked
+    response.read = AsyncMock(side_effect=AssertionError("Body read at once"))
+
+    coordinator.websession.get = AsyncMock(return_value=response)
+    return coordinator
+
+
+async def test_streamed_quotes(
+    hass: HomeAssistant, mocked_crumb_coordinator, multiple_sample_data
+) -> None:
+    """Streamed quotes produce the same data as the decoded response."""
+    (symbols, json_data) = multiple_sample_data
+    mock_coordinator = build_streamed_coordinator(
+        hass, mocked_crumb_coordinator, symbols, json.dumps(json_data).encode()
+    )
+
+    result = (await mock_coordinator.get_json())["quoteResponse"]["result"]
+    assert [symbol_data["symbol"] for symbol_data in result] == symbols
+
+    assert mock_coordinator.process_json_result(
+        result
+    ) == mock_coordinator.process_json_result(json_data["quoteResponse"]["result"])
+
+
+async def test_streamed_invalid_json(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Truncated streamed response is reported as a client error."""
+    mock_coordinator = build_streamed_coordinator(
+        hass,
+        mocked_crumb_coordinator,
+        [TEST_SYMBOL],
+        b'{"quoteResponse": {"result": [{"symbol": "A"}',
+    )
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await mock_coordinator.get_json()
+
+
+def test_symbol_data_updated_in_place(
+    hass: HomeAssistant, mocked_crumb_coordinator, multiple_sample_data
+) -> None:
+    """Symbol data of a refresh replaces the previous values in place."""
+    (symbols, json_data) = multiple_sample_data
+    result = json_data["quoteResponse"]["result"]
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        symbols, hass, DEFAULT_SCAN_INTERVAL, mocked_crumb_coordinator, SESSION
+    )
+
+    (_, data) = mock_coordinator.process_json_result(result)
+    mock_coordinator.data = data
+    symbol_data = data[symbols[0]]
+
+    result[0][DATA_REGULAR_MARKET_PRICE] += 1
+    (_, data) = mock_coordinator.process_json_result(result)
+
+    assert data[symbols[0]] is symbol_data
+    price = result[0][DATA_REGULAR_MARKET_PRICE]
+    assert symbol_data[DATA_REGULAR_MARKET_PRICE] == price
+
+
+def test_conversion_rates_updated_after_refresh(
+    hass: HomeAssistant, mocked_crumb_coordinator, multiple_sample_data
+) -> None:
+    """Conversion rates are rebuilt with the data of every refresh."""
+    (symbols, json_data) = multiple_sample_data
+    conversion_engine = Mock()
+    mock_coordinator = YahooSymbolUpdateCoordinator(
+        symbols,
+        hass,
+        DEFAULT_SCAN_INTERVAL,
+        mocked_crumb_coordinator,
+        SESSION,
+        conversion_engine=conversion_engine,
+    )
+
+    data = mock_coordinator._handle_update_result(
+        symbols, json_data["quoteResponse"]["result"], [], dt_util.utcnow()
+    )
+    conversion_engine.update.assert_called_once_with(data)
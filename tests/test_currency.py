@@ -0,0 +1,216 @@
+"""Tests for Yahoo Finance component."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from custom_components.yahoofinance import DEFAULT_SCAN_INTERVAL
+from custom_components.yahoofinance.const import (
+    DATA_REGULAR_MARKET_PRICE,
+    DOMAIN,
+    HASS_DATA_COORDINATORS,
+    PIVOT_CURRENCY,
+    STORAGE_KEY_CURRENCIES,
+)
+from custom_components.yahoofinance.currency import (
+    CurrencyCache,
+    CurrencyConversionEngine,
+    convert_values,
+    get_conversion_symbol,
+    get_pivot_legs,
+)
+from homeassistant.core import HomeAssistant
+
+from .test_sensor import build_mock_symbol_data  # noqa: TID251
+
+
+@pytest.mark.parametrize(
+    ("original_currency", "target_currency", "expected"),
+    [
+        ("USD", None, (None, None)),
+        ("USD", "USD", (None, None)),
+        ("GBp", None, (None, 0.01)),
+        ("GBp", "GBp", (None, None)),
+        ("GBp", "GBP", (None, 0.01)),
+        ("GBp", "EUR", ("GBPEUR=X", 0.01)),
+        ("USD", "eur", ("USDEUR=X", 1)),
+    ],
+)
+def test_get_conversion_symbol(original_currency, target_currency, expected) -> None:
+    """Conversion symbol and multiplier are derived from the currencies."""
+    assert get_conversion_symbol(original_currency, target_currency) == expected
+
+
+@pytest.mark.parametrize(
+    ("original_currency", "target_currency", "expected"),
+    [
+        ("EUR", "JPY", (("USDEUR=X", True), ("USDJPY=X", False))),
+        ("USD", "eur", (("USDEUR=X", False),)),
+        ("EUR", "USD", (("USDEUR=X", True),)),
+        ("GBp", "EUR", (("USDGBP=X", True), ("USDEUR=X", False))),
+    ],
+)
+def test_get_pivot_legs(original_currency, target_currency, expected) -> None:
+    """Legs go through the pivot currency."""
+    assert (
+        get_pivot_legs(original_currency, target_currency, PIVOT_CURRENCY) == expected
+    )
+
+
+def build_engine(
+    hass: HomeAssistant, data: dict, pivot_currency: str | None = None
+) -> CurrencyConversionEngine:
+    """Build an engine finding the data in a coordinator."""
+    coordinator = Mock(data=data)
+    hass.data[DOMAIN] = {HASS_DATA_COORDINATORS: {DEFAULT_SCAN_INTERVAL: coordinator}}
+    return CurrencyConversionEngine(hass, False, pivot_currency)
+
+
+def test_rate_lookup(hass: HomeAssistant) -> None:
+    """Rate of a currency pair is built once and shared."""
+    data = {"USDEUR=X": build_mock_symbol_data("USDEUR=X", 0.5, "EUR")}
+    engine = build_engine(hass, data)
+
+    rate = engine.get_rate("USD", "EUR")
+    assert rate.available
+    assert rate.value == 0.5
+    assert engine.get_rate("USD", "EUR") is rate
+
+    rate = engine.get_rate("GBp", "GBP")
+    assert rate.conversion_symbols == ()
+    assert rate.value == 0.01
+
+
+def test_rates_rebuilt_on_update(hass: HomeAssistant) -> None:
+    """Rates in use are rebuilt from the refreshed data."""
+    data = {"GBPEUR=X": build_mock_symbol_data("GBPEUR=X", 1.2, "EUR")}
+    engine = build_engine(hass, data)
+    assert engine.get_rate("GBp", "EUR").value == pytest.approx(0.012)
+
+    # Refreshed data is used ahead of the coordinator data
+    engine.update({"GBPEUR=X": build_mock_symbol_data("GBPEUR=X", 1.1, "EUR")})
+    assert engine.get_rate("GBp", "EUR").value == pytest.approx(0.011)
+
+    data["GBPEUR=X"][DATA_REGULAR_MARKET_PRICE] = 1.3
+    engine.update()
+    assert engine.get_rate("GBp", "EUR").value == pytest.approx(0.013)
+
+
+def test_new_pair_uses_updated_data(hass: HomeAssistant) -> None:
+    """Rate of a pair first used after an update is built from the updated data."""
+    engine = build_engine(hass, {})
+
+    # Coordinator data is only set after the rates are updated
+    engine.update({"USDEUR=X": build_mock_symbol_data("USDEUR=X", 0.5, "EUR")})
+    assert engine.get_rate("USD", "EUR").value == 0.5
+
+
+def test_missing_rate_is_looked_up_again(hass: HomeAssistant) -> None:
+    """Rate is not available till the conversion symbol has data."""
+    data = {}
+    engine = build_engine(hass, data)
+
+    rate = engine.get_rate("USD", "CHF")
+    assert not rate.available
+    assert rate.conversion_symbols == ("USDCHF=X",)
+    assert rate.multiplier == 1
+
+    data["USDCHF=X"] = build_mock_symbol_data("USDCHF=X", 0.9, "CHF")
+    assert engine.get_rate("USD", "CHF").value == 0.9
+
+
+@pytest.mark.parametrize(
+    ("original_currency", "target_currency", "expected_symbols", "expected_value"),
+    [
+        ("EUR", "JPY", ("USDEUR=X", "USDJPY=X"), 150 / 0.8),
+        ("USD", "EUR", ("USDEUR=X",), 0.8),
+        ("EUR", "USD", ("USDEUR=X",), 1 / 0.8),
+        ("GBp", "EUR", ("USDGBP=X", "USDEUR=X"), 0.01 / 0.5 * 0.8),
+        ("GBp", "GBP", (), 0.01),
+    ],
+)
+def test_triangulated_rate(
+    hass: HomeAssistant,
+    original_currency,
+    target_currency,
+    expected_symbols,
+    expected_value,
+) -> None:
+    """Cross rates are derived from the pivot currency symbols."""
+    data = {
+        "USDEUR=X": build_mock_symbol_data("USDEUR=X", 0.8, "EUR"),
+        "USDGBP=X": build_mock_symbol_data("USDGBP=X", 0.5, "GBP"),
+        "USDJPY=X": build_mock_symbol_data("USDJPY=X", 150, "JPY"),
+    }
+    engine = build_engine(hass, data, PIVOT_CURRENCY)
+
+    rate = engine.get_rate(original_currency, target_currency)
+    assert rate.conversion_symbols == expected_symbols
+    assert rate.value == pytest.approx(expected_value)
+
+
+def test_triangulated_rate_needs_all_legs(hass: HomeAssistant) -> None:
+    """Cross rate is not available till every leg has a price."""
+    data = {"USDEUR=X": build_mock_symbol_data("USDEUR=X", 0.8, "EUR")}
+    engine = build_engine(hass, data, PIVOT_CURRENCY)
+
+    assert not engine.get_rate("EUR", "JPY").available
+
+    data["USDJPY=X"] = build_mock_symbol_data("USDJPY=X", 0, "JPY")
+    assert not engine.get_rate("EUR", "JPY").available
+
+    data["USDJPY=X"][DATA_REGULAR_MARKET_PRICE] = 150
+    assert engine.get_rate("EUR", "JPY").value == pytest.approx(150 / 0.8)
+
+
+@pytest.mark.parametrize(
+    ("pivot_currency", "original_currency", "target_currency", "expected"),
+    [
+        (None, "EUR", "JPY", ("EURJPY=X",)),
+        (None, "GBp", "GBP", ()),
+        (None, "USD", None, ()),
+        (PIVOT_CURRENCY, "EUR", "JPY", ("USDEUR=X", "USDJPY=X")),
+        (PIVOT_CURRENCY, "EUR", "EUR", ()),
+    ],
+)
+def test_get_conversion_symbols(
+    hass: HomeAssistant, pivot_currency, original_currency, target_currency, expected
+) -> None:
+    """Conversion symbols are known without any data."""
+    engine = CurrencyConversionEngine(hass, False, pivot_currency)
+    assert engine.get_conversion_symbols(original_currency, target_currency) == (
+        expected
+    )
+
+
+async def test_currencies_are_persisted(hass: HomeAssistant, hass_storage) -> None:
+    """Symbol currencies are saved and loaded."""
+    cache = CurrencyCache(hass)
+    assert cache.get("XYZ") is None
+
+    with patch(
+        "custom_components.yahoofinance.currency.CURRENCY_CACHE_SAVE_DELAY", 0
+    ):
+        cache.set("XYZ", "EUR")
+
+    await asyncio.sleep(0)
+    await hass.async_block_till_done()
+    assert hass_storage[STORAGE_KEY_CURRENCIES]["data"]["currencies"] == {
+        "XYZ": "EUR"
+    }
+
+    loaded = CurrencyCache(hass)
+    await loaded.async_load()
+    assert loaded.get("XYZ") == "EUR"
+
+
+@pytest.mark.parametrize(
+    ("conversion", "expected"),
+    [(None, {"a": 2, "b": None}), (1.5, {"a": 3, "b": None})],
+)
+def test_convert_values(conversion, expected) -> None:
+    """Values of the keys are converted together."""
+    assert convert_values({"a": 2, "b": None, "c": 4}, ("a", "b"), conversion) == (
+        expected
+    )
@@ -0,0 +1,152 @@
+"""Tests for Yahoo Finance component."""
+
+from http import HTTPStatus
+from unittest.mock import patch
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from custom_components.yahoofinance.const import HOST_PROBE_INTERVAL, QUOTE_PATH
+from custom_components.yahoofinance.coordinator import (
+    CrumbCoordinator,
+    YahooSymbolUpdateCoordinator,
+)
+from custom_components.yahoofinance.hostpool import QuoteHostPool
+from custom_components.yahoofinance.transport import YahooTransport
+from homeassistant.core import HomeAssistant
+
+from . import TEST_CRUMB, TEST_SYMBOL  # noqa: TID251
+
+FIRST = "https://first" + QUOTE_PATH
+SECOND = "https://second" + QUOTE_PATH
+
+
+def build_pool(hass: HomeAssistant) -> tuple[QuoteHostPool, CrumbCoordinator]:
+    """Build host pool for two hosts."""
+    crumb_coordinator = CrumbCoordinator(hass, YahooTransport(hass))
+    pool = QuoteHostPool(
+        [FIRST, SECOND],
+        crumb_coordinator.get_circuit_breaker,
+        crumb_coordinator.get_latency_histogram,
+    )
+    return (pool, crumb_coordinator)
+
+
+def record_latency(crumb_coordinator: CrumbCoordinator, base: str, latency: float):
+    """Record latency samples for the host."""
+    histogram = crumb_coordinator.get_latency_histogram(base)
+    for _ in range(5):
+        histogram.record(latency)
+
+
+def test_first_host_is_preferred(hass: HomeAssistant) -> None:
+    """Hosts are used in the configured order till latency is known."""
+    (pool, crumb_coordinator) = build_pool(hass)
+    assert pool.get_ordered_bases() == [FIRST, SECOND]
+
+    # Host without latency samples is not preferred
+    record_latency(crumb_coordinator, FIRST, 1)
+    assert pool.get_ordered_bases() == [FIRST, SECOND]
+
+
+def test_faster_host_is_preferred(hass: HomeAssistant) -> None:
+    """Host with lower median latency is preferred."""
+    (pool, crumb_coordinator) = build_pool(hass)
+    record_latency(crumb_coordinator, FIRST, 1)
+    record_latency(crumb_coordinator, SECOND, 0.1)
+    assert pool.get_ordered_bases() == [SECOND, FIRST]
+
+
+def test_paused_host_is_avoided(hass: HomeAssistant) -> None:
+    """Paused host is tried last and its pause determines the paused time."""
+    (pool, crumb_coordinator) = build_pool(hass)
+    record_latency(crumb_coordinator, FIRST, 0.1)
+    record_latency(crumb_coordinator, SECOND, 1)
+
+    crumb_coordinator.get_circuit_breaker(FIRST).record_failure(600)
+    assert pool.get_ordered_bases() == [SECOND, FIRST]
+    assert pool.get_paused_time() == 0
+
+    crumb_coordinator.get_circuit_breaker(SECOND).record_failure(60)
+    assert pool.get_paused_time() == pytest.approx(60, abs=1)
+
+
+def test_unused_host_is_probed(hass: HomeAssistant) -> None:
+    """Host not used for a while is tried first once."""
+    (pool, crumb_coordinator) = build_pool(hass)
+    record_latency(crumb_coordinator, FIRST, 0.1)
+    record_latency(crumb_coordinator, SECOND, 1)
+
+    with patch(
+        "custom_components.yahoofinance.hostpool.HOST_PROBE_INTERVAL", 0
+    ):
+        assert pool.get_ordered_bases() == [SECOND, FIRST]
+
+        # Paused host is not probed
+        crumb_coordinator.get_circuit_breaker(SECOND).record_failure(600)
+        assert pool.get_ordered_bases() == [FIRST, SECOND]
+
+
+def test_peek_does_not_use_probe(hass: HomeAssistant) -> None:
+    """Peeking at the preferred host does not use up a due probe."""
+    (pool, crumb_coordinator) = build_pool(hass)
+    record_latency(crumb_coordinator, FIRST, 0.1)
+    record_latency(crumb_coordinator, SECOND, 1)
+
+    pool._last_used[SECOND] -= HOST_PROBE_INTERVAL
+
+    assert pool.peek_preferred_base() == SECOND
+    assert pool.peek_preferred_base() == SECOND
+
+    # Probe is used by the request
+    assert pool.get_ordered_bases() == [SECOND, FIRST]
+    assert pool.get_ordered_bases() == [FIRST, SECOND]
+
+
+async def test_failover_to_stand_in_host(hass: HomeAssistant, socket_enabled) -> None:
+    """Data is requested from the next host if the first reports server error."""
+    requests: list[str] = []
+
+    def build_app(name: str, status: int) -> web.Application:
+        async def handle_quote(request: web.Request) -> web.Response:
+            requests.append(name)
+            if status != HTTPStatus.OK:
+                return web.Response(status=status)
+            return web.json_response(
+                {"quoteResponse": {"result": [{"symbol": TEST_SYMBOL}], "error": None}}
+            )
+
+        app = web.Application()
+        app.router.add_get("/v7/finance/quote", handle_quote)
+        return app
+
+    failing_server = TestServer(build_app("failing", HTTPStatus.BAD_GATEWAY))
+    working_server = TestServer(build_app("working", HTTPStatus.OK))
+    await failing_server.start_server()
+    await working_server.start_server()
+
+    transport = YahooTransport(hass)
+    crumb_coordinator = CrumbCoordinator(hass, transport)
+    crumb_coordinator.crumb = TEST_CRUMB
+    crumb_coordinator.host_pool = QuoteHostPool(
+        [
+            str(failing_server.make_url(QUOTE_PATH)),
+            str(working_server.make_url(QUOTE_PATH)),
+        ],
+        crumb_coordinator.get_circuit_breaker,
+        crumb_coordinator.get_latency_histogram,
+    )
+
+    coordinator = YahooSymbolUpdateCoordinator(
+        [TEST_SYMBOL], hass, None, crumb_coordinator, transport.session
+    )
+
+    try:
+        result = await coordinator.get_json()
+        assert result["quoteResponse"]["result"][0]["symbol"] == TEST_SYMBOL
+        assert requests == ["failing", "working"]
+    finally:
+        await transport.async_close()
+        await failing_server.close()
+        await working_server.close()
@@ -1,5 +1,6 @@
 """Tests for Yahoo Finance component."""
 
+import asyncio
 from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
 
@@ -7,27 +8,52 @@ import pytest
 
 from custom_components.yahoofinance import convert_to_float
 from custom_components.yahoofinance.const import (
+    CONF_ADAPTIVE_POLLING,
+    CONF_CLOSED_MARKET_SCAN_INTERVAL,
+    CONF_COLUMNAR_STORE,
+    CONF_CRUMB_TIMEOUT,
     CONF_DECIMAL_PLACES,
+    CONF_HEDGE_REQUESTS,
     CONF_INCLUDE_DIVIDEND_VALUES,
     CONF_INCLUDE_FIFTY_DAY_VALUES,
     CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES,
     CONF_INCLUDE_POST_VALUES,
     CONF_INCLUDE_PRE_VALUES,
     CONF_INCLUDE_TWO_HUNDRED_DAY_VALUES,
+    CONF_MAX_PARALLEL_REQUESTS,
+    CONF_MAX_SYMBOLS_PER_REQUEST,
+    CONF_REQUEST_BURST,
+    CONF_REQUESTS_PER_MINUTE,
     CONF_SHOW_CURRENCY_SYMBOL_AS_UNIT,
     CONF_SHOW_OFF_MARKET_VALUES,
     CONF_SHOW_TRENDING_ICON,
+    CONF_STREAM_QUOTES,
     CONF_SYMBOLS,
+    CONF_TARGET_CURRENCY,
+    CONF_TRIANGULATE_CONVERSIONS,
+    CONF_USER_AGENTS,
+    DEFAULT_CONF_ADAPTIVE_POLLING,
+    DEFAULT_CONF_CLOSED_MARKET_SCAN_INTERVAL,
+    DEFAULT_CONF_COLUMNAR_STORE,
+    DEFAULT_CONF_CRUMB_TIMEOUT,
     DEFAULT_CONF_DECIMAL_PLACES,
+    DEFAULT_CONF_HEDGE_REQUESTS,
     DEFAULT_CONF_INCLUDE_DIVIDEND_VALUES,
     DEFAULT_CONF_INCLUDE_FIFTY_DAY_VALUES,
     DEFAULT_CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES,
     DEFAULT_CONF_INCLUDE_POST_VALUES,
     DEFAULT_CONF_INCLUDE_PRE_VALUES,
     DEFAULT_CONF_INCLUDE_TWO_HUNDRED_DAY_VALUES,
+    DEFAULT_CONF_MAX_PARALLEL_REQUESTS,
+    DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST,
+    DEFAULT_CONF_REQUEST_BURST,
+    DEFAULT_CONF_REQUESTS_PER_MINUTE,
     DEFAULT_CONF_SHOW_CURRENCY_SYMBOL_AS_UNIT,
     DEFAULT_CONF_SHOW_OFF_MARKET_VALUES,
     DEFAULT_CONF_SHOW_TRENDING_ICON,
+    DEFAULT_CONF_STREAM_QUOTES,
+    DEFAULT_CONF_TRIANGULATE_CONVERSIONS,
+    DEFAULT_CONF_USER_AGENTS,
     DEFAULT_SCAN_INTERVAL,
     DOMAIN,
     HASS_DATA_CONFIG,
@@ -35,6 +61,7 @@ from custom_components.yahoofinance.const import (
     MANUAL_SCAN_INTERVAL,
     MINIMUM_SCAN_INTERVAL,
     SERVICE_REFRESH,
+    STORAGE_KEY_CURRENCIES,
 )
 from custom_components.yahoofinance.dataclasses import SymbolDefinition
 from homeassistant.const import CONF_SCAN_INTERVAL
@@ -42,6 +69,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.setup import async_setup_component
 
 from . import TEST_CRUMB, TEST_SYMBOL
+from .conftest import async_wait_for_startup  # noqa: TID251
 
 SAMPLE_CONFIG = {DOMAIN: {CONF_SYMBOLS: [TEST_SYMBOL]}}
 YSUC = "custom_components.yahoofinance.YahooSymbolUpdateCoordinator"
@@ -58,6 +86,18 @@ DEFAULT_OPTIONAL_CONFIG = {
     CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES: DEFAULT_CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES,
     CONF_INCLUDE_DIVIDEND_VALUES: DEFAULT_CONF_INCLUDE_DIVIDEND_VALUES,
     CONF_SHOW_OFF_MARKET_VALUES: DEFAULT_CONF_SHOW_OFF_MARKET_VALUES,
+    CONF_MAX_SYMBOLS_PER_REQUEST: DEFAULT_CONF_MAX_SYMBOLS_PER_REQUEST,
+    CONF_MAX_PARALLEL_REQUESTS: DEFAULT_CONF_MAX_PARALLEL_REQUESTS,
+    CONF_REQUESTS_PER_MINUTE: DEFAULT_CONF_REQUESTS_PER_MINUTE,
+    CONF_REQUEST_BURST: DEFAULT_CONF_REQUEST_BURST,
+    CONF_USER_AGENTS: DEFAULT_CONF_USER_AGENTS,
+    CONF_CRUMB_TIMEOUT: DEFAULT_CONF_CRUMB_TIMEOUT,
+    CONF_HEDGE_REQUESTS: DEFAULT_CONF_HEDGE_REQUESTS,
+    CONF_STREAM_QUOTES: DEFAULT_CONF_STREAM_QUOTES,
+    CONF_COLUMNAR_STORE: DEFAULT_CONF_COLUMNAR_STORE,
+    CONF_TRIANGULATE_CONVERSIONS: DEFAULT_CONF_TRIANGULATE_CONVERSIONS,
+    CONF_ADAPTIVE_POLLING: DEFAULT_CONF_ADAPTIVE_POLLING,
+    CONF_CLOSED_MARKET_SCAN_INTERVAL: DEFAULT_CONF_CLOSED_MARKET_SCAN_INTERVAL,
 }
 
 
@@ -250,7 +290,7 @@ async def test_setup_optionally_requests_coordinator_refresh(
         patch(f"{YCC}.try_get_crumb_cookies", AsyncMock(return_value=TEST_CRUMB)),
     ):
         assert await async_setup_component(hass, DOMAIN, SAMPLE_CONFIG) is True
-        await hass.async_block_till_done()
+        await async_wait_for_startup(hass)
 
         assert mock_instance.async_refresh.call_count == 1
         assert mock_instance.async_request_refresh.call_count == 1
@@ -269,7 +309,7 @@ async def test_refresh_symbols_service(
         ) as mock_async_request_refresh,
     ):
         assert await async_setup_component(hass, DOMAIN, SAMPLE_CONFIG) is True
-        await hass.async_block_till_done()
+        await async_wait_for_startup(hass)
         assert mock_async_request_refresh.call_count == 1
 
         await hass.services.async_call(
@@ -286,6 +326,133 @@ async def test_refresh_symbols_service(
         await coord.async_shutdown()
 
 
+async def test_refresh_symbols_service_for_symbols(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+) -> None:
+    """Test refresh_symbols service only refreshes coordinators owning the symbols."""
+
+    config = {
+        DOMAIN: {
+            CONF_SYMBOLS: [
+                TEST_SYMBOL,
+                {"symbol": "XYZ", CONF_SCAN_INTERVAL: 3600},
+            ]
+        }
+    }
+
+    with (
+        patch(f"{YCC}.try_get_crumb_cookies", AsyncMock(return_value=TEST_CRUMB)),
+        patch(f"{YSUC}._async_update_data", AsyncMock(return_value=None)),
+    ):
+        assert await async_setup_component(hass, DOMAIN, config) is True
+        await async_wait_for_startup(hass)
+
+        coordinators = hass.data[DOMAIN][HASS_DATA_COORDINATORS]
+        assert len(coordinators) == 2
+
+        default_coordinator = coordinators[DEFAULT_SCAN_INTERVAL]
+        hourly_coordinator = coordinators[timedelta(hours=1)]
+
+        with (
+            patch.object(
+                default_coordinator, "async_refresh", AsyncMock(return_value=None)
+            ) as mock_default_refresh,
+            patch.object(
+                hourly_coordinator, "async_refresh", AsyncMock(return_value=None)
+            ) as mock_hourly_refresh,
+        ):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_REFRESH,
+                {CONF_SYMBOLS: ["xyz"]},
+                blocking=True,
+            )
+            await hass.async_block_till_done()
+
+            assert mock_default_refresh.call_count == 0
+            assert mock_hourly_refresh.call_count == 1
+
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_REFRESH,
+                {},
+                blocking=True,
+            )
+            await hass.async_block_till_done()
+
+            assert mock_default_refresh.call_count == 1
+            assert mock_hourly_refresh.call_count == 2
+
+        for coordinator in coordinators.values():
+            await coordinator.async_shutdown()
+
+
+async def test_setup_does_not_wait_for_data(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    """Component setup returns and coordinators are available before data arrives."""
+
+    crumb_received = asyncio.Event()
+
+    async def mock_try_get_crumb_cookies(*args):
+        await crumb_received.wait()
+        return TEST_CRUMB
+
+    with (
+        patch(f"{YCC}.try_get_crumb_cookies", side_effect=mock_try_get_crumb_cookies),
+        patch(
+            f"{YSUC}._async_update_data", AsyncMock(return_value=None)
+        ) as mock_async_update_data,
+    ):
+        assert await async_setup_component(hass, DOMAIN, SAMPLE_CONFIG) is True
+        await hass.async_block_till_done()
+
+        # Coordinators exist but no data has been requested yet
+        coordinators = hass.data[DOMAIN][HASS_DATA_COORDINATORS]
+        assert len(coordinators) == 1
+        assert mock_async_update_data.call_count == 0
+
+        crumb_received.set()
+        await async_wait_for_startup(hass)
+        assert mock_async_update_data.call_count == 1
+
+        for coordinator in coordinators.values():
+            await coordinator.async_shutdown()
+
+
+async def test_cached_conversion_symbols_requested_with_initial_data(
+    hass: HomeAssistant, hass_storage, enable_custom_integrations: None
+) -> None:
+    """Conversion symbols of the cached currencies are part of the initial request."""
+    hass_storage[STORAGE_KEY_CURRENCIES] = {
+        "version": 1,
+        "key": STORAGE_KEY_CURRENCIES,
+        "data": {"currencies": {"XYZ": "EUR", "ABC": "GBp"}},
+    }
+    config = {
+        DOMAIN: {
+            CONF_SYMBOLS: [{"symbol": "XYZ", CONF_TARGET_CURRENCY: "USD"}, "ABC"]
+        }
+    }
+
+    with (
+        patch(f"{YCC}.try_get_crumb_cookies", AsyncMock(return_value=TEST_CRUMB)),
+        patch(
+            f"{YSUC}._async_update_data", AsyncMock(return_value=None)
+        ) as mock_async_update_data,
+    ):
+        assert await async_setup_component(hass, DOMAIN, config) is True
+        await async_wait_for_startup(hass)
+
+        # ABC is not converted
+        (coordinator,) = hass.data[DOMAIN][HASS_DATA_COORDINATORS].values()
+        assert coordinator.get_symbols() == ["XYZ", "ABC", "EURUSD=X"]
+        assert mock_async_update_data.call_count == 1
+
+        await coordinator.async_shutdown()
+
+
 @pytest.mark.parametrize(
     ("sym1", "sym2", "expected"),
     [
@@ -0,0 +1,83 @@
+"""Tests for Yahoo Finance component."""
+
+import pytest
+
+from custom_components.yahoofinance.const import (
+    LATENCY_MIN_SAMPLES,
+    LATENCY_MIN_TIMEOUT,
+)
+from custom_components.yahoofinance.latency import MAX_SAMPLE_COUNT, LatencyHistogram
+
+
+def build_histogram(latencies: list[float]) -> LatencyHistogram:
+    """Build a histogram with the latencies."""
+    histogram = LatencyHistogram()
+    for latency in latencies:
+        histogram.record(latency)
+    return histogram
+
+
+def test_empty_histogram() -> None:
+    """No percentile is known without samples."""
+    histogram = LatencyHistogram()
+    assert histogram.get_percentile(0.5) is None
+    assert histogram.get_hedge_delay() is None
+    assert histogram.get_timeout(10) == 10
+
+
+def test_percentile() -> None:
+    """Percentiles are the upper bound of the bucket holding them."""
+    histogram = build_histogram([0.1] * 90 + [1.0] * 10)
+
+    assert histogram.get_percentile(0.5) == pytest.approx(0.1, rel=0.25)
+    assert histogram.get_percentile(0.95) == pytest.approx(1.0, rel=0.25)
+    assert histogram.get_percentile(0.5) >= 0.1
+    assert histogram.get_percentile(0.95) >= 1.0
+
+
+def test_latency_above_last_bucket() -> None:
+    """Latency beyond the last bucket is reported as the last bucket bound."""
+    histogram = build_histogram([1000])
+    assert histogram.get_percentile(0.99) < 1000
+
+
+@pytest.mark.parametrize(
+    ("latency", "expected_timeout"),
+    [
+        (0.05, LATENCY_MIN_TIMEOUT),
+        (1.0, None),
+        (20, 10),
+    ],
+)
+def test_get_timeout(latency: float, expected_timeout: float | None) -> None:
+    """Timeout is a multiple of p99 latency within the floor and ceiling."""
+    histogram = build_histogram([latency] * LATENCY_MIN_SAMPLES)
+    timeout = histogram.get_timeout(10)
+
+    if expected_timeout is None:
+        assert LATENCY_MIN_TIMEOUT < timeout < 10
+    else:
+        assert timeout == expected_timeout
+
+
+def test_not_enough_samples() -> None:
+    """Timeout and hedge delay are not adapted till there are enough samples."""
+    histogram = build_histogram([0.1] * (LATENCY_MIN_SAMPLES - 1))
+    assert histogram.get_timeout(10) == 10
+    assert histogram.get_hedge_delay() is None
+
+    histogram.record(0.1)
+    assert histogram.get_timeout(10) == LATENCY_MIN_TIMEOUT
+    assert histogram.get_hedge_delay() == pytest.approx(0.1, rel=0.25)
+
+
+def test_old_samples_decay() -> None:
+    """Older samples lose weight once the sample count exceeds the maximum."""
+    histogram = build_histogram([5.0] * MAX_SAMPLE_COUNT)
+    assert histogram.get_percentile(0.5) >= 5.0
+
+    for _ in range(MAX_SAMPLE_COUNT):
+        histogram.record(0.1)
+
+    assert histogram.sample_count <= MAX_SAMPLE_COUNT
+    assert histogram.get_percentile(0.5) < 5.0
@@ -0,0 +1,130 @@
+"""Tests for Yahoo Finance component."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.yahoofinance.const import (
+    DATA_MARKET_STATE,
+    DATA_PRE_MARKET_TIME,
+    DATA_QUOTE_TYPE,
+    DATA_REGULAR_MARKET_TIME,
+)
+from custom_components.yahoofinance.market import MarketHoursPolicy
+from homeassistant.util import dt as dt_util
+
+SCAN_INTERVAL = timedelta(minutes=5)
+CLOSED_MARKET_INTERVAL = timedelta(hours=1)
+OPEN_LEAD = timedelta(minutes=15)
+NOW = datetime(2025, 3, 4, 20, 0, tzinfo=dt_util.UTC)
+
+
+def build_symbol_data(market_state, quote_type="EQUITY") -> dict:
+    """Build symbol data with the market state."""
+    return {DATA_MARKET_STATE: market_state, DATA_QUOTE_TYPE: quote_type}
+
+
+@pytest.mark.parametrize(
+    ("symbol_data", "expected"),
+    [
+        (None, False),
+        (build_symbol_data("REGULAR"), False),
+        (build_symbol_data("PRE"), False),
+        (build_symbol_data("POST"), False),
+        (build_symbol_data("CLOSED"), True),
+        (build_symbol_data("PREPRE"), True),
+        (build_symbol_data("POSTPOST"), True),
+        (build_symbol_data("CLOSED", "CRYPTOCURRENCY"), False),
+        (build_symbol_data("CLOSED", "CURRENCY"), False),
+    ],
+)
+def test_is_market_closed(symbol_data, expected) -> None:
+    """Test market closed check."""
+    assert MarketHoursPolicy.is_market_closed(symbol_data) is expected
+
+
+def test_open_market_uses_scan_interval() -> None:
+    """Open market is updated at the scan interval."""
+    policy = MarketHoursPolicy(CLOSED_MARKET_INTERVAL, OPEN_LEAD)
+    assert (
+        policy.get_next_update("A", build_symbol_data("REGULAR"), NOW, SCAN_INTERVAL)
+        == NOW + SCAN_INTERVAL
+    )
+
+
+def test_closed_market_uses_closed_market_interval() -> None:
+    """Closed market with unknown open time is updated at the closed market interval."""
+    policy = MarketHoursPolicy(CLOSED_MARKET_INTERVAL, OPEN_LEAD)
+    assert (
+        policy.get_next_update("A", build_symbol_data("CLOSED"), NOW, SCAN_INTERVAL)
+        == NOW + CLOSED_MARKET_INTERVAL
+    )
+
+
+def test_closed_market_wakes_up_ahead_of_open() -> None:
+    """Normal interval is resumed ahead of the learned market open time."""
+    policy = MarketHoursPolicy(CLOSED_MARKET_INTERVAL, OPEN_LEAD)
+    closed = build_symbol_data("CLOSED")
+    opened = build_symbol_data("REGULAR")
+
+    # Market is observed opening at 14:30
+    open_time = NOW.replace(hour=14, minute=30)
+    policy.get_next_update("A", closed, open_time - SCAN_INTERVAL, SCAN_INTERVAL)
+    policy.get_next_update("A", opened, open_time, SCAN_INTERVAL)
+    assert policy.get_next_open("A", NOW) == open_time + timedelta(days=1)
+
+    # Late at night the closed market interval is used
+    assert policy.get_next_update("A", closed, NOW, SCAN_INTERVAL) == (
+        NOW + CLOSED_MARKET_INTERVAL
+    )
+
+    # The update is moved ahead of the next open
+    next_wake_up = open_time + timedelta(days=1) - OPEN_LEAD
+    before_open = next_wake_up - timedelta(minutes=30)
+    assert policy.get_next_update("A", closed, before_open, SCAN_INTERVAL) == (
+        next_wake_up
+    )
+
+    # Around the expected open the scan interval is used even if still closed
+    assert policy.get_next_update("A", closed, next_wake_up, SCAN_INTERVAL) == (
+        next_wake_up + SCAN_INTERVAL
+    )
+
+
+def test_open_time_learned_from_quote_time() -> None:
+    """Open time between two closed market updates is taken from the quote."""
+    policy = MarketHoursPolicy(CLOSED_MARKET_INTERVAL, OPEN_LEAD)
+    closed_update = NOW.replace(hour=14)
+    open_time = NOW.replace(hour=14, minute=30)
+
+    # The last session ended the day before
+    closed = {
+        **build_symbol_data("CLOSED"),
+        DATA_REGULAR_MARKET_TIME: (open_time - timedelta(hours=17)).timestamp(),
+    }
+    policy.get_next_update("A", closed, closed_update, SCAN_INTERVAL)
+
+    opened = {
+        **build_symbol_data("PRE"),
+        DATA_PRE_MARKET_TIME: open_time.timestamp(),
+        DATA_REGULAR_MARKET_TIME: (open_time - timedelta(hours=17)).timestamp(),
+    }
+    policy.get_next_update(
+        "A", opened, closed_update + CLOSED_MARKET_INTERVAL, SCAN_INTERVAL
+    )
+    assert policy.get_next_open("A", NOW) == open_time + timedelta(days=1)
+
+    # Normal interval is resumed ahead of the open on the next day
+    next_wake_up = open_time + timedelta(days=1) - OPEN_LEAD
+    assert policy.get_next_update(
+        "A", closed, closed_update + timedelta(days=1), SCAN_INTERVAL
+    ) == next_wake_up
+
+
+def test_closed_market_never_faster_than_scan_interval() -> None:
+    """Closed market interval shorter than scan interval uses the scan interval."""
+    policy = MarketHoursPolicy(timedelta(minutes=1), OPEN_LEAD)
+    assert (
+        policy.get_next_update("A", build_symbol_data("CLOSED"), NOW, SCAN_INTERVAL)
+        == NOW + SCAN_INTERVAL
+    )
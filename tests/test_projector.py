@@ -0,0 +1,88 @@
+"""Tests for Yahoo Finance component."""
+
+from custom_components.yahoofinance.const import (
+    CONF_INCLUDE_FIFTY_DAY_VALUES,
+    CONF_INCLUDE_PRE_VALUES,
+    DATA_DIVIDEND_DATE,
+    DATA_REGULAR_MARKET_PRICE,
+    DATA_SHORT_NAME,
+    DEFAULT_NUMERIC_DATA_GROUP,
+    NUMERIC_DATA_GROUPS,
+    STRING_DATA_KEYS,
+)
+from custom_components.yahoofinance.coordinator import YahooSymbolUpdateCoordinator
+from custom_components.yahoofinance.projector import ALL_DATA_PROJECTOR, QuoteProjector
+
+
+def get_group_keys(group: str) -> list[str]:
+    """Return the keys of the data group."""
+    return [value[0] for value in NUMERIC_DATA_GROUPS[group]]
+
+
+def test_all_data_projection(mock_json) -> None:
+    """All the data pieces are extracted with defaults for the missing keys."""
+    quote = mock_json["quoteResponse"]["result"][0]
+    data = ALL_DATA_PROJECTOR.project({**quote, "extra": 1})
+
+    assert "extra" not in data
+    assert data[DATA_REGULAR_MARKET_PRICE] == quote[DATA_REGULAR_MARKET_PRICE]
+    assert data[DATA_SHORT_NAME] == quote[DATA_SHORT_NAME]
+
+    for group_items in NUMERIC_DATA_GROUPS.values():
+        for value in group_items:
+            assert value[0] in data
+
+
+def test_missing_keys_use_defaults() -> None:
+    """Missing numeric keys are 0 unless they have a specific default."""
+    data = ALL_DATA_PROJECTOR.project({})
+
+    assert data[DATA_REGULAR_MARKET_PRICE] == 0
+    assert data[DATA_DIVIDEND_DATE] is None
+    for key in STRING_DATA_KEYS:
+        assert data[key] is None
+
+
+def test_projection_of_requested_fields() -> None:
+    """Only the data pieces of the requested fields are extracted."""
+    fields = YahooSymbolUpdateCoordinator.build_request_fields(
+        {CONF_INCLUDE_FIFTY_DAY_VALUES: True}
+    )
+    data = QuoteProjector(fields).project({})
+
+    for key in [
+        *get_group_keys(DEFAULT_NUMERIC_DATA_GROUP),
+        *get_group_keys(CONF_INCLUDE_FIFTY_DAY_VALUES),
+        *STRING_DATA_KEYS,
+    ]:
+        assert key in data
+
+    for key in get_group_keys(CONF_INCLUDE_PRE_VALUES):
+        assert key not in data
+
+
+def test_record_mapping_access(mock_json) -> None:
+    """Records offer the same data as the projected dict."""
+    quote = mock_json["quoteResponse"]["result"][0]
+    record = ALL_DATA_PROJECTOR.project_record(quote)
+
+    assert record == ALL_DATA_PROJECTOR.project(quote)
+    assert record[DATA_REGULAR_MARKET_PRICE] == quote[DATA_REGULAR_MARKET_PRICE]
+    assert record.get("extra") is None
+    assert "extra" not in record
+    assert DATA_SHORT_NAME in record
+    assert len(record) == len(ALL_DATA_PROJECTOR.items)
+
+
+def test_record_updated_in_place() -> None:
+    """Records of the projector are updated in place."""
+    record = ALL_DATA_PROJECTOR.project_record({DATA_REGULAR_MARKET_PRICE: 1})
+
+    updated = ALL_DATA_PROJECTOR.project_record({DATA_SHORT_NAME: "A"}, record)
+    assert updated is record
+    assert record[DATA_REGULAR_MARKET_PRICE] == 0
+    assert record[DATA_SHORT_NAME] == "A"
+
+    # Data from elsewhere is replaced
+    assert ALL_DATA_PROJECTOR.project_record({}, {}) == ALL_DATA_PROJECTOR.project({})
+    assert QuoteProjector().project_record({}, record) is not record
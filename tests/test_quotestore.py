@@ -0,0 +1,243 @@
+"""Tests for Yahoo Finance component."""
+
+import copy
+
+import pytest
+
+from custom_components.yahoofinance import SymbolDefinition
+from custom_components.yahoofinance.const import (
+    ATTR_TRENDING,
+    CONF_DECIMAL_PLACES,
+    CONF_INCLUDE_DIVIDEND_VALUES,
+    CONF_INCLUDE_FIFTY_DAY_VALUES,
+    CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES,
+    CONF_INCLUDE_POST_VALUES,
+    CONF_INCLUDE_PRE_VALUES,
+    CONF_INCLUDE_TWO_HUNDRED_DAY_VALUES,
+    CONF_SHOW_OFF_MARKET_VALUES,
+    DATA_CURRENCY_SYMBOL,
+    DATA_FINANCIAL_CURRENCY,
+    DATA_REGULAR_MARKET_PREVIOUS_CLOSE,
+    DATA_REGULAR_MARKET_PRICE,
+    DOMAIN,
+    HASS_DATA_CONVERSION_ENGINE,
+    HASS_DATA_QUOTE_STORE,
+    PIVOT_CURRENCY,
+)
+from custom_components.yahoofinance.coordinator import YahooSymbolUpdateCoordinator
+from custom_components.yahoofinance.currency import CurrencyConversionEngine
+from custom_components.yahoofinance.quotestore import (
+    INITIAL_CAPACITY,
+    ColumnarQuoteStore,
+)
+from custom_components.yahoofinance.sensor import YahooFinanceSensor
+from homeassistant.core import HomeAssistant
+
+from .test_sensor import (  # noqa: TID251
+    DEFAULT_OPTIONAL_CONFIG,
+    build_mock_coordinator_for_conversion,
+    build_mock_symbol_data,
+    install_coordinator,
+)
+
+np = pytest.importorskip("numpy")
+
+ALL_GROUPS = {
+    CONF_INCLUDE_DIVIDEND_VALUES: True,
+    CONF_INCLUDE_FIFTY_DAY_VALUES: True,
+    CONF_INCLUDE_FIFTY_TWO_WEEK_VALUES: True,
+    CONF_INCLUDE_POST_VALUES: True,
+    CONF_INCLUDE_PRE_VALUES: True,
+    CONF_INCLUDE_TWO_HUNDRED_DAY_VALUES: True,
+}
+
+
+def build_quote_store(hass: HomeAssistant, config) -> ColumnarQuoteStore:
+    """Build the store with the installed conversion engine, one is installed if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    conversion_engine = domain_data.setdefault(
+        HASS_DATA_CONVERSION_ENGINE, CurrencyConversionEngine(hass, False)
+    )
+    return ColumnarQuoteStore.from_config(config, conversion_engine)
+
+
+def build_sensors(hass: HomeAssistant, coordinator, symbols, config, quote_store):
+    """Build the sensors for the symbols and update them from the coordinator."""
+    hass.data[DOMAIN][HASS_DATA_QUOTE_STORE] = quote_store
+    sensors = [
+        YahooFinanceSensor(hass, coordinator, symbol_definition, config)
+        for symbol_definition in symbols
+    ]
+
+    if quote_store is not None:
+        quote_store.update(coordinator.data)
+
+    for sensor in sensors:
+        sensor.update_properties()
+
+    return sensors
+
+
+def assert_same_sensors(sensors, expected_sensors) -> None:
+    """Check that the sensors report the same values."""
+    for sensor, expected in zip(sensors, expected_sensors, strict=True):
+        assert sensor.available == expected.available
+        assert sensor.state == pytest.approx(expected.state)
+        assert sensor.icon == expected.icon
+        assert sensor.extra_state_attributes == pytest.approx(
+            expected.extra_state_attributes
+        )
+        # Integers are not reported as floats
+        assert {
+            key: type(value) for (key, value) in sensor.extra_state_attributes.items()
+        } == {
+            key: type(value)
+            for (key, value) in expected.extra_state_attributes.items()
+        }
+
+
+@pytest.mark.parametrize(
+    "config_update",
+    [
+        {},
+        {CONF_DECIMAL_PLACES: 0},
+        {CONF_DECIMAL_PLACES: -1},
+        {CONF_SHOW_OFF_MARKET_VALUES: True},
+        ALL_GROUPS,
+    ],
+)
+def test_values_match_sensor(
+    hass: HomeAssistant,
+    mocked_crumb_coordinator,
+    multiple_sample_data,
+    config_update,
+) -> None:
+    """Precomputed values are the same as the ones computed by the sensor."""
+    (symbols, json_data) = multiple_sample_data
+    coordinator = YahooSymbolUpdateCoordinator(
+        symbols, hass, None, mocked_crumb_coordinator, None
+    )
+    (_, coordinator.data) = coordinator.process_json_result(
+        json_data["quoteResponse"]["result"]
+    )
+    install_coordinator(hass, coordinator)
+
+    config = {**copy.deepcopy(DEFAULT_OPTIONAL_CONFIG), **config_update}
+    symbol_definitions = [SymbolDefinition(symbol) for symbol in symbols]
+
+    expected_sensors = build_sensors(
+        hass, coordinator, symbol_definitions, config, None
+    )
+    quote_store = build_quote_store(hass, config)
+    sensors = build_sensors(hass, coordinator, symbol_definitions, config, quote_store)
+
+    for sensor in sensors:
+        assert quote_store.get_values(sensor.unique_id) is not None
+    assert_same_sensors(sensors, expected_sensors)
+
+
+@pytest.mark.parametrize(
+    ("currency", "expected_market_price"),
+    [("USD", 12 * 1.5), ("GBp", 12 * 0.01 * 1.5)],
+)
+def test_conversion(hass: HomeAssistant, currency, expected_market_price) -> None:
+    """Values are converted with the price of the conversion symbol."""
+    symbol = "XYZ"
+    coordinator = build_mock_coordinator_for_conversion(
+        hass, symbol, 12, "GBP" if currency == "GBp" else currency, "CHF", 1.5
+    )
+    coordinator.data[symbol][DATA_CURRENCY_SYMBOL] = currency
+    coordinator.data[symbol][DATA_REGULAR_MARKET_PREVIOUS_CLOSE] = 100
+    install_coordinator(hass, coordinator)
+
+    symbol_definitions = [SymbolDefinition(symbol, target_currency="CHF")]
+    quote_store = build_quote_store(hass, DEFAULT_OPTIONAL_CONFIG)
+    (sensor,) = build_sensors(
+        hass, coordinator, symbol_definitions, DEFAULT_OPTIONAL_CONFIG, quote_store
+    )
+
+    values = quote_store.get_values(symbol)
+    assert values.market_price == pytest.approx(expected_market_price)
+    assert values.trending == "down"
+    assert sensor.state == pytest.approx(expected_market_price)
+    assert sensor.extra_state_attributes[ATTR_TRENDING] == "down"
+
+
+def test_missing_conversion_data(hass: HomeAssistant) -> None:
+    """There is no market price till the conversion symbol has data."""
+    quote_store = build_quote_store(hass, DEFAULT_OPTIONAL_CONFIG)
+    quote_store.register("XYZ", "EUR")
+
+    quote_store.update({"XYZ": build_mock_symbol_data("XYZ", 12)})
+    values = quote_store.get_values("XYZ")
+    assert values.market_price is None
+    assert values.trending is None
+
+    # The coordinator updates the conversion rates before the store
+    conversion_data = {"USDEUR=X": build_mock_symbol_data("USDEUR=X", 0.5, "EUR")}
+    hass.data[DOMAIN][HASS_DATA_CONVERSION_ENGINE].update(conversion_data)
+    quote_store.update(conversion_data)
+    assert quote_store.get_values("XYZ").market_price == 6
+
+
+def test_triangulated_conversion(hass: HomeAssistant) -> None:
+    """Cross rates are derived from the pivot currency symbols."""
+    conversion_engine = CurrencyConversionEngine(hass, False, PIVOT_CURRENCY)
+    hass.data[DOMAIN] = {HASS_DATA_CONVERSION_ENGINE: conversion_engine}
+    quote_store = build_quote_store(hass, DEFAULT_OPTIONAL_CONFIG)
+    quote_store.register("XYZ", "JPY")
+
+    data = {
+        "XYZ": build_mock_symbol_data("XYZ", 12, "EUR"),
+        "USDEUR=X": build_mock_symbol_data("USDEUR=X", 0.5, "EUR"),
+        "USDJPY=X": build_mock_symbol_data("USDJPY=X", 100, "JPY"),
+    }
+    quote_store.update(data)
+    assert quote_store.get_values("XYZ").market_price is None
+
+    conversion_engine.update(data)
+    quote_store.update(data)
+    assert quote_store.get_values("XYZ").market_price == pytest.approx(2400)
+
+
+def test_values_not_known_before_update(hass: HomeAssistant) -> None:
+    """Values are only known once the data of a registered symbol is stored."""
+    quote_store = build_quote_store(hass, DEFAULT_OPTIONAL_CONFIG)
+    assert quote_store.get_values("XYZ") is None
+
+    quote_store.update({"XYZ": build_mock_symbol_data("XYZ", 12)})
+    assert quote_store.get_values("XYZ").market_price == 12
+
+    # The target currency applies from the next update
+    quote_store.register("XYZ", "EUR")
+    assert quote_store.get_values("XYZ") is None
+
+
+def test_store_grows(hass: HomeAssistant) -> None:
+    """Rows are added for any number of symbols."""
+    quote_store = build_quote_store(hass, DEFAULT_OPTIONAL_CONFIG)
+    count = INITIAL_CAPACITY * 2 + 1
+    data = {
+        f"S{index}": {
+            **build_mock_symbol_data(f"S{index}", index),
+            DATA_FINANCIAL_CURRENCY: None,
+            DATA_REGULAR_MARKET_PRICE: index,
+        }
+        for index in range(count)
+    }
+
+    quote_store.update(data)
+    for index in range(count):
+        assert quote_store.get_values(f"S{index}").market_price == index
+
+
+@pytest.mark.parametrize("decimal_places", [1, 2, 3])
+def test_rounding_matches_round(hass: HomeAssistant, decimal_places) -> None:
+    """Values are rounded like round() even if the scaled value is a half."""
+    quote_store = build_quote_store(
+        hass, {**DEFAULT_OPTIONAL_CONFIG, CONF_DECIMAL_PLACES: decimal_places}
+    )
+    values = [42.055, -42.055, 3004.5 * 0.01, 1.005, -2.675, 0.125, 1e9 + 0.5, 7.0]
+
+    rounded = quote_store._round(np.array([values]))
+    assert rounded.tolist() == [[round(value, decimal_places) for value in values]]
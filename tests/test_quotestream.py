@@ -0,0 +1,76 @@
+"""Tests for Yahoo Finance component."""
+
+import json
+
+import pytest
+
+from custom_components.yahoofinance.quotestream import QuoteStreamParser
+
+from .conftest import load_json  # noqa: TID251
+
+
+def parse(body: bytes, chunk_size: int) -> tuple[list[dict], dict]:
+    """Parse the body in chunks and return the quotes and remaining document."""
+    quotes = []
+    parser = QuoteStreamParser(quotes.append)
+    for index in range(0, len(body), chunk_size):
+        parser.feed(body[index : index + chunk_size])
+    document = parser.close()
+
+    assert parser.quote_count == len(quotes)
+    return quotes, document
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024, 1024 * 1024])
+def test_quotes_are_streamed(chunk_size) -> None:
+    """Quotes are decoded one at a time irrespective of the chunk boundaries."""
+    body = load_json("yahoofinance.json").encode()
+    expected = json.loads(body)
+
+    quotes, document = parse(body, chunk_size)
+
+    assert quotes == expected["quoteResponse"]["result"]
+    assert document == {"quoteResponse": {**expected["quoteResponse"], "result": []}}
+
+
+def test_multibyte_character_split_across_chunks() -> None:
+    """A character split between chunks is decoded once complete."""
+    body = json.dumps(
+        {"quoteResponse": {"result": [{"shortName": "Zürich €"}], "error": None}},
+        ensure_ascii=False,
+    ).encode()
+
+    quotes, _ = parse(body, 1)
+    assert quotes == [{"shortName": "Zürich €"}]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"",
+        b'{"quoteResponse": {"error": "fake error"}}',
+        b'{"quoteResponse": {"result": [], "error": null}}',
+    ],
+)
+def test_document_without_quotes(body: bytes) -> None:
+    """Documents without quotes are returned whole."""
+    quotes, document = parse(body, 5)
+    assert quotes == []
+    assert document == (json.loads(body) if body else None)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"quoteResponse": {"result": [{"symbol": "A"}, {"symbol"',
+        b'{"quoteResponse": {"result": [{"symbol": "A"}',
+        b'{"quoteResponse": {"result": [{"symbol": "A"}]',
+        b"<html>",
+    ],
+)
+def test_invalid_body(body: bytes) -> None:
+    """Truncated or non JSON body raises ValueError."""
+    parser = QuoteStreamParser(lambda _: None)
+    parser.feed(body)
+    with pytest.raises(ValueError):
+        parser.close()
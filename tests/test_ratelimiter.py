@@ -0,0 +1,98 @@
+"""Tests for Yahoo Finance component."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.yahoofinance.const import (
+    REQUEST_PRIORITY_HIGH,
+    REQUEST_PRIORITY_LOW,
+)
+from custom_components.yahoofinance.ratelimiter import RateLimiter
+
+
+async def test_burst_is_not_delayed() -> None:
+    """Requests within the burst acquire a token immediately."""
+    limiter = RateLimiter(60, 3)
+
+    for _ in range(3):
+        await asyncio.wait_for(limiter.acquire(), 0.1)
+
+    assert limiter.request_count == 3
+    assert limiter.total_wait_time == 0
+    assert limiter.queue_depth == 0
+
+
+async def test_requests_wait_after_burst() -> None:
+    """Requests after the burst wait for the next token."""
+    limiter = RateLimiter(6000, 1)  # 100 tokens per second
+
+    await limiter.acquire()
+    await asyncio.wait_for(limiter.acquire(), 1)
+
+    assert limiter.request_count == 2
+    assert limiter.last_wait_time > 0
+    assert limiter.average_wait_time == pytest.approx(limiter.total_wait_time / 2)
+
+
+async def test_high_priority_is_served_first() -> None:
+    """Waiting requests are served by priority and then arrival order."""
+    limiter = RateLimiter(6000, 1)
+    await limiter.acquire()
+
+    order = []
+
+    async def acquire(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    tasks = [
+        asyncio.create_task(acquire("low", REQUEST_PRIORITY_LOW)),
+        asyncio.create_task(acquire("high1", REQUEST_PRIORITY_HIGH)),
+        asyncio.create_task(acquire("high2", REQUEST_PRIORITY_HIGH)),
+    ]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 3
+
+    await asyncio.wait_for(asyncio.gather(*tasks), 1)
+    assert order == ["high1", "high2", "low"]
+    assert limiter.queue_depth == 0
+
+
+async def test_cancelled_request_leaves_queue() -> None:
+    """A cancelled request does not hold up the queue."""
+    limiter = RateLimiter(6000, 1)
+    await limiter.acquire()
+
+    cancelled = asyncio.create_task(limiter.acquire())
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+
+    await asyncio.wait_for(waiting, 1)
+    assert limiter.queue_depth == 0
+
+
+async def test_tokens_do_not_exceed_burst() -> None:
+    """Idle time does not accumulate more tokens than the burst."""
+    with patch(
+        "custom_components.yahoofinance.ratelimiter.time.monotonic", return_value=0
+    ) as mock_monotonic:
+        limiter = RateLimiter(60, 2)
+        mock_monotonic.return_value = 3600
+
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.queue_depth == 0
+
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 1
+
+        waiting.cancel()
+        await asyncio.sleep(0)
@@ -0,0 +1,361 @@
+"""Tests for Yahoo Finance component."""
+
+from datetime import timedelta
+import logging
+from unittest.mock import AsyncMock, Mock
+
+import aiohttp
+import pytest
+
+from custom_components.yahoofinance.const import (
+    DATA_MARKET_STATE,
+    DATA_QUOTE_TYPE,
+    MANUAL_SCAN_INTERVAL,
+    PREWARM_LEAD,
+)
+from custom_components.yahoofinance.coordinator import YahooSymbolUpdateCoordinator
+from custom_components.yahoofinance.market import MarketHoursPolicy
+from custom_components.yahoofinance.scheduler import YahooSymbolScheduler
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+SESSION = async_get_clientsession
+
+
+def build_coordinator(
+    hass: HomeAssistant, symbols, scan_interval, crumb_coordinator
+) -> YahooSymbolUpdateCoordinator:
+    """Build a coordinator for the scheduler."""
+    return YahooSymbolUpdateCoordinator(
+        symbols, hass, scan_interval, crumb_coordinator, SESSION
+    )
+
+
+def build_json(symbols) -> dict:
+    """Build quote response for the symbols."""
+    return {
+        "quoteResponse": {
+            "result": [{"symbol": symbol} for symbol in symbols],
+            "error": None,
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    ("scan_intervals", "expected_tick_interval"),
+    [
+        ([timedelta(seconds=60)], timedelta(seconds=60)),
+        ([timedelta(seconds=60), timedelta(seconds=90)], timedelta(seconds=30)),
+        ([timedelta(minutes=5), timedelta(hours=6)], timedelta(minutes=5)),
+        ([timedelta(minutes=5), MANUAL_SCAN_INTERVAL], timedelta(minutes=5)),
+        ([MANUAL_SCAN_INTERVAL], None),
+    ],
+)
+def test_tick_interval(
+    hass: HomeAssistant,
+    scan_intervals,
+    expected_tick_interval,
+    mocked_crumb_coordinator,
+) -> None:
+    """The scheduler runs on the GCD of the coordinator intervals."""
+    coordinators = [
+        build_coordinator(hass, ["A"], scan_interval, mocked_crumb_coordinator)
+        for scan_interval in scan_intervals
+    ]
+    scheduler = YahooSymbolScheduler(hass, coordinators)
+    assert scheduler.tick_interval == expected_tick_interval
+
+
+async def test_start_takes_over_coordinator_timers(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Coordinators no longer schedule their own updates."""
+    coordinator = build_coordinator(
+        hass, ["A"], timedelta(minutes=5), mocked_crumb_coordinator
+    )
+    # Refresh scheduled by the initial refresh
+    coordinator._schedule_refresh()
+    assert coordinator._unsub_refresh is not None
+
+    scheduler = YahooSymbolScheduler(hass, [coordinator])
+    scheduler.async_start()
+
+    assert coordinator.update_interval is None
+    assert coordinator.scan_interval == timedelta(minutes=5)
+    assert coordinator._unsub_refresh is None
+
+    scheduler.async_stop()
+
+
+async def test_due_symbols_are_requested_together(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Symbols of all the due coordinators are requested in one batch."""
+    first = build_coordinator(
+        hass, ["A", "B"], timedelta(seconds=60), mocked_crumb_coordinator
+    )
+    second = build_coordinator(
+        hass, ["B", "C"], timedelta(seconds=90), mocked_crumb_coordinator
+    )
+    first.get_json = AsyncMock(side_effect=build_json)
+    second.get_json = AsyncMock(side_effect=build_json)
+
+    scheduler = YahooSymbolScheduler(hass, [first, second])
+    await scheduler._async_tick(dt_util.utcnow())
+    await hass.async_block_till_done()
+
+    assert first.get_json.call_count == 1
+    assert first.get_json.call_args.args[0] == ["A", "B", "C"]
+    assert second.get_json.call_count == 0
+
+    assert set(first.data) == {"A", "B"}
+    assert set(second.data) == {"B", "C"}
+    assert first.last_update_success is True
+    assert second.last_update_success is True
+
+
+async def test_rate_limiter_stats_are_logged(
+    hass: HomeAssistant, mocked_crumb_coordinator, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Rate limiter queue depth and average wait are logged on every tick."""
+    coordinator = build_coordinator(
+        hass, ["A"], timedelta(seconds=60), mocked_crumb_coordinator
+    )
+    coordinator.get_json = AsyncMock(side_effect=build_json)
+
+    rate_limiter = mocked_crumb_coordinator.rate_limiter
+    rate_limiter.total_wait_time = 3.0
+    rate_limiter.request_count = 2
+
+    scheduler = YahooSymbolScheduler(hass, [coordinator])
+    with caplog.at_level(logging.DEBUG):
+        await scheduler._async_tick(dt_util.utcnow())
+
+    assert (
+        "Requested 1 shards, rate limiter queue depth=0, average wait=1.500 seconds"
+        in caplog.text
+    )
+
+
+async def test_only_due_coordinators_are_updated(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Coordinators which are not due are skipped."""
+    first = build_coordinator(
+        hass, ["A"], timedelta(seconds=60), mocked_crumb_coordinator
+    )
+    second = build_coordinator(
+        hass, ["B"], timedelta(seconds=90), mocked_crumb_coordinator
+    )
+    mock_get_json = AsyncMock(side_effect=build_json)
+    first.get_json = mock_get_json
+    second.get_json = mock_get_json
+
+    scheduler = YahooSymbolScheduler(hass, [first, second])
+
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+    assert mock_get_json.call_args.args[0] == ["A", "B"]
+
+    # 60s later only the first coordinator is due
+    await scheduler._async_tick(now + timedelta(seconds=60))
+    assert mock_get_json.call_count == 2
+    assert mock_get_json.call_args.args[0] == ["A"]
+
+    # 90s later only the second coordinator is due
+    await scheduler._async_tick(now + timedelta(seconds=90))
+    assert mock_get_json.call_count == 3
+    assert mock_get_json.call_args.args[0] == ["B"]
+
+
+async def test_failed_request_updates_all_coordinators(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """A failed request is reported to all the due coordinators."""
+    first = build_coordinator(
+        hass, ["A"], timedelta(seconds=60), mocked_crumb_coordinator
+    )
+    second = build_coordinator(
+        hass, ["B"], timedelta(seconds=60), mocked_crumb_coordinator
+    )
+    first.get_json = AsyncMock(side_effect=aiohttp.ClientError)
+
+    scheduler = YahooSymbolScheduler(hass, [first, second])
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+
+    assert first.last_update_success is False
+    assert second.last_update_success is False
+    assert first.failed_count == 1
+    assert second.failed_count == 1
+
+    # Coordinators are not due till the retry delay passes
+    assert scheduler.get_due_symbols(now + timedelta(seconds=1)) == {}
+
+
+async def test_closed_market_symbols_are_not_due(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Symbols with closed market are requested at the closed market interval."""
+    coordinator = YahooSymbolUpdateCoordinator(
+        ["OPEN", "CLOSED", "BTC-USD"],
+        hass,
+        timedelta(minutes=5),
+        mocked_crumb_coordinator,
+        SESSION,
+        market_hours_policy=MarketHoursPolicy(
+            timedelta(hours=1), timedelta(minutes=15)
+        ),
+    )
+
+    market_states = {
+        "OPEN": ("REGULAR", "EQUITY"),
+        "CLOSED": ("CLOSED", "EQUITY"),
+        "BTC-USD": ("CLOSED", "CRYPTOCURRENCY"),
+    }
+
+    async def mock_get_json(symbols):
+        return {
+            "quoteResponse": {
+                "result": [
+                    {
+                        "symbol": symbol,
+                        DATA_MARKET_STATE: market_states[symbol][0],
+                        DATA_QUOTE_TYPE: market_states[symbol][1],
+                    }
+                    for symbol in symbols
+                ]
+            }
+        }
+
+    coordinator.get_json = AsyncMock(side_effect=mock_get_json)
+    scheduler = YahooSymbolScheduler(hass, [coordinator])
+
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+    assert coordinator.get_json.call_args.args[0] == ["OPEN", "CLOSED", "BTC-USD"]
+
+    await scheduler._async_tick(now + timedelta(minutes=5))
+    assert coordinator.get_json.call_args.args[0] == ["OPEN", "BTC-USD"]
+
+    await scheduler._async_tick(now + timedelta(hours=1))
+    assert coordinator.get_json.call_args.args[0] == ["OPEN", "CLOSED", "BTC-USD"]
+
+
+async def test_paused_scheduler_skips_tick(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """No request is made while data requests are paused."""
+    coordinator = build_coordinator(
+        hass, ["A"], timedelta(seconds=60), mocked_crumb_coordinator
+    )
+    coordinator.get_json = AsyncMock(side_effect=build_json)
+    coordinator.get_paused_time = Mock(return_value=30)
+
+    scheduler = YahooSymbolScheduler(hass, [coordinator])
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+    assert coordinator.get_json.call_count == 0
+    assert coordinator.failed_count == 0
+
+    coordinator.get_paused_time.return_value = 0
+    await scheduler._async_tick(now)
+    assert coordinator.get_json.call_count == 1
+
+
+@pytest.mark.parametrize(
+    ("scan_interval", "expected_prewarm_count"),
+    [
+        (timedelta(minutes=5), 1),
+        (timedelta(seconds=60), 0),  # Connection is still open at the next tick
+    ],
+)
+async def test_connection_is_prewarmed(
+    hass: HomeAssistant,
+    mocked_crumb_coordinator,
+    scan_interval,
+    expected_prewarm_count,
+) -> None:
+    """Connection is opened ahead of the next tick once it would have been closed."""
+    coordinator = build_coordinator(
+        hass, ["A"], scan_interval, mocked_crumb_coordinator
+    )
+    coordinator.get_json = AsyncMock(side_effect=build_json)
+    coordinator.async_prewarm_connection = AsyncMock()
+
+    scheduler = YahooSymbolScheduler(hass, [coordinator])
+    scheduler.async_start()
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+
+    async_fire_time_changed(hass, now + scan_interval - PREWARM_LEAD * 2)
+    await hass.async_block_till_done()
+    assert coordinator.async_prewarm_connection.call_count == 0
+
+    async_fire_time_changed(hass, now + scan_interval - PREWARM_LEAD)
+    await hass.async_block_till_done()
+    assert coordinator.async_prewarm_connection.call_count == expected_prewarm_count
+
+    scheduler.async_stop()
+
+
+async def test_connection_is_prewarmed_for_next_due_tick(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """Connection is opened ahead of the next tick with due symbols, not every tick."""
+    coordinator1 = build_coordinator(
+        hass, ["A"], timedelta(seconds=180), mocked_crumb_coordinator
+    )
+    coordinator2 = build_coordinator(
+        hass, ["B"], timedelta(seconds=300), mocked_crumb_coordinator
+    )
+    coordinator1.get_json = AsyncMock(side_effect=build_json)
+    coordinator1.async_prewarm_connection = AsyncMock()
+
+    scheduler = YahooSymbolScheduler(hass, [coordinator1, coordinator2])
+    assert scheduler.tick_interval == timedelta(seconds=60)
+    scheduler.async_start()
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+    assert coordinator1.get_json.call_count == 1
+
+    # Ticks without due symbols make no request
+    for seconds in (60, 120):
+        async_fire_time_changed(hass, now + timedelta(seconds=seconds))
+        await hass.async_block_till_done()
+    assert coordinator1.get_json.call_count == 1
+    assert coordinator1.async_prewarm_connection.call_count == 0
+
+    next_tick = now + timedelta(seconds=180)
+    assert scheduler.get_next_due_tick(now + timedelta(seconds=120)) == next_tick
+
+    async_fire_time_changed(hass, next_tick - PREWARM_LEAD)
+    await hass.async_block_till_done()
+    assert coordinator1.async_prewarm_connection.call_count == 1
+
+    scheduler.async_stop()
+
+
+async def test_prewarm_cancelled_on_stop(
+    hass: HomeAssistant, mocked_crumb_coordinator
+) -> None:
+    """No connection is opened once the scheduler has stopped."""
+    scan_interval = timedelta(minutes=5)
+    coordinator = build_coordinator(
+        hass, ["A"], scan_interval, mocked_crumb_coordinator
+    )
+    coordinator.get_json = AsyncMock(side_effect=build_json)
+    coordinator.async_prewarm_connection = AsyncMock()
+
+    scheduler = YahooSymbolScheduler(hass, [coordinator])
+    scheduler.async_start()
+    now = dt_util.utcnow()
+    await scheduler._async_tick(now)
+    scheduler.async_stop()
+
+    async_fire_time_changed(hass, now + scan_interval)
+    await hass.async_block_till_done()
+    assert coordinator.async_prewarm_connection.call_count == 0
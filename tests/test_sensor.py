@@ -46,8 +46,15 @@ from custom_components.yahoofinance.const import (
     DEFAULT_NUMERIC_DATA_GROUP,
     DOMAIN,
     HASS_DATA_CONFIG,
+    HASS_DATA_CONVERSION_ENGINE,
     HASS_DATA_COORDINATORS,
+    HASS_DATA_CURRENCY_CACHE,
     NUMERIC_DATA_GROUPS,
+    PIVOT_CURRENCY,
+)
+from custom_components.yahoofinance.currency import (
+    CurrencyCache,
+    CurrencyConversionEngine,
 )
 from custom_components.yahoofinance.sensor import (
     YahooFinanceSensor,
@@ -129,7 +136,10 @@ def build_mock_coordinator_for_conversion(
 
 def install_coordinator(hass: HomeAssistant, coordinator) -> None:
     """Install the coordinator into HASS_DATA_COORDINATORS store."""
-    hass.data[DOMAIN] = {HASS_DATA_COORDINATORS: {DEFAULT_SCAN_INTERVAL: coordinator}}
+    hass.data[DOMAIN] = {
+        HASS_DATA_COORDINATORS: {DEFAULT_SCAN_INTERVAL: coordinator},
+        HASS_DATA_CONVERSION_ENGINE: CurrencyConversionEngine(hass, False),
+    }
 
 
 async def test_setup_platform(hass: HomeAssistant) -> None:
@@ -628,6 +638,62 @@ def test_conversion_requests_additional_data_from_coordinator(
         assert mock_add_symbol.call_count == 1
 
 
+async def test_conversion_with_initial_data(hass: HomeAssistant) -> None:
+    """Conversion symbol requested with the initial data is used right away."""
+
+    symbol = "XYZ"
+    mock_coordinator = build_mock_coordinator(hass, True, symbol, 12)
+    mock_coordinator.data["USDEUR=X"] = build_mock_symbol_data("USDEUR=X", 0.5, "EUR")
+    install_coordinator(hass, mock_coordinator)
+    currency_cache = CurrencyCache(hass)
+    hass.data[DOMAIN][HASS_DATA_CURRENCY_CACHE] = currency_cache
+
+    sensor = YahooFinanceSensor(
+        hass,
+        mock_coordinator,
+        SymbolDefinition(symbol, target_currency="EUR"),
+        DEFAULT_OPTIONAL_CONFIG,
+    )
+
+    with patch.object(mock_coordinator, "add_symbol") as mock_add_symbol:
+        sensor.update_properties()
+
+        assert sensor.available is True
+        assert sensor.state == 6
+        assert mock_add_symbol.call_count == 0
+
+    # Currency is cached for the next startup
+    assert currency_cache.get(symbol) == "USD"
+
+
+def test_triangulated_conversion_requests_pivot_symbols(hass: HomeAssistant) -> None:
+    """Both pivot currency symbols are requested for a cross rate."""
+
+    symbol = "XYZ"
+    mock_coordinator = build_mock_coordinator(hass, True, symbol, 12)
+    mock_coordinator.data[symbol][DATA_CURRENCY_SYMBOL] = "EUR"
+    install_coordinator(hass, mock_coordinator)
+    hass.data[DOMAIN][HASS_DATA_CONVERSION_ENGINE] = CurrencyConversionEngine(
+        hass, False, PIVOT_CURRENCY
+    )
+
+    sensor = YahooFinanceSensor(
+        hass,
+        mock_coordinator,
+        SymbolDefinition(symbol, target_currency="JPY"),
+        DEFAULT_OPTIONAL_CONFIG,
+    )
+
+    with patch.object(mock_coordinator, "add_symbol") as mock_add_symbol:
+        sensor.update_properties()
+
+        assert sensor.available is False
+        assert [call.args[0] for call in mock_add_symbol.call_args_list] == [
+            "USDEUR=X",
+            "USDJPY=X",
+        ]
+
+
 def test_conversion_not_attempted_if_target_currency_same(hass: HomeAssistant) -> None:
     """No conversion is attempted if target curency is the same as symbol currency."""
 
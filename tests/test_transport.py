@@ -0,0 +1,93 @@
+"""Tests for Yahoo Finance component."""
+
+from http.cookies import SimpleCookie
+
+from yarl import URL
+
+from custom_components.yahoofinance.const import (
+    BASE,
+    CONNECTION_LIMIT_PER_HOST,
+    GET_CRUMB_URL,
+    HASS_DATA_TRANSPORT,
+    XHR_REQUEST_HEADERS,
+)
+from custom_components.yahoofinance.transport import (
+    YahooTransport,
+    async_get_transport,
+)
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant
+
+
+async def test_session_is_reused(hass: HomeAssistant) -> None:
+    """The same tuned session is returned till the transport is closed."""
+    transport = YahooTransport(hass)
+    session = transport.session
+    assert transport.session is session
+    assert session.connector.limit_per_host == CONNECTION_LIMIT_PER_HOST
+
+    await transport.async_close()
+    assert session.closed
+    assert transport.session is not session
+    await transport.async_close()
+
+
+def test_xhr_headers_are_cached(hass: HomeAssistant) -> None:
+    """Headers are built once per user agent."""
+    transport = YahooTransport(hass)
+
+    headers = transport.get_xhr_headers("agent")
+    assert headers == {**XHR_REQUEST_HEADERS, "user-agent": "agent"}
+    assert transport.get_xhr_headers("agent") is headers
+    assert transport.get_xhr_headers("other")["user-agent"] == "other"
+
+
+async def test_set_cookies(hass: HomeAssistant) -> None:
+    """Cookies without domain are sent to all the Yahoo hosts."""
+    transport = YahooTransport(hass)
+    cookies = SimpleCookie()
+    cookies["A1"] = "value"
+
+    transport.set_cookies(cookies)
+    for url in (BASE, GET_CRUMB_URL):
+        assert transport.cookie_jar.filter_cookies(URL(url))["A1"].value == "value"
+    assert not transport.cookie_jar.filter_cookies(URL("https://example.com"))
+    assert transport.get_cookies()["A1"].value == "value"
+
+    transport.set_cookies(None)
+    assert len(transport.cookie_jar) == 0
+
+    await transport.async_close()
+
+
+async def test_fork(hass: HomeAssistant) -> None:
+    """Forked transport has its own cookies on the same connections."""
+    transport = YahooTransport(hass)
+    fork = transport.fork()
+    assert fork.session.connector is transport.session.connector
+
+    cookies = SimpleCookie()
+    cookies["A1"] = "value"
+    fork.set_cookies(cookies)
+    assert len(fork.cookie_jar) == 1
+    assert len(transport.cookie_jar) == 0
+
+    connector = transport.session.connector
+    await fork.async_close(close_connector=False)
+    assert not connector.closed
+
+    await transport.async_close()
+    assert connector.closed
+
+
+async def test_async_get_transport(hass: HomeAssistant) -> None:
+    """One transport is used and closed when Home Assistant closes."""
+    transport = async_get_transport(hass)
+    assert async_get_transport(hass) is transport
+    session = transport.session
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert session.closed
+    assert HASS_DATA_TRANSPORT not in hass.data
@@ -0,0 +1,122 @@
+"""Tests for Yahoo Finance component."""
+
+import asyncio
+from http import HTTPStatus
+from unittest.mock import patch
+
+from custom_components.yahoofinance.const import (
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_LATENCY_FACTOR,
+    HEDGE_MAX_DELAY,
+    HEDGE_MIN_DELAY,
+    STORAGE_KEY_USER_AGENTS,
+)
+from custom_components.yahoofinance.useragents import UserAgentSelector
+from homeassistant.core import HomeAssistant
+
+AGENTS = ["agent1", "agent2", "agent3"]
+RANDOM = "custom_components.yahoofinance.useragents.random.random"
+
+
+def test_initial_order(hass: HomeAssistant) -> None:
+    """Agents are tried in the configured order without any stats."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0)
+    assert selector.get_ordered_agents() == AGENTS
+
+
+def test_throttled_agent_is_tried_last(hass: HomeAssistant) -> None:
+    """Agents receiving 429 move down the order."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0)
+
+    selector.record_result("agent1", HTTPStatus.TOO_MANY_REQUESTS, 0.1)
+    selector.record_result("agent2", HTTPStatus.OK, 0.1)
+    selector.record_result("agent3", HTTPStatus.OK, 0.1)
+
+    assert selector.get_ordered_agents() == ["agent2", "agent3", "agent1"]
+
+    stats = selector.stats["agent1"]
+    assert stats.request_count == 1
+    assert stats.success_rate < 1
+    assert stats.throttle_rate > 0
+
+
+def test_faster_agent_is_preferred(hass: HomeAssistant) -> None:
+    """Latency breaks the tie between equally successful agents."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0)
+
+    selector.record_result("agent1", HTTPStatus.OK, 2)
+    selector.record_result("agent2", HTTPStatus.OK, 0.5)
+    selector.record_result("agent3", HTTPStatus.OK, 1)
+
+    assert selector.get_ordered_agents() == ["agent2", "agent3", "agent1"]
+
+
+def test_failure_without_response(hass: HomeAssistant) -> None:
+    """Requests without a response lower the success rate but not latency."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0)
+
+    selector.record_result("agent1", None)
+    assert selector.stats["agent1"].success_rate < 1
+    assert selector.stats["agent1"].throttle_rate == 0
+    assert selector.stats["agent1"].latency == 0
+    assert selector.get_ordered_agents()[-1] == "agent1"
+
+    # Unknown agents are ignored
+    selector.record_result("unknown", HTTPStatus.OK, 1)
+    assert "unknown" not in selector.stats
+
+
+def test_exploration(hass: HomeAssistant) -> None:
+    """Occasionally an agent other than the best is tried first."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0.1)
+
+    with patch(RANDOM, return_value=0.5):
+        assert selector.get_ordered_agents() == AGENTS
+
+    with (
+        patch(RANDOM, return_value=0.05),
+        patch(
+            "custom_components.yahoofinance.useragents.random.choice",
+            return_value="agent3",
+        ),
+    ):
+        assert selector.get_ordered_agents() == ["agent3", "agent1", "agent2"]
+
+
+async def test_stats_are_persisted(hass: HomeAssistant, hass_storage) -> None:
+    """Stats are saved and loaded for the configured agents."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0)
+
+    with patch(
+        "custom_components.yahoofinance.useragents.USER_AGENT_STATS_SAVE_DELAY", 0
+    ):
+        selector.record_result("agent1", HTTPStatus.TOO_MANY_REQUESTS, 0.1)
+        selector.record_result("agent2", HTTPStatus.OK, 0.2)
+
+    await asyncio.sleep(0)
+    await hass.async_block_till_done()
+
+    saved = hass_storage[STORAGE_KEY_USER_AGENTS]["data"]["agents"]
+    assert saved["agent1"]["throttle_rate"] > 0
+    assert saved["agent2"]["latency"] == 0.2
+
+    loaded = UserAgentSelector(hass, ["agent2", "agent1"], exploration_rate=0)
+    await loaded.async_load()
+    assert loaded.stats["agent1"] == selector.stats["agent1"]
+    assert loaded.stats["agent2"] == selector.stats["agent2"]
+    assert loaded.get_ordered_agents() == ["agent2", "agent1"]
+
+
+def test_hedge_delay(hass: HomeAssistant) -> None:
+    """Hedge delay is derived from the agent latency."""
+    selector = UserAgentSelector(hass, AGENTS, exploration_rate=0)
+    assert selector.get_hedge_delay("agent1") == HEDGE_DEFAULT_DELAY
+
+    selector.record_result("agent1", HTTPStatus.OK, 0.5)
+    assert selector.get_hedge_delay("agent1") == 0.5 * HEDGE_LATENCY_FACTOR
+
+    selector.record_result("agent2", HTTPStatus.OK, 0.01)
+    assert selector.get_hedge_delay("agent2") == HEDGE_MIN_DELAY
+
+    selector.record_result("agent3", HTTPStatus.OK, 60)
+    assert selector.get_hedge_delay("agent3") == HEDGE_MAX_DELAY